@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Multi-format date normalization for Problem 1 tooling.
+
+Detects the layout of each *unique* date string once, caches the result,
+and parses every layout group with a single vectorized pd.to_datetime call.
+Shared by the evaluator's reference checks.
+"""
+
+import csv
+import re
+import sys
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+# Layouts present in sales_data.csv, tried in order
+DATE_FORMATS = [
+    ("%m/%d/%Y", re.compile(r"^\d{1,2}/\d{1,2}/\d{4}$")),
+    ("%Y-%m-%d", re.compile(r"^\d{4}-\d{1,2}-\d{1,2}$")),
+    ("%d-%b-%y", re.compile(r"^\d{1,2}-[A-Za-z]{3}-\d{2}$")),
+]
+UNIX_FORMAT = "unix"
+UNIX_PATTERN = re.compile(r"^\d{9,10}(\.\d+)?$")
+
+MISSING_VALUES = {"", "n/a", "null", "none", "nan", "-"}
+
+# value -> parsed Timestamp (or NaT); survives across calls
+_parse_cache: Dict[str, pd.Timestamp] = {}
+_format_cache: Dict[str, Optional[str]] = {}
+
+
+def detect_format(value: str) -> Optional[str]:
+    """Return the strftime layout (or "unix") for a date string, None if unknown."""
+    if value in _format_cache:
+        return _format_cache[value]
+
+    text = value.strip()
+    fmt = None
+    if text.lower() not in MISSING_VALUES:
+        for candidate, pattern in DATE_FORMATS:
+            if pattern.match(text):
+                fmt = candidate
+                break
+        else:
+            if UNIX_PATTERN.match(text):
+                fmt = UNIX_FORMAT
+
+    _format_cache[value] = fmt
+    return fmt
+
+
+def _parse_group(values: List[str], fmt: str) -> pd.Series:
+    """Parse a list of strings sharing one layout in a single vectorized call."""
+    raw = pd.Series(values, dtype=object).str.strip()
+    if fmt == UNIX_FORMAT:
+        return pd.to_datetime(pd.to_numeric(raw, errors="coerce"), unit="s", errors="coerce")
+    return pd.to_datetime(raw, format=fmt, errors="coerce")
+
+
+def parse_dates(values: Iterable) -> dict:
+    """
+    Normalize a column of mixed-format date strings.
+
+    Returns a dict with:
+      dates       - datetime64 Series aligned with the input (NaT on failure)
+      formats     - Counter of layout -> number of rows
+      unparseable - unique raw values that could not be parsed, in input order
+    """
+    series = pd.Series(values, dtype=object).fillna("").astype(str)
+    uniques = pd.unique(series)
+
+    # Group the not-yet-cached unique values by detected layout
+    groups = defaultdict(list)
+    for value in uniques:
+        if value in _parse_cache:
+            continue
+        fmt = detect_format(value)
+        if fmt is None:
+            _parse_cache[value] = pd.NaT
+        else:
+            groups[fmt].append(value)
+
+    for fmt, group in groups.items():
+        parsed = _parse_group(group, fmt)
+        _parse_cache.update(zip(group, parsed))
+
+    mapping = {value: _parse_cache[value] for value in uniques}
+    dates = pd.to_datetime(series.map(mapping))
+
+    formats = Counter()
+    for value, count in series.value_counts(sort=False).items():
+        formats[detect_format(value) if not pd.isna(mapping[value]) else "unparseable"] += count
+
+    unparseable = [value for value in uniques if pd.isna(mapping[value])]
+
+    return {"dates": dates, "formats": formats, "unparseable": unparseable}
+
+
+def parse_timestamps(values: Iterable) -> pd.Series:
+    """Parse a Unix-seconds column (e.g. sales_data.csv `timestamp`)."""
+    numeric = pd.to_numeric(pd.Series(values, dtype=object), errors="coerce")
+    return pd.to_datetime(numeric, unit="s", errors="coerce")
+
+
+def read_date_column(csv_path, column: str = "date") -> List[str]:
+    """
+    Read one raw column from sales_data.csv.
+
+    Uses the csv module rather than pd.read_csv: unquoted "$1,299.00" values
+    give some rows extra fields, but columns before them stay aligned.
+    """
+    with open(csv_path, newline="") as f:
+        reader = csv.reader(f)
+        index = next(reader).index(column)
+        return [row[index] if len(row) > index else "" for row in reader]
+
+
+def clear_cache():
+    """Drop all cached detections and parses."""
+    _parse_cache.clear()
+    _format_cache.clear()
+
+
+def main():
+    csv_path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).parent / "sales_data.csv"
+
+    raw_dates = read_date_column(csv_path)
+    report = parse_dates(raw_dates)
+
+    print(f"Parsed {len(raw_dates)} dates from {csv_path.name}")
+    for fmt, count in report["formats"].most_common():
+        print(f"  {fmt}: {count}")
+    print(f"Unparseable values: {report['unparseable']}")
+
+
+if __name__ == "__main__":
+    main()
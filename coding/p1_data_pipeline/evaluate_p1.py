@@ -164,8 +164,27 @@ def validate_outputs() -> dict:
     # Check processing_log.txt
     log_path = base_path / "processing_log.txt"
     if log_path.exists():
-        scores["logging"] = 5
-        details.append("✓ Processing log created")
+        try:
+            from date_parser import parse_dates, read_date_column
+
+            raw_dates = read_date_column(base_path / "sales_data.csv")
+            unparseable = parse_dates(raw_dates)["unparseable"]
+            log_text = log_path.read_text()
+
+            # Empty dates can't be searched for; named bad values must be reported
+            missing = [v for v in unparseable if v.strip() and v not in log_text]
+            if missing:
+                scores["logging"] = 3
+                details.append(f"◐ Processing log created but does not report: {missing}")
+            else:
+                scores["logging"] = 5
+                details.append(f"✓ Processing log reports {len(unparseable)} unparseable dates")
+        except ImportError:
+            scores["logging"] = 5
+            details.append("✓ Processing log created (pandas unavailable, contents not checked)")
+        except Exception as e:
+            scores["logging"] = 0
+            details.append(f"✗ Error checking processing_log.txt: {e}")
     else:
         scores["logging"] = 0
         details.append("✗ processing_log.txt not found")
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Batch driver for Problem 2 evaluation.
+
+Imports the candidate interpreter once, so the modules it uses are loaded
+before forking, then runs every program in a forked child with its own
+stdout/stderr and a per-test timeout. The child runs the candidate file with
+runpy as __main__, with the same sys.argv and sys.path[0] as
+`python interpreter.py program.calc`, so its `if __name__ == "__main__"`
+block is the entry point in batch mode too. Results for the whole batch go
+back to the evaluator as one JSON document.
+
+Protocol:
+    stdin:  {"programs": ["print 1", ...], "timeout": 5}
+    stdout: {"supported": true, "results": [[stdout, stderr, returncode], ...]}
+
+If the candidate cannot be driven this way (import fails, no os.fork) the
+driver answers {"supported": false, "reason": ...} and the
+evaluator falls back to one process per test.
+"""
+
+import importlib.util
+import json
+import os
+import runpy
+import select
+import signal
+import sys
+import tempfile
+import time
+import traceback
+
+READ_CHUNK = 65536
+WAIT_POLL = 0.005
+
+
+def load_interpreter(interpreter_path: str):
+    """Import the candidate without triggering its __main__ block."""
+    sys.path.insert(0, os.path.dirname(interpreter_path))
+    spec = importlib.util.spec_from_file_location("candidate_interpreter", interpreter_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["candidate_interpreter"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _child(interpreter_path: str, program_path: str, out_fd: int, err_fd: int):
+    """Run one program inside the forked child; never returns."""
+    os.dup2(out_fd, 1)
+    os.dup2(err_fd, 2)
+    sys.argv = [interpreter_path, program_path]
+
+    code = 0
+    try:
+        runpy.run_path(interpreter_path, run_name="__main__")
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except Exception:
+            pass
+        os._exit(code & 0xFF)
+
+
+def _collect(pid: int, out_r: int, err_r: int, timeout: float) -> tuple:
+    """Drain the child's pipes until it exits or the deadline passes."""
+    chunks = {out_r: [], err_r: []}
+    open_fds = [out_r, err_r]
+    deadline = time.monotonic() + timeout
+    timed_out = False
+
+    while open_fds:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            timed_out = True
+            break
+        ready, _, _ = select.select(open_fds, [], [], remaining)
+        for fd in ready:
+            data = os.read(fd, READ_CHUNK)
+            if data:
+                chunks[fd].append(data)
+            else:
+                open_fds.remove(fd)
+
+    # A child can close its pipes and keep running; wait for it only until
+    # the same deadline
+    status = None
+    while not timed_out:
+        reaped, status = os.waitpid(pid, os.WNOHANG)
+        if reaped:
+            break
+        if time.monotonic() >= deadline:
+            timed_out = True
+        else:
+            time.sleep(WAIT_POLL)
+
+    if timed_out:
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+    os.close(out_r)
+    os.close(err_r)
+
+    if timed_out:
+        return "", "TIMEOUT", -1
+
+    stdout = b"".join(chunks[out_r]).decode(errors="replace")
+    stderr = b"".join(chunks[err_r]).decode(errors="replace")
+    if os.WIFSIGNALED(status):
+        returncode = -os.WTERMSIG(status)
+    else:
+        returncode = os.WEXITSTATUS(status)
+    return stdout.strip(), stderr.strip(), returncode
+
+
+def run_program(interpreter_path: str, code: str, timeout: float) -> tuple:
+    """Run one program in a forked child, return (stdout, stderr, returncode)."""
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.calc', delete=False) as f:
+        f.write(code)
+        program_path = f.name
+
+    try:
+        out_r, out_w = os.pipe()
+        err_r, err_w = os.pipe()
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        pid = os.fork()
+        if pid == 0:
+            os.close(out_r)
+            os.close(err_r)
+            _child(interpreter_path, program_path, out_w, err_w)
+
+        os.close(out_w)
+        os.close(err_w)
+        return _collect(pid, out_r, err_r, timeout)
+    finally:
+        os.unlink(program_path)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python batch_runner.py <interpreter.py> < programs.json")
+        sys.exit(1)
+
+    interpreter_path = os.path.abspath(sys.argv[1])
+    request = json.load(sys.stdin)
+    reply = sys.stdout
+
+    if not hasattr(os, "fork"):
+        json.dump({"supported": False, "reason": "os.fork not available"}, reply)
+        return
+
+    # Keep the candidate's import-time output out of the reply channel
+    sys.stdout = sys.stderr
+    try:
+        load_interpreter(interpreter_path)
+    except BaseException as e:
+        json.dump({"supported": False, "reason": f"import failed: {e!r}"}, reply)
+        return
+    finally:
+        sys.stdout = sys.__stdout__
+
+    results = [
+        run_program(interpreter_path, code, request.get("timeout", 5))
+        for code in request["programs"]
+    ]
+    json.dump({"supported": True, "results": results}, reply)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Performance tier for Problem 2: Calculator Interpreter.
+
+Runs recursion-heavy and long programs and reports evaluated operations per
+second. Scores use the candidate's runtime as a ratio against calc_vm.py
+running the same program on the same machine, so results are comparable
+across hosts. Interpreters that copy the environment on every call or
+binding fall well behind the baseline.
+"""
+
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+VM_PATH = Path(__file__).parent / "calc_vm.py"
+
+# Full credit at or below FULL_CREDIT_RATIO x the VM's runtime, none at or
+# above ZERO_CREDIT_RATIO x, linear in between
+FULL_CREDIT_RATIO = 2.0
+ZERO_CREDIT_RATIO = 10.0
+
+
+def _fib_program() -> str:
+    return "fn fib(n) = if n <= 1 then n else fib(n-1) + fib(n-2)\nprint fib(25)"
+
+
+def _fact_program() -> str:
+    # 2^8 leaves, each computing fact(120) twice: 511 + 256 * 240 calls
+    return (
+        "fn fact(n) = if n <= 1 then 1 else n * fact(n - 1)\n"
+        "fn twice(k) = if k <= 0 then fact(120) - fact(120) else twice(k - 1) + twice(k - 1)\n"
+        "print twice(8)"
+    )
+
+
+def _let_program(count: int = 5000) -> str:
+    lines = ["let v0 = 0"]
+    lines += [f"let v{i} = v{i - 1} + 1" for i in range(1, count)]
+    lines.append(f"print v{count - 1}")
+    return "\n".join(lines)
+
+
+def _chain_program(count: int = 1000, depth: int = 50, calls: int = 100) -> str:
+    lines = ["fn f0(x) = x"]
+    lines += [
+        f"fn f{i}(x) = if x <= 0 then 0 else f{i - 1}(x - 1) + 1"
+        for i in range(1, count)
+    ]
+    lines += [f"print f{i}({depth})" for i in range(count - calls, count)]
+    return "\n".join(lines)
+
+
+PERF_BENCHMARKS = [
+    # (description, code, expected_outputs, operations, points)
+    # operations = function calls + top-level statements
+    ("fib(25)", _fib_program(), ["75025"], 242785 + 2, 3),
+    ("deep fact recursion", _fact_program(), ["0"], 511 + 256 * 240 + 3, 2),
+    ("5000 let bindings", _let_program(), ["4999"], 5001, 2),
+    ("1000 chained functions", _chain_program(), ["50"] * 100, 1000 + 100 * 51 + 100, 3),
+]
+
+
+def time_program(interpreter_path: str, code: str, timeout: int = 30) -> tuple:
+    """Run a program once, return (stdout, stderr, returncode, seconds)."""
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.calc', delete=False) as f:
+        f.write(code)
+        temp_path = f.name
+
+    try:
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, interpreter_path, temp_path],
+            capture_output=True,
+            text=True,
+            timeout=timeout
+        )
+        elapsed = time.perf_counter() - start
+        return proc.stdout.strip(), proc.stderr.strip(), proc.returncode, elapsed
+    except subprocess.TimeoutExpired:
+        return "", "TIMEOUT", -1, float(timeout)
+    finally:
+        Path(temp_path).unlink(missing_ok=True)
+
+
+def best_time(interpreter_path: str, code: str, repeats: int = 3, timeout: int = 30) -> tuple:
+    """Best of several runs; stops early on failure or timeout."""
+    best = None
+    for _ in range(repeats):
+        stdout, stderr, returncode, elapsed = time_program(interpreter_path, code, timeout)
+        if best is None or elapsed < best[3]:
+            best = (stdout, stderr, returncode, elapsed)
+        if returncode != 0:
+            break
+    return best
+
+
+def run_time(interpreter_path: str, code: str, startup: float, repeats: int) -> tuple:
+    """Best-of-repeats run with interpreter startup subtracted."""
+    stdout, stderr, returncode, elapsed = best_time(interpreter_path, code, repeats)
+    return stdout, stderr, returncode, max(elapsed - startup, 1e-4)
+
+
+def ratio_score(ratio: float, points: int) -> int:
+    """Points for a runtime ratio against the VM baseline."""
+    fraction = (ZERO_CREDIT_RATIO - ratio) / (ZERO_CREDIT_RATIO - FULL_CREDIT_RATIO)
+    return round(points * max(0.0, min(1.0, fraction)))
+
+
+def evaluate_performance(interpreter_path: str, repeats: int = 3) -> dict:
+    """Run the performance tier and return scores and measurements."""
+    results = {
+        "earned": 0,
+        "possible": sum(b[4] for b in PERF_BENCHMARKS),
+        "details": [],
+        "benchmarks": []
+    }
+
+    # Interpreter startup and import cost, subtracted from every run
+    startup = best_time(interpreter_path, "print 0", repeats)[3]
+    vm_startup = best_time(str(VM_PATH), "print 0", repeats)[3]
+
+    for desc, code, expected, operations, points in PERF_BENCHMARKS:
+        stdout, stderr, returncode, seconds = run_time(interpreter_path, code, startup, repeats)
+        vm_seconds = run_time(str(VM_PATH), code, vm_startup, repeats)[3]
+        output_lines = [l.strip() for l in stdout.split('\n') if l.strip()]
+
+        ops_per_sec = operations / seconds
+        ratio = seconds / vm_seconds
+        correct = output_lines == expected
+        earned = ratio_score(ratio, points) if correct else 0
+
+        results["earned"] += earned
+        results["benchmarks"].append({
+            "name": desc,
+            "correct": correct,
+            "seconds": seconds,
+            "vm_seconds": vm_seconds,
+            "ratio": ratio,
+            "ops_per_sec": ops_per_sec,
+            "earned": earned,
+            "possible": points
+        })
+
+        if not correct:
+            reason = "timeout" if stderr == "TIMEOUT" else f"wrong output {output_lines[:3]}"
+            results["details"].append(f"✗ perf: {desc} (0/{points} pts) - {reason}")
+        else:
+            mark = "✓" if earned == points else "◐"
+            results["details"].append(
+                f"{mark} perf: {desc} - {ops_per_sec:,.0f} ops/s, "
+                f"{ratio:.2f}x VM baseline ({earned}/{points} pts)"
+            )
+
+    return results
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python benchmarks.py <interpreter.py>")
+        sys.exit(1)
+
+    results = evaluate_performance(sys.argv[1])
+    for detail in results["details"]:
+        print(f"  {detail}")
+    print(f"\nPerformance Score: {results['earned']}/{results['possible']}")
+
+
+if __name__ == "__main__":
+    main()
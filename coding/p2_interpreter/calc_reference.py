@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+Reference interpreter for the Problem 2 calculator language.
+
+Each statement is parsed to a tuple AST and compiled to nested Python
+closures. Variables are resolved at compile time: globals live in numbered
+slots (a new slot per `let`/`fn`, so functions keep the variable bindings
+they saw when defined) and parameters are indexes into the call's argument
+tuple. Function names in calls are looked up when the call runs, in a table
+of each global's latest value, so functions may call functions defined
+after them (mutual recursion) and a later `let` of a function's name is
+seen by its callers.
+
+Usage: python calc_reference.py program.calc
+"""
+
+import re
+import sys
+from typing import Callable, List, Optional
+
+TOKEN_RE = re.compile(r"""
+    (?P<ws>[ \t\r]+)
+  | (?P<num>\d+\.\d*|\.\d+|\d+)
+  | (?P<name>[A-Za-z_][A-Za-z_0-9]*)
+  | (?P<op>==|!=|<=|>=|[-+*/%()<>=,])
+""", re.VERBOSE)
+
+KEYWORDS = {"let", "fn", "print", "if", "then", "else"}
+COMPARISONS = {"==", "!=", "<", ">", "<=", ">="}
+
+
+class CalcError(Exception):
+    """A calc-level error; kind is one of the ERROR_KINDS below."""
+
+    def __init__(self, kind: str, message: str):
+        super().__init__(f"{kind}: {message}")
+        self.kind = kind
+
+
+SYNTAX = "syntax error"
+UNDEFINED_VARIABLE = "undefined variable"
+UNDEFINED_FUNCTION = "undefined function"
+DIVISION_BY_ZERO = "division by zero error"
+ARGUMENT = "argument count error"
+TYPE = "type error"
+# Implementation-defined limits, not language errors
+OVERFLOW = "overflow error"
+RECURSION = "recursion error"
+
+ERROR_KINDS = [SYNTAX, UNDEFINED_VARIABLE, UNDEFINED_FUNCTION, DIVISION_BY_ZERO, ARGUMENT, TYPE]
+
+
+# --- Lexer -----------------------------------------------------------------
+
+def tokenize(line: str) -> list:
+    """Split one source line into (kind, value) tokens, dropping comments."""
+    line = line.split("#", 1)[0]
+    tokens = []
+    pos = 0
+    while pos < len(line):
+        m = TOKEN_RE.match(line, pos)
+        if not m:
+            raise CalcError(SYNTAX, f"unexpected character {line[pos]!r}")
+        pos = m.end()
+        kind = m.lastgroup
+        text = m.group()
+        if kind == "ws":
+            continue
+        if kind == "num":
+            tokens.append(("num", float(text) if "." in text else int(text)))
+        elif kind == "name" and text in KEYWORDS:
+            tokens.append(("kw", text))
+        else:
+            tokens.append((kind, text))
+    return tokens
+
+
+# --- Parser ----------------------------------------------------------------
+
+class Parser:
+    """Recursive-descent parser for a single statement."""
+
+    def __init__(self, tokens: list):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self) -> tuple:
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
+        return ("eof", None)
+
+    def advance(self) -> tuple:
+        token = self.peek()
+        if token[0] == "eof":
+            raise CalcError(SYNTAX, "unexpected end of line")
+        self.pos += 1
+        return token
+
+    def expect(self, kind: str, value=None) -> tuple:
+        token = self.advance()
+        if token[0] != kind or (value is not None and token[1] != value):
+            raise CalcError(SYNTAX, f"expected {value or kind}, got {token[1]!r}")
+        return token
+
+    def at(self, kind: str, value=None) -> bool:
+        token = self.peek()
+        return token[0] == kind and (value is None or token[1] == value)
+
+    def statement(self) -> tuple:
+        if self.at("kw", "let"):
+            self.advance()
+            name = self.expect("name")[1]
+            self.expect("op", "=")
+            node = ("let", name, self.expression())
+        elif self.at("kw", "fn"):
+            self.advance()
+            name = self.expect("name")[1]
+            self.expect("op", "(")
+            params = []
+            if not self.at("op", ")"):
+                params.append(self.expect("name")[1])
+                while self.at("op", ","):
+                    self.advance()
+                    params.append(self.expect("name")[1])
+            self.expect("op", ")")
+            self.expect("op", "=")
+            node = ("fn", name, params, self.expression())
+        elif self.at("kw", "print"):
+            self.advance()
+            node = ("print", self.expression())
+        else:
+            node = ("expr", self.expression())
+
+        if self.peek()[0] != "eof":
+            raise CalcError(SYNTAX, f"unexpected {self.peek()[1]!r}")
+        return node
+
+    def expression(self) -> tuple:
+        if self.at("kw", "if"):
+            self.advance()
+            cond = self.expression()
+            self.expect("kw", "then")
+            then = self.expression()
+            self.expect("kw", "else")
+            return ("if", cond, then, self.expression())
+        return self.comparison()
+
+    def comparison(self) -> tuple:
+        left = self.additive()
+        while self.peek()[0] == "op" and self.peek()[1] in COMPARISONS:
+            op = self.advance()[1]
+            left = ("bin", op, left, self.additive())
+        return left
+
+    def additive(self) -> tuple:
+        left = self.multiplicative()
+        while self.at("op", "+") or self.at("op", "-"):
+            op = self.advance()[1]
+            left = ("bin", op, left, self.multiplicative())
+        return left
+
+    def multiplicative(self) -> tuple:
+        left = self.unary()
+        while self.at("op", "*") or self.at("op", "/") or self.at("op", "%"):
+            op = self.advance()[1]
+            left = ("bin", op, left, self.unary())
+        return left
+
+    def unary(self) -> tuple:
+        if self.at("op", "-"):
+            self.advance()
+            return ("neg", self.unary())
+        return self.primary()
+
+    def primary(self) -> tuple:
+        kind, value = self.advance()
+        if kind == "num":
+            return ("num", value)
+        if kind == "name":
+            if self.at("op", "("):
+                self.advance()
+                args = []
+                if not self.at("op", ")"):
+                    args.append(self.expression())
+                    while self.at("op", ","):
+                        self.advance()
+                        args.append(self.expression())
+                self.expect("op", ")")
+                return ("call", value, args)
+            return ("var", value)
+        if kind == "op" and value == "(":
+            node = self.expression()
+            self.expect("op", ")")
+            return node
+        raise CalcError(SYNTAX, f"unexpected {value!r}")
+
+
+def parse_line(line: str) -> Optional[tuple]:
+    """Parse one source line; None for blank and comment-only lines."""
+    tokens = tokenize(line)
+    if not tokens:
+        return None
+    return Parser(tokens).statement()
+
+
+# --- Compiler --------------------------------------------------------------
+
+class Function:
+    """A compiled calc function; body takes the argument tuple."""
+
+    __slots__ = ("name", "arity", "body")
+
+    def __init__(self, name: str, arity: int):
+        self.name = name
+        self.arity = arity
+        self.body = None
+
+
+def _divide(a, b):
+    if b == 0:
+        raise CalcError(DIVISION_BY_ZERO, "division by zero")
+    return a / b
+
+
+def _modulo(a, b):
+    if b == 0:
+        raise CalcError(DIVISION_BY_ZERO, "modulo by zero")
+    return a % b
+
+
+BINARY_OPS = {
+    "+": lambda a, b: a + b,
+    "-": lambda a, b: a - b,
+    "*": lambda a, b: a * b,
+    "/": _divide,
+    "%": _modulo,
+    "==": lambda a, b: 1 if a == b else 0,
+    "!=": lambda a, b: 1 if a != b else 0,
+    "<": lambda a, b: 1 if a < b else 0,
+    ">": lambda a, b: 1 if a > b else 0,
+    "<=": lambda a, b: 1 if a <= b else 0,
+    ">=": lambda a, b: 1 if a >= b else 0,
+}
+
+
+class Compiler:
+    """Compiles statements against a growing table of global slots."""
+
+    def __init__(self):
+        self.slots: List = []          # runtime values, indexed by slot
+        self.names = {}                # name -> slot of its latest binding
+        self.globals = {}              # name -> value of its latest executed binding
+
+    def _new_slot(self, name: str) -> int:
+        self.slots.append(None)
+        slot = len(self.slots) - 1
+        self.names[name] = slot
+        return slot
+
+    def compile_statement(self, node: tuple, output: Callable) -> Callable:
+        """Return a zero-argument callable that executes the statement."""
+        kind = node[0]
+        slots = self.slots
+
+        if kind == "let":
+            name = node[1]
+            expr = self.compile_expr(node[2], {})
+            # Resolve the value before the name is (re)bound
+            slot = self._new_slot(name)
+            table = self.globals
+
+            def run_let():
+                slots[slot] = table[name] = expr(())
+            return run_let
+
+        if kind == "fn":
+            _, name, params, body = node
+            if len(set(params)) != len(params):
+                raise CalcError(SYNTAX, f"duplicate parameter in {name}")
+            function = Function(name, len(params))
+            slot = self._new_slot(name)
+            slots[slot] = self.globals[name] = function
+            function.body = self.compile_expr(body, {p: i for i, p in enumerate(params)})
+            return lambda: None
+
+        expr = self.compile_expr(node[1], {})
+        if kind == "print":
+            return lambda: output(expr(()))
+        return lambda: expr(())
+
+    def compile_expr(self, node: tuple, params: dict) -> Callable:
+        """Compile an expression to a callable taking the argument tuple."""
+        kind = node[0]
+        slots = self.slots
+
+        if kind == "num":
+            value = node[1]
+            return lambda args: value
+
+        if kind == "var":
+            name = node[1]
+            if name in params:
+                index = params[name]
+                return lambda args: args[index]
+            if name in self.names:
+                slot = self.names[name]
+
+                def load(args):
+                    value = slots[slot]
+                    if isinstance(value, Function):
+                        raise CalcError(TYPE, f"function {name} used as a value")
+                    return value
+                return load
+
+            def undefined(args):
+                raise CalcError(UNDEFINED_VARIABLE, f"undefined variable '{name}'")
+            return undefined
+
+        if kind == "neg":
+            operand = self.compile_expr(node[1], params)
+            return lambda args: -operand(args)
+
+        if kind == "bin":
+            _, op, left_node, right_node = node
+            left = self.compile_expr(left_node, params)
+            right = self.compile_expr(right_node, params)
+            # Inline the hot operators; the rest go through BINARY_OPS
+            if op == "+":
+                return lambda args: left(args) + right(args)
+            if op == "-":
+                return lambda args: left(args) - right(args)
+            if op == "*":
+                return lambda args: left(args) * right(args)
+            if op == "<=":
+                return lambda args: 1 if left(args) <= right(args) else 0
+            if op == "<":
+                return lambda args: 1 if left(args) < right(args) else 0
+            func = BINARY_OPS[op]
+            return lambda args: func(left(args), right(args))
+
+        if kind == "if":
+            cond = self.compile_expr(node[1], params)
+            then = self.compile_expr(node[2], params)
+            other = self.compile_expr(node[3], params)
+            return lambda args: then(args) if cond(args) else other(args)
+
+        if kind == "call":
+            return self._compile_call(node, params)
+
+        raise CalcError(SYNTAX, f"unknown node {kind}")
+
+    def _compile_call(self, node: tuple, params: dict) -> Callable:
+        _, name, arg_nodes = node
+        arg_exprs = [self.compile_expr(a, params) for a in arg_nodes]
+        arity = len(arg_exprs)
+
+        if name in params:
+            def call_param(args):
+                raise CalcError(TYPE, f"'{name}' is not a function")
+            return call_param
+
+        # Function names are looked up when the call runs, so a body can call
+        # a function defined after it and sees a later let of the same name
+        lookup = self.globals.get
+
+        def check(function):
+            if function is None:
+                raise CalcError(UNDEFINED_FUNCTION, f"undefined function '{name}'")
+            if not isinstance(function, Function):
+                raise CalcError(TYPE, f"'{name}' is not a function")
+            if function.arity != arity:
+                raise CalcError(
+                    ARGUMENT,
+                    f"{name} expects {function.arity} argument(s), got {arity}"
+                )
+
+        if arity == 1:
+            arg0 = arg_exprs[0]
+
+            def call1(args):
+                function = lookup(name)
+                if function.__class__ is not Function or function.arity != 1:
+                    check(function)
+                return function.body((arg0(args),))
+            return call1
+
+        def call(args):
+            function = lookup(name)
+            if function.__class__ is not Function or function.arity != arity:
+                check(function)
+            return function.body(tuple([a(args) for a in arg_exprs]))
+        return call
+
+
+# --- Driver ----------------------------------------------------------------
+
+def format_value(value) -> str:
+    """Print integral floats without a trailing .0."""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def run(source: str, write: Callable = print) -> Optional[tuple]:
+    """
+    Execute a program, printing as it goes.
+
+    Returns None on success, or (line_number, CalcError) for the first error.
+    """
+    compiler = Compiler()
+    output = lambda value: write(format_value(value))
+
+    for line_number, line in enumerate(source.splitlines(), 1):
+        try:
+            node = parse_line(line)
+            if node is not None:
+                compiler.compile_statement(node, output)()
+        except CalcError as e:
+            return line_number, e
+        except RecursionError:
+            return line_number, CalcError(RECURSION, "maximum recursion depth exceeded")
+        except OverflowError as e:
+            return line_number, CalcError(OVERFLOW, str(e))
+    return None
+
+
+def evaluate(source: str) -> tuple:
+    """Run a program and return (output_lines, error_or_None) without printing."""
+    lines = []
+    error = run(source, lines.append)
+    return lines, error
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python calc_reference.py <program.calc>")
+        return 1
+
+    sys.setrecursionlimit(100000)
+
+    with open(sys.argv[1]) as f:
+        source = f.read()
+
+    error = run(source)
+    if error:
+        line_number, exc = error
+        print(f"Error on line {line_number}: {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Bytecode VM for the Problem 2 calculator language.
+
+A second reference backend, used as the speed baseline for the performance
+tier. Statements are parsed with calc_reference's parser, constant-folded,
+and compiled to a flat list of (opcode, arg) instructions. Parameters are
+precomputed offsets from the frame base on a single value stack and global
+variables are numbered slots, bound when the reading code is compiled.
+Calls, as in calc_reference, find their function by name at run time in a
+table of each name's latest global binding, so a body can call a function
+defined after it and sees a later redefinition. Calls push a frame record
+instead of recursing in Python, so calc recursion depth is bounded only by
+MAX_FRAMES.
+
+Usage: python calc_vm.py program.calc
+"""
+
+import sys
+from typing import Callable, List, Optional
+
+from calc_reference import (
+    ARGUMENT, DIVISION_BY_ZERO, OVERFLOW, RECURSION, SYNTAX, TYPE,
+    UNDEFINED_FUNCTION, UNDEFINED_VARIABLE, CalcError, format_value, parse_line,
+)
+
+MAX_FRAMES = 1_000_000
+
+# Opcodes, roughly in order of dispatch frequency
+(LOAD_LOCAL, LOAD_CONST, ADD_CONST, SUB_CONST, LE_CONST, LT_CONST, CALL, RETURN,
+ JUMP_IF_FALSE, JUMP, ADD, SUB, MUL, DIV, MOD, EQ, NE, LT, GT, LE, GE, NEG,
+ LOAD_GLOBAL, STORE_GLOBAL, PRINT, POP, RAISE, HALT) = range(28)
+
+FOLDABLE = {
+    "+": lambda a, b: a + b,
+    "-": lambda a, b: a - b,
+    "*": lambda a, b: a * b,
+    "/": lambda a, b: a / b,
+    "%": lambda a, b: a % b,
+    "==": lambda a, b: 1 if a == b else 0,
+    "!=": lambda a, b: 1 if a != b else 0,
+    "<": lambda a, b: 1 if a < b else 0,
+    ">": lambda a, b: 1 if a > b else 0,
+    "<=": lambda a, b: 1 if a <= b else 0,
+    ">=": lambda a, b: 1 if a >= b else 0,
+}
+
+BINARY_OPCODES = {
+    "+": ADD, "-": SUB, "*": MUL, "/": DIV, "%": MOD,
+    "==": EQ, "!=": NE, "<": LT, ">": GT, "<=": LE, ">=": GE,
+}
+
+# Binary ops with a constant right operand that get a fused instruction
+CONST_OPCODES = {"+": ADD_CONST, "-": SUB_CONST, "<=": LE_CONST, "<": LT_CONST}
+
+
+class Function:
+    """A compiled calc function."""
+
+    __slots__ = ("name", "arity", "code")
+
+    def __init__(self, name: str, arity: int):
+        self.name = name
+        self.arity = arity
+        self.code: List[tuple] = []
+
+
+def fold(node: tuple) -> tuple:
+    """Constant-fold an expression tree; runtime errors are left in place."""
+    kind = node[0]
+    if kind == "neg":
+        operand = fold(node[1])
+        if operand[0] == "num":
+            return ("num", -operand[1])
+        return ("neg", operand)
+    if kind == "bin":
+        _, op, left, right = node
+        left, right = fold(left), fold(right)
+        if left[0] == "num" and right[0] == "num":
+            if not (op in ("/", "%") and right[1] == 0):
+                try:
+                    return ("num", FOLDABLE[op](left[1], right[1]))
+                except OverflowError:
+                    pass
+        return ("bin", op, left, right)
+    if kind == "if":
+        cond = fold(node[1])
+        if cond[0] == "num":
+            return fold(node[2]) if cond[1] else fold(node[3])
+        return ("if", cond, fold(node[2]), fold(node[3]))
+    if kind == "call":
+        return ("call", node[1], [fold(a) for a in node[2]])
+    return node
+
+
+class Compiler:
+    """Compiles statements to bytecode against a growing table of global slots."""
+
+    def __init__(self):
+        self.slots: List = []
+        self.names = {}
+        self.globals = {}              # name -> value of its latest executed binding
+
+    def _new_slot(self, name: str) -> int:
+        self.slots.append(None)
+        slot = len(self.slots) - 1
+        self.names[name] = slot
+        return slot
+
+    def compile_statement(self, node: tuple) -> List[tuple]:
+        """Return top-level bytecode for one statement, ending in HALT."""
+        kind = node[0]
+        code = []
+
+        if kind == "let":
+            self.compile_expr(fold(node[2]), {}, code)
+            code.append((STORE_GLOBAL, (self._new_slot(node[1]), node[1])))
+        elif kind == "fn":
+            _, name, params, body = node
+            if len(set(params)) != len(params):
+                raise CalcError(SYNTAX, f"duplicate parameter in {name}")
+            function = Function(name, len(params))
+            self.slots[self._new_slot(name)] = self.globals[name] = function
+            self.compile_expr(fold(body), {p: i for i, p in enumerate(params)}, function.code)
+            function.code.append((RETURN, None))
+        elif kind == "print":
+            self.compile_expr(fold(node[1]), {}, code)
+            code.append((PRINT, None))
+        else:
+            self.compile_expr(fold(node[1]), {}, code)
+            code.append((POP, None))
+
+        code.append((HALT, None))
+        return code
+
+    def compile_expr(self, node: tuple, params: dict, code: list):
+        kind = node[0]
+
+        if kind == "num":
+            code.append((LOAD_CONST, node[1]))
+        elif kind == "var":
+            name = node[1]
+            if name in params:
+                code.append((LOAD_LOCAL, params[name]))
+            elif name in self.names:
+                code.append((LOAD_GLOBAL, (self.names[name], name)))
+            else:
+                code.append((RAISE, (UNDEFINED_VARIABLE, f"undefined variable '{name}'")))
+        elif kind == "neg":
+            self.compile_expr(node[1], params, code)
+            code.append((NEG, None))
+        elif kind == "bin":
+            _, op, left, right = node
+            self.compile_expr(left, params, code)
+            if right[0] == "num" and op in CONST_OPCODES:
+                code.append((CONST_OPCODES[op], right[1]))
+            else:
+                self.compile_expr(right, params, code)
+                code.append((BINARY_OPCODES[op], None))
+        elif kind == "if":
+            self.compile_expr(node[1], params, code)
+            jump_else = len(code)
+            code.append(None)
+            self.compile_expr(node[2], params, code)
+            jump_end = len(code)
+            code.append(None)
+            code[jump_else] = (JUMP_IF_FALSE, len(code))
+            self.compile_expr(node[3], params, code)
+            code[jump_end] = (JUMP, len(code))
+        elif kind == "call":
+            _, name, args = node
+            if name in params:
+                code.append((RAISE, (TYPE, f"'{name}' is not a function")))
+            else:
+                for arg in args:
+                    self.compile_expr(arg, params, code)
+                code.append((CALL, (name, len(args))))
+        else:
+            raise CalcError(SYNTAX, f"unknown node {kind}")
+
+
+def _call_error(function, name: str, argc: int) -> CalcError:
+    if function is None:
+        return CalcError(UNDEFINED_FUNCTION, f"undefined function '{name}'")
+    if not isinstance(function, Function):
+        return CalcError(TYPE, f"'{name}' is not a function")
+    return CalcError(ARGUMENT, f"{name} expects {function.arity} argument(s), got {argc}")
+
+
+def execute(code: list, slots: list, table: dict, output: Callable):
+    """Run top-level bytecode until HALT; table maps names to latest bindings."""
+    lookup = table.get
+    stack = []
+    frames = []
+    push = stack.append
+    pop = stack.pop
+    base = 0
+    pc = 0
+
+    while True:
+        op, arg = code[pc]
+        pc += 1
+
+        if op == LOAD_LOCAL:
+            push(stack[base + arg])
+        elif op == LOAD_CONST:
+            push(arg)
+        elif op == ADD_CONST:
+            stack[-1] += arg
+        elif op == SUB_CONST:
+            stack[-1] -= arg
+        elif op == LE_CONST:
+            stack[-1] = 1 if stack[-1] <= arg else 0
+        elif op == LT_CONST:
+            stack[-1] = 1 if stack[-1] < arg else 0
+        elif op == CALL:
+            name, argc = arg
+            function = lookup(name)
+            if function.__class__ is not Function or function.arity != argc:
+                raise _call_error(function, name, argc)
+            if len(frames) >= MAX_FRAMES:
+                raise CalcError(RECURSION, "maximum recursion depth exceeded")
+            frames.append((code, pc, base))
+            code = function.code
+            pc = 0
+            base = len(stack) - argc
+        elif op == RETURN:
+            result = stack[-1]
+            del stack[base:]
+            push(result)
+            code, pc, base = frames.pop()
+        elif op == JUMP_IF_FALSE:
+            if not pop():
+                pc = arg
+        elif op == JUMP:
+            pc = arg
+        elif op == ADD:
+            b = pop()
+            stack[-1] += b
+        elif op == SUB:
+            b = pop()
+            stack[-1] -= b
+        elif op == MUL:
+            b = pop()
+            stack[-1] *= b
+        elif op == DIV:
+            b = pop()
+            if b == 0:
+                raise CalcError(DIVISION_BY_ZERO, "division by zero")
+            stack[-1] /= b
+        elif op == MOD:
+            b = pop()
+            if b == 0:
+                raise CalcError(DIVISION_BY_ZERO, "modulo by zero")
+            stack[-1] %= b
+        elif op == NEG:
+            stack[-1] = -stack[-1]
+        elif op == LOAD_GLOBAL:
+            value = slots[arg[0]]
+            if value.__class__ is Function:
+                raise CalcError(TYPE, f"function {arg[1]} used as a value")
+            push(value)
+        elif op == HALT:
+            return
+        elif op == STORE_GLOBAL:
+            slots[arg[0]] = table[arg[1]] = pop()
+        elif op == PRINT:
+            output(pop())
+        elif op == POP:
+            pop()
+        elif op == RAISE:
+            raise CalcError(*arg)
+        else:
+            b = pop()
+            a = stack[-1]
+            if op == EQ:
+                stack[-1] = 1 if a == b else 0
+            elif op == NE:
+                stack[-1] = 1 if a != b else 0
+            elif op == LT:
+                stack[-1] = 1 if a < b else 0
+            elif op == GT:
+                stack[-1] = 1 if a > b else 0
+            elif op == LE:
+                stack[-1] = 1 if a <= b else 0
+            elif op == GE:
+                stack[-1] = 1 if a >= b else 0
+            else:
+                raise CalcError(SYNTAX, f"bad opcode {op}")
+
+
+def run(source: str, write: Callable = print) -> Optional[tuple]:
+    """
+    Execute a program, printing as it goes.
+
+    Returns None on success, or (line_number, CalcError) for the first error.
+    """
+    compiler = Compiler()
+    output = lambda value: write(format_value(value))
+
+    for line_number, line in enumerate(source.splitlines(), 1):
+        try:
+            node = parse_line(line)
+            if node is not None:
+                execute(compiler.compile_statement(node), compiler.slots, compiler.globals, output)
+        except CalcError as e:
+            return line_number, e
+        except OverflowError as e:
+            return line_number, CalcError(OVERFLOW, str(e))
+    return None
+
+
+def evaluate(source: str) -> tuple:
+    """Run a program and return (output_lines, error_or_None) without printing."""
+    lines = []
+    error = run(source, lines.append)
+    return lines, error
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python calc_vm.py <program.calc>")
+        return 1
+
+    with open(sys.argv[1]) as f:
+        source = f.read()
+
+    error = run(source)
+    if error:
+        line_number, exc = error
+        print(f"Error on line {line_number}: {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Deep-recursion stress tier for Problem 2: Calculator Interpreter.
+
+Runs recursion thousands of levels deep, which interpreters that recurse
+natively on the host stack for every calc call don't survive. Each program
+runs in a fresh process so its peak RSS can be reported, and a depth ladder
+finds the deepest recursion the candidate completes.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+MODULUS = 1000003
+
+# Depths tried in order; stops at the first failure
+DEPTH_LADDER = [1000, 5000, 10000, 20000, 50000]
+
+
+def _fact_mod_expected(n: int) -> int:
+    value = 1
+    for i in range(2, n + 1):
+        value = (i * value) % MODULUS
+    return value
+
+
+def _sum_program(depth: int) -> str:
+    return f"fn sum(n) = if n <= 0 then 0 else n + sum(n - 1)\nprint sum({depth})"
+
+
+# Mutual recursion: each call goes through the other function
+MUTUAL_PROGRAM = (
+    "fn isEven(n) = if n == 0 then 1 else isOdd(n - 1)\n"
+    "fn isOdd(n) = if n == 0 then 0 else isEven(n - 1)\n"
+    "print isEven(5000)\n"
+    "print isOdd(5000)"
+)
+
+DEEP_TESTS = [
+    # (description, code, expected_outputs, points)
+    ("fact(5000) mod p",
+     f"fn fact(n) = if n <= 1 then 1 else (n * fact(n - 1)) % {MODULUS}\nprint fact(5000)",
+     [str(_fact_mod_expected(5000))], 3),
+    ("mutual recursion isEven/isOdd, depth 5000", MUTUAL_PROGRAM, ["1", "0"], 2),
+]
+LADDER_POINTS = 5
+
+
+def run_measured(interpreter_path: str, code: str, timeout: int = 20) -> dict:
+    """
+    Run a program in a fresh process.
+
+    Uses os.wait4 so the child's own peak RSS is available, not the maximum
+    over every child the evaluator has started.
+    """
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.calc', delete=False) as f:
+        f.write(code)
+        temp_path = f.name
+
+    out = tempfile.TemporaryFile()
+    err = tempfile.TemporaryFile()
+    try:
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, interpreter_path, temp_path],
+            stdout=out,
+            stderr=err
+        )
+        deadline = start + timeout
+        timed_out = False
+        while True:
+            pid, status, usage = os.wait4(proc.pid, os.WNOHANG)
+            if pid:
+                break
+            if time.perf_counter() > deadline:
+                proc.kill()
+                pid, status, usage = os.wait4(proc.pid, 0)
+                timed_out = True
+                break
+            time.sleep(0.005)
+        elapsed = time.perf_counter() - start
+        proc.returncode = os.waitstatus_to_exitcode(status)
+
+        out.seek(0)
+        err.seek(0)
+        return {
+            "stdout": out.read().decode(errors="replace").strip(),
+            "stderr": "TIMEOUT" if timed_out else err.read().decode(errors="replace").strip(),
+            "returncode": -1 if timed_out else proc.returncode,
+            "seconds": elapsed,
+            # ru_maxrss is KiB on Linux
+            "peak_rss_mb": usage.ru_maxrss / 1024
+        }
+    finally:
+        out.close()
+        err.close()
+        Path(temp_path).unlink(missing_ok=True)
+
+
+def _outcome(run: dict, expected: list) -> str:
+    lines = [l.strip() for l in run["stdout"].split('\n') if l.strip()]
+    if run["stderr"] == "TIMEOUT":
+        return "timeout"
+    if run["returncode"] < 0:
+        return f"crashed (signal {-run['returncode']})"
+    if lines != expected:
+        last = run["stderr"].splitlines()[-1] if run["stderr"] else f"output {lines[:3]}"
+        return f"failed: {last[:120]}"
+    return "ok"
+
+
+def evaluate_deep_recursion(interpreter_path: str) -> dict:
+    """Run the deep-recursion tier and return scores and measurements."""
+    results = {
+        "earned": 0,
+        "possible": sum(t[3] for t in DEEP_TESTS) + LADDER_POINTS,
+        "details": [],
+        "runs": [],
+        "max_depth": 0
+    }
+
+    for desc, code, expected, points in DEEP_TESTS:
+        run = run_measured(interpreter_path, code)
+        outcome = _outcome(run, expected)
+        earned = points if outcome == "ok" else 0
+        results["earned"] += earned
+        results["runs"].append({"name": desc, "outcome": outcome, **run})
+
+        if earned:
+            results["details"].append(
+                f"✓ deep: {desc} - peak RSS {run['peak_rss_mb']:.0f} MB ({points} pts)"
+            )
+        else:
+            results["details"].append(f"✗ deep: {desc} (0/{points} pts) - {outcome}")
+
+    # Depth ladder
+    for depth in DEPTH_LADDER:
+        run = run_measured(interpreter_path, _sum_program(depth))
+        outcome = _outcome(run, [str(depth * (depth + 1) // 2)])
+        results["runs"].append({"name": f"depth {depth}", "outcome": outcome, **run})
+        if outcome != "ok":
+            results["details"].append(f"◐ deep: recursion depth {depth} - {outcome}")
+            break
+        results["max_depth"] = depth
+
+    levels = sum(1 for d in DEPTH_LADDER if d <= results["max_depth"])
+    ladder_earned = round(LADDER_POINTS * levels / len(DEPTH_LADDER))
+    results["earned"] += ladder_earned
+    results["details"].append(
+        f"{'✓' if ladder_earned == LADDER_POINTS else '◐'} deep: max recursion depth "
+        f"survived {results['max_depth']} ({ladder_earned}/{LADDER_POINTS} pts)"
+    )
+
+    return results
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python deep_recursion.py <interpreter.py>")
+        sys.exit(1)
+
+    results = evaluate_deep_recursion(sys.argv[1])
+    for detail in results["details"]:
+        print(f"  {detail}")
+    print(f"\nDeep Recursion Score: {results['earned']}/{results['possible']}")
+
+
+if __name__ == "__main__":
+    main()
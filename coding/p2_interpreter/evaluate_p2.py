@@ -5,10 +5,16 @@ Tests various features and edge cases.
 """
 
 import json
+import os
 import subprocess
 import sys
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Optional
+
+from benchmarks import evaluate_performance
+from deep_recursion import evaluate_deep_recursion
 
 
 TESTS = [
@@ -110,7 +116,80 @@ def run_test(interpreter_path: str, code: str, timeout: int = 5) -> tuple:
         Path(temp_path).unlink(missing_ok=True)
 
 
-def evaluate_interpreter(interpreter_path: str) -> dict:
+def _run_batch(interpreter_path: str, codes: list, timeout: int) -> Optional[list]:
+    """One batch_runner.py driver process for codes."""
+    runner = Path(__file__).parent / "batch_runner.py"
+    request = json.dumps({"programs": codes, "timeout": timeout})
+
+    try:
+        proc = subprocess.run(
+            [sys.executable, str(runner), str(Path(interpreter_path).resolve())],
+            input=request,
+            capture_output=True,
+            text=True,
+            timeout=timeout * len(codes) + 30
+        )
+        reply = json.loads(proc.stdout)
+    except (subprocess.TimeoutExpired, json.JSONDecodeError):
+        return None
+
+    if not reply.get("supported"):
+        return None
+    return [tuple(r) for r in reply["results"]]
+
+
+def run_tests_batch(interpreter_path: str, codes: list, timeout: int = 5,
+                    max_workers: Optional[int] = None) -> Optional[list]:
+    """
+    Run all programs through batch_runner.py, one driver per worker.
+
+    Programs are dealt round-robin to the drivers, which run concurrently,
+    so a hanging candidate costs about len(codes) / workers timeouts rather
+    than one per test. Returns a list of (stdout, stderr, returncode)
+    aligned with codes, or None if the candidate can't be driven in batch
+    mode.
+    """
+    workers = min(max_workers or os.cpu_count() or 1, len(codes) or 1)
+    shares = [codes[i::workers] for i in range(workers)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        replies = list(pool.map(lambda share: _run_batch(interpreter_path, share, timeout), shares))
+    if any(reply is None for reply in replies):
+        return None
+
+    outputs = [None] * len(codes)
+    for i, reply in enumerate(replies):
+        outputs[i::workers] = reply
+    return outputs
+
+
+def run_tests_parallel(interpreter_path: str, codes: list, max_workers: Optional[int] = None) -> list:
+    """
+    Run each program in its own interpreter process, several at a time.
+
+    Tests are independent, so a hanging candidate costs one timeout per
+    worker instead of one per test. Results keep the order of codes.
+    """
+    workers = max_workers or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=min(workers, len(codes) or 1)) as pool:
+        return list(pool.map(lambda code: run_test(interpreter_path, code), codes))
+
+
+def run_all_tests(interpreter_path: str, codes: list, mode: str = "auto") -> tuple:
+    """
+    Run every program, preferring batch mode.
+
+    Returns (outputs, mode_used) where outputs is aligned with codes.
+    """
+    if mode in ("auto", "batch"):
+        outputs = run_tests_batch(interpreter_path, codes)
+        if outputs is not None:
+            return outputs, "batch"
+
+    return run_tests_parallel(interpreter_path, codes), "per-process"
+
+
+def evaluate_interpreter(interpreter_path: str, mode: str = "auto", performance: bool = True,
+                         deep_recursion: bool = True) -> dict:
     """Run all tests and return results."""
     results = {
         "tests_passed": 0,
@@ -123,10 +202,13 @@ def evaluate_interpreter(interpreter_path: str) -> dict:
     total_score = 0
     max_score = sum(t[3] for t in TESTS) + sum(t[3] for t in ERROR_TESTS)
 
-    # Run feature tests
-    for desc, code, expected, points, category in TESTS:
-        stdout, stderr, returncode = run_test(interpreter_path, code)
+    codes = [t[1] for t in TESTS] + [t[1] for t in ERROR_TESTS]
+    outputs, results["mode"] = run_all_tests(interpreter_path, codes, mode)
+    feature_outputs = outputs[:len(TESTS)]
+    error_outputs = outputs[len(TESTS):]
 
+    # Score feature tests
+    for (desc, code, expected, points, category), (stdout, stderr, returncode) in zip(TESTS, feature_outputs):
         # Parse output lines
         output_lines = [l.strip() for l in stdout.split('\n') if l.strip()]
 
@@ -162,10 +244,8 @@ def evaluate_interpreter(interpreter_path: str) -> dict:
         if passed:
             results["by_category"][category]["earned"] += points
 
-    # Run error tests
-    for desc, code, should_contain_any, points, category in ERROR_TESTS:
-        stdout, stderr, returncode = run_test(interpreter_path, code)
-
+    # Score error tests
+    for (desc, code, should_contain_any, points, category), (stdout, stderr, returncode) in zip(ERROR_TESTS, error_outputs):
         combined_output = (stdout + stderr).lower()
 
         # Check if any expected substring is in output
@@ -189,6 +269,28 @@ def evaluate_interpreter(interpreter_path: str) -> dict:
         if passed:
             results["by_category"][category]["earned"] += points
 
+    # Performance tier
+    if performance:
+        perf = evaluate_performance(interpreter_path)
+        total_score += perf["earned"]
+        max_score += perf["possible"]
+        results["details"].extend(perf["details"])
+        results["by_category"]["performance"] = {
+            "earned": perf["earned"], "possible": perf["possible"]
+        }
+        results["performance"] = perf["benchmarks"]
+
+    # Deep-recursion stress tier
+    if deep_recursion:
+        deep = evaluate_deep_recursion(interpreter_path)
+        total_score += deep["earned"]
+        max_score += deep["possible"]
+        results["details"].extend(deep["details"])
+        results["by_category"]["deep_recursion"] = {
+            "earned": deep["earned"], "possible": deep["possible"]
+        }
+        results["deep_recursion"] = {"max_depth": deep["max_depth"], "runs": deep["runs"]}
+
     results["total_score"] = total_score
     results["max_score"] = max_score
 
@@ -197,16 +299,20 @@ def evaluate_interpreter(interpreter_path: str) -> dict:
 
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python evaluate_p2.py <interpreter.py>")
+        print("Usage: python evaluate_p2.py <interpreter.py> [--per-process] [--skip-perf] [--skip-deep] [--differential]")
         sys.exit(1)
 
     interpreter_path = sys.argv[1]
+    mode = "per-process" if "--per-process" in sys.argv[2:] else "auto"
+    performance = "--skip-perf" not in sys.argv[2:]
+    deep_recursion = "--skip-deep" not in sys.argv[2:]
 
     print("=" * 60)
     print("Problem 2: Calculator Interpreter - Evaluation")
     print("=" * 60)
 
-    results = evaluate_interpreter(interpreter_path)
+    results = evaluate_interpreter(interpreter_path, mode, performance, deep_recursion)
+    print(f"\nExecution mode: {results['mode']}")
 
     print("\nCategory Breakdown:")
     for category, scores in results["by_category"].items():
@@ -216,6 +322,18 @@ def main():
     for detail in results["details"]:
         print(f"  {detail}")
 
+    if "--differential" in sys.argv[2:]:
+        # Unscored: generated programs checked against calc_reference.py
+        from fuzz_calc import differential_test
+
+        report = differential_test(interpreter_path)
+        results["differential"] = report
+        print(f"\nDifferential test: {report['passed']}/{report['programs']} generated programs agree")
+        for repro in report["repros"]:
+            print(f"  ✗ #{repro['program_index']}: {repro['reason']}")
+            for line in repro["repro"].split("\n"):
+                print(f"      {line}")
+
     print(f"\nTests Passed: {results['tests_passed']}/{results['tests_total']}")
     print(f"Total Score: {results['total_score']}/{results['max_score']}")
 
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Differential fuzzer for the Problem 2 calculator language.
+
+Generates seeded random programs, runs them through calc_reference.py and
+the candidate (batch mode when possible), and shrinks every mismatch to a
+minimal repro.
+
+Usage: python fuzz_calc.py <interpreter.py> [--count N] [--seed S]
+"""
+
+import math
+import random
+import re
+import sys
+from typing import List, Optional
+
+from calc_reference import OVERFLOW, RECURSION, SYNTAX, evaluate
+from evaluate_p2 import run_all_tests
+
+BATCH_SIZE = 500
+NUMBER_RE = re.compile(r"(?<![\w.])\d+(\.\d+)?")
+
+
+class ProgramGenerator:
+    """
+    Random well-scoped calc programs.
+
+    Recursive functions always recurse on a literal, non-negative first
+    argument and only call non-recursive helpers, which keeps every program
+    fast and shallow. Some functions call a helper defined by the next
+    statement (sometimes called in between, before it exists), and some
+    redefine an earlier helper that existing callers must then pick up;
+    neither body calls anything else, so no cycle can form. A small
+    fraction of statements is replaced with a deliberate error.
+    """
+
+    def __init__(self, seed: int, error_rate: float = 0.02):
+        self.rng = random.Random(seed)
+        self.error_rate = error_rate
+
+    def program(self) -> str:
+        self.variables: List[str] = []
+        self.functions: List[tuple] = []   # (name, arity, recursive)
+        lines = []
+        for _ in range(self.rng.randint(3, 15)):
+            if self.rng.random() < self.error_rate:
+                lines.append(self._error_statement())
+            else:
+                lines.append(self._statement())
+        return "\n".join(lines)
+
+    def _statement(self) -> str:
+        roll = self.rng.random()
+        if roll < 0.3 or not self.variables:
+            if self.variables and self.rng.random() < 0.2:
+                name = self.rng.choice(self.variables)
+            else:
+                name = f"v{len(self.variables)}"
+            line = f"let {name} = {self._expr(3, [])}"
+            if name not in self.variables:
+                self.variables.append(name)
+            return line
+        if roll < 0.4:
+            return self._function()
+        if roll < 0.45:
+            return self._forward_call()
+        if roll < 0.5:
+            return self._redefinition()
+        if roll < 0.6:
+            return self._recursive_function()
+        return f"print {self._expr(3, [])}"
+
+    def _leaf_expr(self, params: List[str]) -> str:
+        """An expression that calls no function."""
+        functions, self.functions = self.functions, []
+        try:
+            return self._expr(2, params)
+        finally:
+            self.functions = functions
+
+    def _forward_call(self) -> str:
+        """A function calling a helper that the following lines define."""
+        caller, helper = f"a{len(self.functions)}", f"b{len(self.functions)}"
+        params = [f"p{i}" for i in range(self.rng.randint(1, 2))]
+        helper_params = [f"q{i}" for i in range(self.rng.randint(1, 2))]
+        args = ", ".join(self._leaf_expr(params) for _ in helper_params)
+        lines = [f"fn {caller}({', '.join(params)}) = {self._leaf_expr(params)} + {helper}({args})"]
+        if self.rng.random() < 0.2:
+            # Called before the helper exists: undefined function
+            lines.append(f"print {caller}({', '.join('1' for _ in params)})")
+        lines.append(f"fn {helper}({', '.join(helper_params)}) = {self._leaf_expr(helper_params)}")
+        self.functions.append((helper, len(helper_params), False))
+        self.functions.append((caller, len(params), False))
+        return "\n".join(lines)
+
+    def _redefinition(self) -> str:
+        """A new body for an earlier helper; its existing callers see it."""
+        helpers = [f for f in self.functions if not f[2] and f[0][0] != "a"]
+        if not helpers:
+            return self._function()
+        name, arity, _ = self.rng.choice(helpers)
+        params = [f"p{i}" for i in range(arity)]
+        return f"fn {name}({', '.join(params)}) = {self._leaf_expr(params)}"
+
+    def _function(self) -> str:
+        name = f"f{len(self.functions)}"
+        params = [f"p{i}" for i in range(self.rng.randint(1, 3))]
+        body = self._expr(3, params)
+        self.functions.append((name, len(params), False))
+        return f"fn {name}({', '.join(params)}) = {body}"
+
+    def _recursive_function(self) -> str:
+        name = f"r{len(self.functions)}"
+        params = ["n"] + [f"p{i}" for i in range(self.rng.randint(0, 2))]
+        base = self._expr(2, params, allow_recursive=False)
+        args = ["n - 1"] + [self._expr(1, params, allow_recursive=False) for _ in params[1:]]
+        step = self._expr(1, params, allow_recursive=False)
+        op = self.rng.choice(["+", "-"])
+        body = f"if n <= 0 then {base} else {name}({', '.join(args)}) {op} {step}"
+        self.functions.append((name, len(params), True))
+        return f"fn {name}({', '.join(params)}) = {body}"
+
+    def _expr(self, depth: int, params: List[str], allow_recursive: bool = True) -> str:
+        rng = self.rng
+        names = params + self.variables
+        if depth <= 0 or rng.random() < 0.25:
+            if names and rng.random() < 0.6:
+                return rng.choice(names)
+            if rng.random() < 0.1:
+                return f"{rng.randint(0, 9)}.5"
+            return str(rng.randint(0 if rng.random() < 0.1 else 1, 20))
+
+        roll = rng.random()
+        if roll < 0.5:
+            op = rng.choice(["+", "+", "-", "-", "*", "/", "%"])
+            return f"({self._expr(depth - 1, params, allow_recursive)} {op} {self._expr(depth - 1, params, allow_recursive)})"
+        if roll < 0.6:
+            return f"-{self._expr(depth - 1, params, allow_recursive)}"
+        if roll < 0.75:
+            cmp = rng.choice(["==", "!=", "<", ">", "<=", ">="])
+            cond = f"{self._expr(depth - 1, params, allow_recursive)} {cmp} {self._expr(depth - 1, params, allow_recursive)}"
+            then = self._expr(depth - 1, params, allow_recursive)
+            other = self._expr(depth - 1, params, allow_recursive)
+            return f"(if {cond} then {then} else {other})"
+
+        callable_functions = [f for f in self.functions if allow_recursive or not f[2]]
+        if not callable_functions:
+            return self._expr(depth - 1, params, allow_recursive)
+        name, arity, recursive = rng.choice(callable_functions)
+        args = [self._expr(depth - 1, params, allow_recursive=False) for _ in range(arity)]
+        if recursive:
+            args[0] = str(rng.randint(0, 6))
+        return f"{name}({', '.join(args)})"
+
+    def _error_statement(self) -> str:
+        kind = self.rng.randrange(5)
+        if kind == 0:
+            return f"print undefined_{self.rng.randint(0, 99)}"
+        if kind == 1:
+            return f"print missing_fn({self._expr(1, [])})"
+        if kind == 2:
+            return f"print {self._expr(1, [])} / 0"
+        if kind == 3 and self.functions:
+            name, arity, _ = self.rng.choice(self.functions)
+            args = ", ".join(str(i) for i in range(arity + 1))
+            return f"print {name}({args})"
+        return f"let = {self._expr(1, [])}"
+
+
+def _normalize(line: str):
+    try:
+        return float(line)
+    except ValueError:
+        return line
+
+
+def _lines_match(got: list, expected: list) -> bool:
+    if len(got) != len(expected):
+        return False
+    for g, e in zip(got, expected):
+        g, e = _normalize(g), _normalize(e)
+        if isinstance(g, float) and isinstance(e, float):
+            if not math.isclose(g, e, rel_tol=1e-9, abs_tol=1e-9):
+                return False
+        elif g != e:
+            return False
+    return True
+
+
+def compare(code: str, candidate_output: tuple) -> Optional[str]:
+    """Return a mismatch description, or None if the candidate agrees."""
+    stdout, stderr, returncode = candidate_output
+    expected_lines, error = evaluate(code)
+
+    if stderr == "TIMEOUT":
+        return "timeout"
+
+    # Error messages may go to stdout; keep only value lines
+    lines = [l.strip() for l in stdout.split('\n') if l.strip()]
+    value_lines = [l for l in lines if "error" not in l.lower()]
+    candidate_error = returncode != 0 or "error" in (stdout + stderr).lower()
+
+    if error is not None:
+        _, exc = error
+        if exc.kind in (OVERFLOW, RECURSION):
+            # Numeric and stack limits are implementation-defined
+            return None
+        if not candidate_error:
+            return f"expected {exc.kind}, candidate reported no error"
+        if exc.kind == SYNTAX:
+            # Whole-file vs line-by-line parsing both acceptable
+            return None
+    elif candidate_error:
+        return f"unexpected error: {(stderr or stdout)[-200:]}"
+
+    if not _lines_match(value_lines, expected_lines):
+        return f"output {value_lines[:5]} != expected {expected_lines[:5]}"
+    return None
+
+
+def run_candidate(interpreter_path: str, codes: list) -> list:
+    """Run programs through the candidate in batches."""
+    outputs = []
+    for i in range(0, len(codes), BATCH_SIZE):
+        batch_outputs, _ = run_all_tests(interpreter_path, codes[i:i + BATCH_SIZE])
+        outputs.extend(batch_outputs)
+    return outputs
+
+
+def _fails(interpreter_path: str, codes: list) -> list:
+    outputs = run_candidate(interpreter_path, codes)
+    return [compare(code, out) is not None for code, out in zip(codes, outputs)]
+
+
+def shrink(interpreter_path: str, code: str) -> str:
+    """
+    Minimize a failing program.
+
+    Removes chunks of lines (halving the chunk size down to single lines),
+    then replaces numeric literals with 0 or 1. Every candidate reduction of
+    a pass runs in one batch; the first that still fails is kept.
+    """
+    lines = [l for l in code.split("\n") if l.strip()]
+
+    chunk = max(1, len(lines) // 2)
+    while chunk >= 1:
+        variants = [
+            lines[:start] + lines[start + chunk:]
+            for start in range(0, len(lines), chunk)
+        ]
+        variants = [v for v in variants if v]
+        failing = _fails(interpreter_path, ["\n".join(v) for v in variants]) if variants else []
+        if any(failing):
+            lines = variants[failing.index(True)]
+            chunk = min(chunk, max(1, len(lines) // 2))
+        else:
+            chunk //= 2
+
+    changed = True
+    while changed:
+        changed = False
+        variants = []
+        for i, line in enumerate(lines):
+            for m in NUMBER_RE.finditer(line):
+                for literal in ("0", "1"):
+                    # Only ever move towards smaller literals so this terminates
+                    if float(m.group()) > float(literal):
+                        replaced = line[:m.start()] + literal + line[m.end():]
+                        variants.append(lines[:i] + [replaced] + lines[i + 1:])
+        if not variants:
+            break
+        failing = _fails(interpreter_path, ["\n".join(v) for v in variants])
+        if any(failing):
+            lines = variants[failing.index(True)]
+            changed = True
+
+    return "\n".join(lines)
+
+
+def differential_test(interpreter_path: str, count: int = 2000, seed: int = 0,
+                      max_repros: int = 5) -> dict:
+    """Run count generated programs against the candidate and shrink failures."""
+    generator = ProgramGenerator(seed)
+    codes = [generator.program() for _ in range(count)]
+    outputs = run_candidate(interpreter_path, codes)
+
+    failures = []
+    for index, (code, output) in enumerate(zip(codes, outputs)):
+        reason = compare(code, output)
+        if reason is not None:
+            failures.append((index, code, reason))
+
+    repros = []
+    for index, code, reason in failures[:max_repros]:
+        minimal = shrink(interpreter_path, code)
+        minimal_output = run_candidate(interpreter_path, [minimal])[0]
+        repros.append({
+            "program_index": index,
+            "reason": compare(minimal, minimal_output) or reason,
+            "repro": minimal
+        })
+
+    return {
+        "seed": seed,
+        "programs": count,
+        "passed": count - len(failures),
+        "failed": len(failures),
+        "repros": repros
+    }
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python fuzz_calc.py <interpreter.py> [--count N] [--seed S]")
+        sys.exit(1)
+
+    args = sys.argv[2:]
+    count = int(args[args.index("--count") + 1]) if "--count" in args else 2000
+    seed = int(args[args.index("--seed") + 1]) if "--seed" in args else 0
+
+    report = differential_test(sys.argv[1], count, seed)
+    print(f"Differential test (seed {report['seed']}): "
+          f"{report['passed']}/{report['programs']} programs agree with reference")
+    for repro in report["repros"]:
+        print(f"\n#{repro['program_index']}: {repro['reason']}")
+        for line in repro["repro"].split("\n"):
+            print(f"    {line}")
+
+
+if __name__ == "__main__":
+    main()
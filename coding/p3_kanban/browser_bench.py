@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Optional browser benchmark for Problem 3: Kanban Board.
+
+Drives kanban.html in a locally installed headless Chromium through
+Playwright. The board's own storage format is discovered by adding one probe
+card through the UI and reading localStorage back; that card is then cloned
+to seed boards of 1k and 10k cards. For each size the benchmark measures
+initial render, a drag-and-drop move, undo and redo, and the time spent in
+localStorage.setItem, and scores them against fixed budgets.
+
+Skips cleanly when Playwright or Chromium is not installed.
+
+Usage: python browser_bench.py kanban.html
+"""
+
+import copy
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Optional
+
+CARD_COUNTS = [1000, 10000]
+PROBE = "benchprobe"
+ID_KEYS = {"id", "_id", "uid", "key", "cardid", "card_id"}
+
+# (metric, description, points per board size, {cards: budget in ms})
+METRICS = [
+    ("render_ms", "initial render", 2, {1000: 500, 10000: 2000}),
+    ("move_ms", "drag-and-drop move", 1, {1000: 50, 10000: 200}),
+    ("undo_redo_ms", "undo + redo", 1, {1000: 100, 10000: 400}),
+    ("storage_write_ms", "localStorage write", 1, {1000: 5, 10000: 30}),
+]
+
+MISSING = {"render_ms": "not rendered", "storage_write_ms": "no localStorage write on move"}
+
+# Full credit within budget, none at ZERO_CREDIT_RATIO x budget or slower
+ZERO_CREDIT_RATIO = 4.0
+
+# Seeds the board once per tab, before any page script runs, so nothing the
+# page saves while unloading can overwrite it
+SEED_SCRIPT = """
+if (!sessionStorage.getItem("__benchSeeded")) {
+    sessionStorage.setItem("__benchSeeded", "1");
+    localStorage.setItem(%s, %s);
+}
+"""
+
+# Installed before any page script runs: times every localStorage.setItem
+INIT_SCRIPT = """
+window.__benchWrites = [];
+const __setItem = Storage.prototype.setItem;
+Storage.prototype.setItem = function (key, value) {
+    const start = performance.now();
+    __setItem.call(this, key, value);
+    window.__benchWrites.push({ms: performance.now() - start, bytes: String(value).length});
+};
+"""
+
+# Finds the card and the Done column, then drags the card there with
+# synthetic HTML5 drag events, undoes and redoes. Timings include the frame
+# rendered after each action.
+MOVE_SCRIPT = """
+async (title) => {
+    const frame = () => new Promise(r => requestAnimationFrame(() => setTimeout(r, 0)));
+    const findCard = () => [...document.querySelectorAll('[draggable="true"]')]
+        .find(el => el.textContent.includes(title));
+    const header = [...document.querySelectorAll(
+        'h1, h2, h3, h4, h5, h6, header, legend, [class*="title"], [class*="header"]')]
+        .find(el => /^\\s*done\\b/i.test(el.textContent) && el.textContent.length < 40);
+    if (!header) return {error: "Done column not found"};
+    const column = header.closest(
+        'section, [class*="column"], [data-status], [data-column]') || header.parentElement;
+
+    const card = findCard();
+    if (!card) return {error: "seeded card not rendered as draggable"};
+    column.scrollIntoView({block: "start"});
+    const rect = column.getBoundingClientRect();
+    const headerRect = header.getBoundingClientRect();
+    const x = rect.left + rect.width / 2;
+    const y = Math.min(rect.bottom - 2, headerRect.bottom + 40, window.innerHeight - 2);
+    const target = document.elementFromPoint(x, y) || column;
+    const writesBefore = window.__benchWrites.length;
+
+    const dataTransfer = new DataTransfer();
+    const drag = (el, type) => el.dispatchEvent(new DragEvent(type, {
+        bubbles: true, cancelable: true, clientX: x, clientY: y, dataTransfer}));
+    let start = performance.now();
+    drag(card, "dragstart");
+    drag(target, "dragenter");
+    drag(target, "dragover");
+    drag(target, "drop");
+    drag(card, "dragend");
+    await frame();
+    const moveMs = performance.now() - start;
+    const moved = column.textContent.includes(title);
+    const moveWrites = window.__benchWrites.slice(writesBefore);
+
+    document.activeElement && document.activeElement.blur();
+    const key = (k, extra) => document.body.dispatchEvent(new KeyboardEvent("keydown", {
+        key: k, code: "Key" + k.toUpperCase(), ctrlKey: true, bubbles: true,
+        cancelable: true, ...extra}));
+    start = performance.now();
+    key("z");
+    await frame();
+    const undoMs = performance.now() - start;
+    const undone = !column.textContent.includes(title);
+
+    start = performance.now();
+    key("y");
+    await frame();
+    if (!column.textContent.includes(title)) {
+        key("z", {shiftKey: true});
+        await frame();
+    }
+    const redoMs = performance.now() - start;
+    const redone = column.textContent.includes(title);
+
+    return {moveMs, moved, undoMs, undone, redoMs, redone, moveWrites};
+}
+"""
+
+
+def _skipped(reason: str) -> dict:
+    return {
+        "available": False,
+        "earned": 0,
+        "possible": 0,
+        "details": [f"- Browser benchmark skipped: {reason}"],
+        "measurements": []
+    }
+
+
+def ratio_score(ms: float, budget: float, points: int) -> int:
+    """Points for a measurement against its budget."""
+    fraction = (ZERO_CREDIT_RATIO - ms / budget) / (ZERO_CREDIT_RATIO - 1.0)
+    return round(points * max(0.0, min(1.0, fraction)))
+
+
+def _find_card_list(value, path=()) -> Optional[tuple]:
+    """Return (path to the list holding the probe card, card) in parsed state."""
+    if isinstance(value, list):
+        for item in value:
+            if isinstance(item, dict) and any(
+                    isinstance(v, str) and PROBE in v for v in item.values()):
+                return path, item
+        items = enumerate(value)
+    elif isinstance(value, dict):
+        items = value.items()
+    else:
+        return None
+    for key, item in items:
+        found = _find_card_list(item, path + (key,))
+        if found:
+            return found
+    return None
+
+
+def _clone_card(template: dict, index: int, title: str) -> dict:
+    card = copy.deepcopy(template)
+    for key, value in template.items():
+        if isinstance(value, str) and PROBE in value:
+            card[key] = value.replace(PROBE, title)
+        elif key.lower() in ID_KEYS:
+            if isinstance(value, bool):
+                continue
+            card[key] = 10_000_000 + index if isinstance(value, (int, float)) else title
+    return card
+
+
+def seed_state(state, path: tuple, template: dict, count: int):
+    """Copy of the discovered state with count cards in the probe card's list."""
+    seeded = copy.deepcopy(state)
+    container = seeded
+    for key in path[:-1]:
+        container = container[key]
+    cards = [_clone_card(template, i, card_title(i)) for i in range(count)]
+    if path:
+        container[path[-1]] = cards
+    else:
+        seeded = cards
+    return seeded
+
+
+def card_title(index: int) -> str:
+    return f"bench-card-{index:05d}"
+
+
+def discover_schema(page, url: str) -> tuple:
+    """
+    Add a probe card through the UI and find it in localStorage.
+
+    Returns (storage_key, state, path, card) or raises RuntimeError.
+    """
+    page.on("dialog", lambda dialog: dialog.accept(PROBE))
+    page.goto(url)
+
+    field = page.locator(
+        "input[type=text]:visible, input:not([type]):visible, textarea:visible").first
+    if field.count():
+        field.fill(PROBE)
+        field.press("Enter")
+        page.wait_for_timeout(200)
+    if PROBE not in page.content():
+        button = page.locator("button:visible", has_text=re.compile(r"add|\+", re.I)).first
+        if not button.count():
+            raise RuntimeError("no way to add a card found")
+        button.click()
+        page.wait_for_timeout(200)
+
+    storage = page.evaluate("() => Object.fromEntries(Object.entries(localStorage))")
+    for key, raw in storage.items():
+        if PROBE not in raw:
+            continue
+        try:
+            state = json.loads(raw)
+        except ValueError:
+            continue
+        found = _find_card_list(state)
+        if found:
+            return key, state, found[0], found[1]
+    raise RuntimeError("added card not found in localStorage as JSON")
+
+
+def measure_board(browser, url: str, schema: tuple, count: int) -> dict:
+    """Seed a fresh context with count cards and take every measurement."""
+    key, state, path, template = schema
+    seeded = json.dumps(seed_state(state, path, template, count))
+    context = browser.new_context()
+    page = context.new_page()
+    try:
+        page.add_init_script(SEED_SCRIPT % (json.dumps(key), json.dumps(seeded)))
+        page.add_init_script(INIT_SCRIPT)
+        page.goto(url, wait_until="commit")
+        last = card_title(count - 1)
+        handle = page.wait_for_function(
+            "(t) => document.body && document.body.textContent.includes(t) && performance.now()",
+            arg=last, polling="raf", timeout=30000
+        )
+        measurement = {"cards": count, "render_ms": handle.json_value()}
+
+        outcome = page.evaluate(MOVE_SCRIPT, card_title(0))
+        if "error" in outcome:
+            measurement["error"] = outcome["error"]
+            return measurement
+
+        measurement.update({
+            "move_ms": outcome["moveMs"] if outcome["moved"] else None,
+            "undo_redo_ms": (outcome["undoMs"] + outcome["redoMs"]
+                             if outcome["undone"] and outcome["redone"] else None),
+            "storage_write_ms": max((w["ms"] for w in outcome["moveWrites"]), default=None),
+            "storage_bytes": max((w["bytes"] for w in outcome["moveWrites"]), default=0),
+        })
+        return measurement
+    finally:
+        context.close()
+
+
+def evaluate_browser(html_path: str) -> dict:
+    """Run the browser benchmark and return scores and measurements."""
+    try:
+        from playwright.sync_api import Error as PlaywrightError, sync_playwright
+    except ImportError:
+        return _skipped("Playwright not installed")
+
+    url = Path(html_path).resolve().as_uri()
+    results = {
+        "available": True,
+        "earned": 0,
+        "possible": sum(m[2] for m in METRICS) * len(CARD_COUNTS),
+        "details": [],
+        "measurements": []
+    }
+
+    with sync_playwright() as p:
+        try:
+            browser = p.chromium.launch(headless=True)
+        except PlaywrightError as e:
+            return _skipped(f"Chromium not available ({str(e).splitlines()[0]})")
+
+        try:
+            context = browser.new_context()
+            try:
+                schema = discover_schema(context.new_page(), url)
+            except (RuntimeError, PlaywrightError) as e:
+                results["details"].append(f"✗ browser: could not seed board - {e}")
+                return results
+            finally:
+                context.close()
+
+            for count in CARD_COUNTS:
+                try:
+                    measurement = measure_board(browser, url, schema, count)
+                except PlaywrightError as e:
+                    measurement = {"cards": count, "error": str(e).splitlines()[0]}
+                results["measurements"].append(measurement)
+                _score_board(results, measurement)
+        finally:
+            browser.close()
+
+    return results
+
+
+def _score_board(results: dict, measurement: dict):
+    count = measurement["cards"]
+    for metric, desc, points, budgets in METRICS:
+        budget = budgets[count]
+        ms = measurement.get(metric)
+        if ms is None:
+            reason = measurement.get("error") or MISSING.get(metric, "did not take effect")
+            results["details"].append(f"✗ browser: {desc}, {count} cards (0/{points} pts) - {reason}")
+            continue
+        earned = ratio_score(ms, budget, points)
+        results["earned"] += earned
+        mark = "✓" if earned == points else ("◐" if earned else "✗")
+        results["details"].append(
+            f"{mark} browser: {desc}, {count} cards - {ms:.1f} ms "
+            f"(budget {budget} ms, {earned}/{points} pts)"
+        )
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python browser_bench.py <kanban.html>")
+        sys.exit(1)
+
+    results = evaluate_browser(sys.argv[1])
+    for detail in results["details"]:
+        print(f"  {detail}")
+    if results["available"]:
+        print(f"\nBrowser Benchmark Score: {results['earned']}/{results['possible']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,177 @@ Static analysis + optional browser automation (if Playwright available)
 """
 
 import json
-import re
 import sys
 from pathlib import Path
 
+from browser_bench import evaluate_browser
+from feature_index import FeatureIndex, build_index
+from render_cost import PERFORMANCE_POINTS, analyze_render_cost
+
+
+# Declarative scoring rules over the feature index. Each check is satisfied
+# if any of its keys is present. Tiers are tried in order; a condition is
+# either a minimum number of satisfied checks or a tuple of check names that
+# must all be satisfied. Messages may use {count}.
+RULES = [
+    {
+        "name": "columns",
+        "checks": {
+            "todo": {"word:todo", "word:to-do", "word:to_do"},
+            "in_progress": {"word:inprogress", "word:in-progress", "word:doing", "word:wip"},
+            "done": {"word:done", "word:complete", "word:completed", "word:finished"},
+        },
+        "tiers": [
+            (3, 5, "✓ Three columns detected"),
+            (0, 0, "✗ Only {count}/3 columns detected"),
+        ],
+    },
+    {
+        "name": "drag_drop",
+        "checks": {
+            "dragstart": {"event:dragstart", "word:dragstart"},
+            "dragover": {"event:dragover", "word:dragover"},
+            "drop": {"event:drop", "word:drop"},
+            "dragend": {"event:dragend", "word:dragend"},
+            "draggable": {"attr:draggable", "word:draggable"},
+        },
+        "tiers": [
+            (4, 20, "✓ Drag and drop events implemented"),
+            (2, 10, "◐ Partial drag and drop implementation"),
+            (0, 0, "✗ Drag and drop not detected"),
+        ],
+    },
+    {
+        "name": "persistence",
+        "checks": {
+            "storage": {"word:localstorage"},
+            "set": {"api:localstorage.setitem", "word:setitem"},
+            "get": {"api:localstorage.getitem", "word:getitem"},
+        },
+        "tiers": [
+            (("storage", "set", "get"), 10, "✓ LocalStorage persistence implemented"),
+            (("storage",), 5, "◐ LocalStorage mentioned but incomplete"),
+            (0, 0, "✗ LocalStorage not detected"),
+        ],
+    },
+    {
+        "name": "undo_redo",
+        "checks": {
+            "undo": {"word:undo", "word:ctrl+z", "word:ctrlz", "word:meta+z"},
+            "redo": {"word:redo", "word:ctrl+y", "word:ctrly", "word:ctrl+shift+z"},
+            "history": {"word:history", "word:stack", "word:actionlog"},
+        },
+        "tiers": [
+            (("undo", "redo", "history"), 15, "✓ Undo/Redo with history stack"),
+            (("undo", "redo"), 10, "◐ Undo/Redo detected but history unclear"),
+            (("undo",), 5, "◐ Only undo detected, no redo"),
+            (0, 0, "✗ Undo/Redo not detected"),
+        ],
+    },
+    {
+        "name": "inline_edit",
+        "checks": {
+            "edit": {"event:dblclick", "word:dblclick", "word:doubleclick",
+                     "attr:contenteditable", "word:contenteditable",
+                     "word:inputedit", "word:editmode"},
+        },
+        "tiers": [
+            (1, 10, "✓ Inline editing detected"),
+            (0, 0, "✗ Inline editing not detected"),
+        ],
+    },
+    {
+        "name": "keyboard",
+        "checks": {
+            "keydown": {"event:keydown", "word:keydown"},
+            "keyup": {"event:keyup", "word:keyup"},
+            "keypress": {"event:keypress", "word:keypress"},
+            "keyboard": {"word:keyboard"},
+            "tabindex": {"attr:tabindex", "word:tabindex"},
+        },
+        "tiers": [
+            (2, 5, "✓ Keyboard navigation detected"),
+            (0, 0, "✗ Keyboard navigation not detected"),
+        ],
+    },
+    {
+        "name": "animations",
+        "checks": {
+            "transition": {"css:transition", "word:transition"},
+            "animation": {"css:animation", "word:animation"},
+            "keyframes": {"at:@keyframes"},
+            "transform": {"css:transform", "word:transform"},
+        },
+        "tiers": [
+            (2, 10, "✓ CSS animations/transitions detected"),
+            (1, 5, "◐ Some CSS animation detected"),
+            (0, 0, "✗ No CSS animations detected"),
+        ],
+    },
+    {
+        "name": "responsive",
+        "checks": {
+            "media": {"at:@media"},
+            "flex": {"word:flex"},
+            "grid": {"word:grid"},
+            "min_width": {"css:min-width", "word:min-width"},
+            "max_width": {"css:max-width", "word:max-width"},
+            "viewport": {"word:viewport"},
+        },
+        "tiers": [
+            (2, 5, "✓ Responsive design detected"),
+            (0, 0, "✗ Responsive design not detected"),
+        ],
+    },
+    {
+        "name": "accessibility",
+        "checks": {
+            "aria": {"aria:any"},
+            "role": {"attr:role"},
+            "alt": {"attr:alt"},
+            "label": {"tag:label", "word:label"},
+        },
+        "tiers": [
+            (2, 5, "✓ Accessibility features detected"),
+            (0, 0, "✗ Accessibility features not detected"),
+        ],
+    },
+    {
+        "name": "add_cards",
+        "checks": {
+            "add": {"word:addcard", "word:createcard", "word:newcard",
+                    "word:appendchild", "word:insertbefore"},
+        },
+        "tiers": [
+            (1, 10, "✓ Add card functionality detected"),
+            (0, 0, "✗ Add card functionality not detected"),
+        ],
+    },
+    {
+        "name": "delete_cards",
+        "checks": {
+            "delete": {"word:delete", "word:removecard", "word:removechild"},
+        },
+        "tiers": [
+            (1, 5, "✓ Delete card functionality detected"),
+            (0, 0, "✗ Delete card functionality not detected"),
+        ],
+    },
+]
+
+
+def evaluate_rule(index: FeatureIndex, rule: dict) -> tuple:
+    """Return (points, message) for the first tier the index satisfies."""
+    satisfied = {name for name, keys in rule["checks"].items() if index.any(keys)}
+    for condition, points, message in rule["tiers"]:
+        if isinstance(condition, tuple):
+            met = satisfied.issuperset(condition)
+        else:
+            met = len(satisfied) >= condition
+        if met:
+            return points, message.format(count=len(satisfied))
+    return 0, ""
+
 
 def analyze_html(html_content: str) -> dict:
     """Analyze HTML file for required features."""
@@ -18,146 +185,29 @@ def analyze_html(html_content: str) -> dict:
         "warnings": []
     }
 
+    index = build_index(html_content)
+
     # Check for external dependencies (should be none)
-    external_patterns = [
-        r'<script\s+src=[\'"](http|https|//)',
-        r'<link\s+.*href=[\'"](http|https|//)',
-        r'import\s+.*from\s+[\'"]http',
-    ]
-    for pattern in external_patterns:
-        if re.search(pattern, html_content, re.IGNORECASE):
-            results["warnings"].append("⚠ External dependency detected - should be self-contained")
-
-    # Check three columns
-    column_patterns = [
-        r'todo|to-do|to_do',
-        r'in[-_\s]?progress|doing|wip',
-        r'done|complete|finished'
-    ]
-    columns_found = sum(1 for p in column_patterns if re.search(p, html_content, re.IGNORECASE))
-    if columns_found >= 3:
-        results["scores"]["columns"] = 5
-        results["details"].append("✓ Three columns detected")
-    else:
-        results["scores"]["columns"] = 0
-        results["details"].append(f"✗ Only {columns_found}/3 columns detected")
-
-    # Check drag and drop
-    drag_events = ['dragstart', 'dragover', 'drop', 'dragend', 'draggable']
-    drag_found = sum(1 for e in drag_events if e in html_content.lower())
-    if drag_found >= 4:
-        results["scores"]["drag_drop"] = 20
-        results["details"].append("✓ Drag and drop events implemented")
-    elif drag_found >= 2:
-        results["scores"]["drag_drop"] = 10
-        results["details"].append("◐ Partial drag and drop implementation")
-    else:
-        results["scores"]["drag_drop"] = 0
-        results["details"].append("✗ Drag and drop not detected")
-
-    # Check localStorage
-    if 'localStorage' in html_content:
-        if 'setItem' in html_content and 'getItem' in html_content:
-            results["scores"]["persistence"] = 10
-            results["details"].append("✓ LocalStorage persistence implemented")
-        else:
-            results["scores"]["persistence"] = 5
-            results["details"].append("◐ LocalStorage mentioned but incomplete")
-    else:
-        results["scores"]["persistence"] = 0
-        results["details"].append("✗ LocalStorage not detected")
-
-    # Check undo/redo
-    undo_patterns = ['undo', 'ctrl+z', 'ctrlz', 'meta+z']
-    redo_patterns = ['redo', 'ctrl+y', 'ctrly', 'ctrl+shift+z']
-    has_undo = any(p in html_content.lower() for p in undo_patterns)
-    has_redo = any(p in html_content.lower() for p in redo_patterns)
-    if has_undo and has_redo:
-        # Check for history/stack implementation
-        if re.search(r'(history|stack|undo.*stack|action.*log)', html_content, re.IGNORECASE):
-            results["scores"]["undo_redo"] = 15
-            results["details"].append("✓ Undo/Redo with history stack")
-        else:
-            results["scores"]["undo_redo"] = 10
-            results["details"].append("◐ Undo/Redo detected but history unclear")
-    elif has_undo:
-        results["scores"]["undo_redo"] = 5
-        results["details"].append("◐ Only undo detected, no redo")
-    else:
-        results["scores"]["undo_redo"] = 0
-        results["details"].append("✗ Undo/Redo not detected")
-
-    # Check inline editing
-    edit_patterns = ['dblclick', 'double-click', 'contenteditable', 'input.*edit', 'edit.*mode']
-    if any(p in html_content.lower() for p in edit_patterns):
-        results["scores"]["inline_edit"] = 10
-        results["details"].append("✓ Inline editing detected")
-    else:
-        results["scores"]["inline_edit"] = 0
-        results["details"].append("✗ Inline editing not detected")
-
-    # Check keyboard navigation
-    keyboard_patterns = ['keydown', 'keyup', 'keypress', 'keyboard', 'tabindex']
-    if sum(1 for p in keyboard_patterns if p in html_content.lower()) >= 2:
-        results["scores"]["keyboard"] = 5
-        results["details"].append("✓ Keyboard navigation detected")
-    else:
-        results["scores"]["keyboard"] = 0
-        results["details"].append("✗ Keyboard navigation not detected")
-
-    # Check CSS animations/transitions
-    css_patterns = ['transition', 'animation', '@keyframes', 'transform']
-    css_found = sum(1 for p in css_patterns if p in html_content.lower())
-    if css_found >= 2:
-        results["scores"]["animations"] = 10
-        results["details"].append("✓ CSS animations/transitions detected")
-    elif css_found >= 1:
-        results["scores"]["animations"] = 5
-        results["details"].append("◐ Some CSS animation detected")
-    else:
-        results["scores"]["animations"] = 0
-        results["details"].append("✗ No CSS animations detected")
-
-    # Check responsive design
-    responsive_patterns = ['@media', 'flex', 'grid', 'min-width', 'max-width', 'viewport']
-    if sum(1 for p in responsive_patterns if p in html_content.lower()) >= 2:
-        results["scores"]["responsive"] = 5
-        results["details"].append("✓ Responsive design detected")
-    else:
-        results["scores"]["responsive"] = 0
-        results["details"].append("✗ Responsive design not detected")
-
-    # Check accessibility
-    a11y_patterns = ['aria-', 'role=', 'alt=', 'label']
-    if sum(1 for p in a11y_patterns if p in html_content.lower()) >= 2:
-        results["scores"]["accessibility"] = 5
-        results["details"].append("✓ Accessibility features detected")
-    else:
-        results["scores"]["accessibility"] = 0
-        results["details"].append("✗ Accessibility features not detected")
-
-    # Check add functionality
-    if re.search(r'add.*card|create.*card|new.*card|appendChild|insertBefore', html_content, re.IGNORECASE):
-        results["scores"]["add_cards"] = 10
-        results["details"].append("✓ Add card functionality detected")
-    else:
-        results["scores"]["add_cards"] = 0
-        results["details"].append("✗ Add card functionality not detected")
-
-    # Check delete functionality
-    if re.search(r'delete|remove.*card|removeChild', html_content, re.IGNORECASE):
-        results["scores"]["delete_cards"] = 5
-        results["details"].append("✓ Delete card functionality detected")
-    else:
-        results["scores"]["delete_cards"] = 0
-        results["details"].append("✗ Delete card functionality not detected")
+    if index.external:
+        results["warnings"].append("⚠ External dependency detected - should be self-contained")
+
+    for rule in RULES:
+        points, message = evaluate_rule(index, rule)
+        results["scores"][rule["name"]] = points
+        results["details"].append(message)
+
+    # Render-cost rule pack, with line references for each finding
+    render_cost = analyze_render_cost(index)
+    results["scores"]["render_performance"] = render_cost["earned"]
+    results["details"].extend(render_cost["details"])
+    results["render_cost"] = render_cost["findings"]
 
     return results
 
 
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python evaluate_p3.py <kanban.html>")
+        print("Usage: python evaluate_p3.py <kanban.html> [--skip-browser]")
         sys.exit(1)
 
     html_path = Path(sys.argv[1])
@@ -189,7 +239,7 @@ def main():
 
     # Calculate total
     total = sum(results["scores"].values())
-    max_score = 100
+    max_score = 100 + PERFORMANCE_POINTS
 
     print("\nScore Breakdown:")
     for category, score in results["scores"].items():
@@ -197,6 +247,16 @@ def main():
 
     print(f"\nStatic Analysis Score: {total}/{max_score}")
 
+    # Optional browser benchmark, scored separately from static analysis
+    browser = None
+    if "--skip-browser" not in sys.argv[2:]:
+        print("\nBrowser Benchmark (headless Chromium):")
+        browser = evaluate_browser(str(html_path))
+        for detail in browser["details"]:
+            print(f"  {detail}")
+        if browser["available"]:
+            print(f"\nBrowser Benchmark Score: {browser['earned']}/{browser['possible']}")
+
     print("\n" + "=" * 60)
     print("IMPORTANT: This is static analysis only.")
     print("Manual testing is required to verify actual functionality.")
@@ -227,6 +287,8 @@ def main():
             "max_score": max_score,
             "breakdown": results["scores"],
             "details": results["details"],
+            "render_cost": results["render_cost"],
+            "browser": browser,
             "note": "Manual testing required for full evaluation"
         }, f, indent=2)
 
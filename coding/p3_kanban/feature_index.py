@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+"""
+Feature index for Problem 3 static analysis.
+
+Scoring rules are set lookups over namespaced keys:
+
+    word:<w>     lowercased word, identifier part or compound ("undo", "addcard")
+    tag:<t>      element names
+    attr:<a>     attribute names ("draggable", "tabindex", "role")
+    aria:<a>     ARIA attributes, plus "aria:any"
+    role:<r>     role="..." values
+    event:<e>    events from on* attributes, .on* assignments, addEventListener
+    api:<a.b>    dotted member accesses ("localstorage.setitem")
+    css:<p>      CSS property names
+    at:<@r>      CSS at-rules ("@media", "@keyframes")
+
+Boards can be megabytes of prose or bundled script, so build_index() never
+runs Python code per token or per text node. Regexes cut the document into
+comments, <script>/<style> bodies, and alternating text and tags. The
+attributes of every distinct start tag come from one more regex scan that
+follows html.parser's tolerant attribute syntax; Python code runs once per
+such attribute, and once per tag only when some tags have handlers, inline
+styles or remote sources that need line numbers. Structural keys are stored
+as they are found.
+
+word: and api: keys are answered when first asked for, and cached:
+
+    a whole token         all bodies go through one bytes.translate()
+                          that turns every non-token character into a
+                          space; a set lookup of the prose words, then a
+                          substring search of the code for " token "
+    identifier parts      substring search, then with -_+ allowed between
+                          letters, confirmed on the enclosing token's
+                          camelCase and -_+ parts ("undo" in handleUndo,
+                          "todo" in to-do)
+    neighbouring words    in prose only, within PAIR_WINDOW words; one
+                          literal-prefixed regex search per split of the
+                          key whose halves are both prose words
+    api:a.b               substring search of the scripts, checked at
+                          identifier boundaries
+
+The first line on which each key appears is available for reporting.
+"""
+
+import re
+from bisect import bisect
+from html import unescape
+from itertools import accumulate
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+# Ordered pairs of words within this distance are indexed joined together,
+# so "Add card" and "add a new card" both yield "addcard"
+PAIR_WINDOW = 3
+
+SEPARATORS = b"-_+"
+TOKEN_CHARS = set(b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789" + SEPARATORS)
+TOKEN_TABLE = bytes(c if c in TOKEN_CHARS else 32 for c in range(256))
+CAMEL_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+")
+SEPARATOR_RE = re.compile(r"[-_+]")
+IDENTIFIER_CHARS = set("abcdefghijklmnopqrstuvwxyz0123456789_$")
+
+# Prose pieces are joined with PAIR_WINDOW sentinel words between them, so
+# no pair spans two text nodes, attribute values or literals
+SENTINEL = "\x00"
+PROSE_SEPARATOR = " " + " ".join(SENTINEL * PAIR_WINDOW) + " "
+PROSE_WORD = r"(?:[a-z0-9]+(?:[-_+][a-z0-9]+)*|\x00)"
+PROSE_GAP = r"[^a-z0-9\x00]+"
+
+# Comments and raw-text elements, found in the lowercased document
+RAW_START_RE = re.compile(r"<(?:!--|script\b|style\b)")
+RAW_END = {"<!--": "-->", "<script": "</script", "<style": "</style"}
+# Split on tags, so text nodes and tags alternate
+TAG_SPLIT_RE = re.compile(
+    r"(</?[A-Za-z][^\t\n\f\r />]*[^>\"']*(?:(?:\"[^\"]*\"|'[^']*')[^>\"']*)*>"
+    r"|<![^>]*>|<\?[^>]*>)")
+START_TAG_RE = re.compile(r"<[a-z][^\t\n\f\r />]*[^>\"']*(?:(?:\"[^\"]*\"|'[^']*')[^>\"']*)*>")
+# Over start tags each prefixed with a NUL: a tag's name, or one of its
+# attributes with the raw value
+ATTRIBUTE_RE = re.compile(
+    r"\x00<([A-Za-z][^\t\n\f\r />]*)"
+    r"|([^\s\x00\"'/>=][^\s/>=]*)(?:\s*=+\s*(?:\"([^\"]*)\"|'([^']*)'|([^\s>\"']*)))?")
+NEWLINE_RE = re.compile("\n")
+# Besides on* handlers, attributes whose values are more than words
+SPECIAL_ATTRIBUTES = {"role", "style", "src", "href"}
+
+# Comment and string literals are the only JavaScript constructs pulled
+# out with a regex; those with spaces in them count as prose
+JS_LITERAL_RE = re.compile(
+    r"//[^\n]*|/\*.*?\*/"
+    r"|'[^'\\\n]*(?:\\.[^'\\\n]*)*'"
+    r'|"[^"\\\n]*(?:\\.[^"\\\n]*)*"'
+    r"|`[^`\\]*(?:\\.[^`\\]*)*`",
+    re.DOTALL)
+JS_ON_MEMBER_RE = re.compile(r"\.on([A-Za-z]+)(?![\w$])")
+JS_LISTENER_RE = re.compile(r"""addEventListener\s*\(\s*['"`]([\w-]+)""")
+ARIA_TOKEN_RE = re.compile(rb" aria-[^ ]*")
+
+CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+CSS_AT_RE = re.compile(r"@[A-Za-z-]+")
+CSS_PROPERTY_RE = re.compile(r"[{;]\s*(-?[A-Za-z][A-Za-z-]*)\s*:")
+
+EXTERNAL_RE = re.compile(r"^\s*(https?:|//)", re.IGNORECASE)
+JS_IMPORT_RE = re.compile(r"""import\b[^'"\n;]{0,200}from\s*['"](https?:|//)""")
+
+DOM_EVENTS = {
+    "click", "dblclick", "mousedown", "mouseup", "mousemove", "mouseover",
+    "mouseout", "mouseenter", "mouseleave", "contextmenu", "keydown", "keyup",
+    "keypress", "input", "change", "submit", "focus", "blur", "focusin",
+    "focusout", "drag", "dragstart", "dragend", "dragenter", "dragleave",
+    "dragover", "drop", "touchstart", "touchmove", "touchend", "pointerdown",
+    "pointerup", "pointermove", "load", "unload", "beforeunload",
+    "domcontentloaded", "resize", "scroll", "storage", "transitionend",
+    "animationend", "wheel",
+}
+
+
+def _ascii(text: str) -> bytes:
+    # Non-ASCII characters never belong to a word; "?" keeps them apart
+    return text.encode("ascii", "replace")
+
+
+def _parts(token: str) -> List[str]:
+    """Lowercased camelCase and -_+ parts of a token."""
+    return [p.lower() for part in SEPARATOR_RE.split(token) for p in CAMEL_RE.findall(part)]
+
+
+def _joins_parts(token: str, word: str) -> bool:
+    """True if word is a run of consecutive parts of token, joined."""
+    parts = _parts(token)
+    for i in range(len(parts)):
+        joined = ""
+        for part in parts[i:]:
+            joined += part
+            if joined == word:
+                return True
+            if not word.startswith(joined):
+                break
+    return False
+
+
+class _Vocabulary:
+    """Tokens of every queued body, and the prose text for pairs."""
+
+    def __init__(self, code: List[str], prose: List[str]):
+        code_data = b" " + _ascii("\n".join(code))
+        data = code_data + b"\n" + _ascii("\n".join(prose)) + b" "
+        # Tokens between spaces; text and lower share positions
+        self.text = data.translate(TOKEN_TABLE)
+        self._prose_start = len(code_data)
+        self.lower = self.text.lower()
+        self.joined = self.lower.translate(None, SEPARATORS)
+        self.aria = {t[1:].decode() for t in ARIA_TOKEN_RE.findall(self.lower)}
+        self.prose_pieces = prose
+        self._prose: Optional[str] = None
+        self._prose_words: Optional[Set[bytes]] = None
+
+    def prose(self) -> Tuple[str, Set[bytes]]:
+        if self._prose is None:
+            self._prose = PROSE_SEPARATOR.join(self.prose_pieces).lower()
+            self._prose_words = set(self.lower[self._prose_start:].split())
+        return self._prose, self._prose_words
+
+    def has_letters(self, word: bytes) -> bool:
+        """word, ignoring -_+, appears at all; needed by tokens and part runs."""
+        return word.translate(None, SEPARATORS) in self.joined
+
+    def has_token(self, word: bytes) -> bool:
+        if word in self.prose()[1]:
+            return True
+        needle = b" " + word + b" "
+        return self.lower.find(needle, 0, self._prose_start + len(needle)) >= 0
+
+    def has_part_run(self, word: bytes) -> bool:
+        """word is consecutive parts of some token (a part, or joined ones)."""
+        lower = self.lower
+        checked = set()
+        # Within one part first, then across -_+ separators
+        pos = lower.find(word)
+        while pos >= 0:
+            if self._token_joins(pos, word, checked):
+                return True
+            pos = lower.find(word, lower.find(b" ", pos))
+        spaced = re.compile(b"[-_+]?".join(re.escape(word[i:i + 1]) for i in range(len(word))))
+        return any(self._token_joins(m.start(), word, checked) for m in spaced.finditer(lower))
+
+    def _token_joins(self, pos: int, word: bytes, checked: Set[bytes]) -> bool:
+        start = self.lower.rfind(b" ", 0, pos) + 1
+        token = self.text[start:self.lower.find(b" ", pos)]
+        if token in checked:
+            return False
+        checked.add(token)
+        return _joins_parts(token.decode(), word.decode())
+
+    def has_prose_pair(self, word: str) -> bool:
+        """word is two prose words at most PAIR_WINDOW apart, joined."""
+        prose, words = self.prose()
+        for i in range(1, len(word)):
+            first, second = word[:i], word[i:]
+            if first.encode() not in words or second.encode() not in words:
+                continue
+            pattern = re.compile(
+                re.escape(first) + f"(?:{PROSE_GAP}{PROSE_WORD}){{0,{PAIR_WINDOW - 1}}}"
+                + PROSE_GAP + re.escape(second) + r"(?![-_+]?[a-z0-9])")
+            m = pattern.search(prose)
+            while m:
+                start = m.start()
+                if start == 0 or prose[start - 1] not in "abcdefghijklmnopqrstuvwxyz0123456789-_+":
+                    return True
+                m = pattern.search(prose, start + 1)
+        return False
+
+
+class FeatureIndex:
+    """
+    Namespaced feature keys with first-seen locations.
+
+    Structural keys (tags, attributes, events, CSS) are stored in keys as
+    they are added. Bodies passed to add_words/add_javascript/add_css are
+    queued; word: and api: lookups search them (see the module docstring)
+    and cache the answer. Origins are a line number or (block, needle),
+    resolved to a line number only when asked for.
+    """
+
+    def __init__(self):
+        self.keys: Set[str] = set()
+        self.external: List[Tuple[int, str]] = []
+        # (first line, source) for every inline script, for rule packs that
+        # need more than key presence
+        self.scripts: List[Tuple[int, str]] = []
+        # (line, event, source) for on* attribute handlers
+        self.handlers: List[Tuple[int, str, str]] = []
+        self._origins: Dict[str, Union[int, Tuple[int, str]]] = {}
+        self._blocks: List[Tuple[int, str]] = []
+        self._code: List[str] = []
+        self._prose: List[str] = []
+        self._vocabulary: Optional[_Vocabulary] = None
+        self._code_text: Optional[str] = None
+        self._answers: Dict[str, bool] = {}
+
+    def add(self, key: str, origin: Union[int, Tuple[int, str]]):
+        if key not in self.keys:
+            self.keys.add(key)
+            self._origins[key] = origin
+
+    def _queued(self) -> _Vocabulary:
+        """Vocabulary of everything queued so far, built on first use."""
+        if self._vocabulary is None:
+            if self._code:
+                code = "\n".join(source for _, source in self.scripts)
+                for member in set(JS_ON_MEMBER_RE.findall(code)):
+                    if member.lower() in DOM_EVENTS:
+                        self.add(f"event:{member.lower()}", (-1, f"on{member}"))
+            prose = self._prose + [literal for _, source in self.scripts if " " in source
+                                   for literal in JS_LITERAL_RE.findall(source) if " " in literal]
+            self._vocabulary = _Vocabulary(self._code, prose)
+            for aria in self._vocabulary.aria:
+                self.add(f"aria:{aria}", (-1, aria))
+                self.add("aria:any", (-1, aria))
+        return self._vocabulary
+
+    def _invalidate(self):
+        self._vocabulary = None
+        self._code_text = None
+        self._answers.clear()
+
+    def _has_word(self, word: str) -> bool:
+        vocabulary = self._queued()
+        token = _ascii(word)
+        return (vocabulary.has_token(token)
+                or (vocabulary.has_letters(token) and vocabulary.has_part_run(token))
+                or vocabulary.has_prose_pair(word))
+
+    def _has_api(self, access: str) -> bool:
+        if self._code_text is None:
+            self._code_text = "\n".join(source for _, source in self.scripts).lower()
+        code = self._code_text
+        pos = code.find(access)
+        while pos >= 0:
+            end = pos + len(access)
+            if ((pos == 0 or code[pos - 1] not in IDENTIFIER_CHARS)
+                    and (end == len(code) or code[end] not in IDENTIFIER_CHARS)):
+                return True
+            pos = code.find(access, pos + 1)
+        return False
+
+    def has(self, key: str) -> bool:
+        self._queued()
+        if key in self.keys:
+            return True
+        if key not in self._answers:
+            kind, _, value = key.partition(":")
+            if kind == "word":
+                self._answers[key] = self._has_word(value)
+            elif kind == "api":
+                self._answers[key] = self._has_api(value)
+            else:
+                self._answers[key] = False
+        return self._answers[key]
+
+    def any(self, keys) -> bool:
+        return any(self.has(key) for key in keys)
+
+    def line_of(self, key: str) -> int:
+        """First line on which a key was seen, or 0 if it never was."""
+        if not self.has(key):
+            return 0
+        origin = self._origins.get(key)
+        if isinstance(origin, int):
+            return origin
+        if origin is not None:
+            block, needle = origin
+            return self._find(needle, block)
+        # word: and api: keys; a compound or pair is found by its halves
+        needle = key.partition(":")[2]
+        line = self._find(needle)
+        for i in range(1, len(needle)):
+            if line or not key.startswith("word:"):
+                break
+            pattern = re.compile(
+                re.escape(needle[:i]) + f"(?:[^A-Za-z0-9]+[A-Za-z0-9]+){{0,{PAIR_WINDOW - 1}}}"
+                + "[^A-Za-z0-9]*" + re.escape(needle[i:]), re.IGNORECASE)
+            line = self._find(pattern)
+        return line
+
+    def _find(self, needle: Union[str, re.Pattern], block: int = -1) -> int:
+        """Line of needle in a block (-1: the whole document), or 0."""
+        if not self._blocks:
+            return 0
+        line, text = self._blocks[max(block, 0)]
+        if isinstance(needle, re.Pattern):
+            m = needle.search(text)
+            pos = m.start() if m else -1
+        else:
+            pos = text.find(needle)
+            if pos < 0:
+                pos = text.lower().find(needle.lower())
+        if pos < 0:
+            return 0 if block < 0 else line
+        return line + text.count("\n", 0, pos)
+
+    def _block(self, text: str, line: int) -> int:
+        self._blocks.append((line, text))
+        return len(self._blocks) - 1
+
+    def add_words(self, text: str, line: int = 0, pairs: bool = True):
+        """
+        Queue free text, identifiers or string contents for word: lookups.
+
+        With pairs, neighbouring words also count joined together; that is
+        meant for prose, not for whole scripts.
+        """
+        (self._prose if pairs else self._code).append(text)
+        self._invalidate()
+
+    def add_javascript(self, source: str, line: int):
+        """Queue inline JavaScript and index its listeners."""
+        self.scripts.append((line, source))
+        if JS_IMPORT_RE.search(source):
+            self.external.append((line, "import from remote URL"))
+        self._code.append(source)
+        self._invalidate()
+
+        if "addEventListener" in source:
+            block = self._block(source, line)
+            for event in set(JS_LISTENER_RE.findall(source)):
+                self.add(f"event:{event.lower()}", (block, event))
+
+    def add_css(self, source: str, line: int, inline: bool = False):
+        """Index a stylesheet or style="" attribute."""
+        if inline:
+            source = "{" + source
+        source = CSS_COMMENT_RE.sub(" ", source)
+        block = self._block(source, line)
+
+        for rule in set(CSS_AT_RE.findall(source)):
+            self.add(f"at:{rule.lower()}", (block, rule))
+        for prop in set(CSS_PROPERTY_RE.findall(source)):
+            self.add(f"css:{prop.lower()}", (block, prop))
+        self._code.append(source)
+        self._invalidate()
+
+
+def _tag_lines(body: str, pieces: List[str], markups: Set[str]) -> Dict[str, List[int]]:
+    """Line of every occurrence of the given tags, from text/tag pieces."""
+    newlines = [m.start() for m in NEWLINE_RE.finditer(body)]
+    lines: Dict[str, List[int]] = {markup: [] for markup in markups}
+    for end, piece in zip(accumulate(map(len, pieces)), pieces):
+        if piece in lines:
+            lines[piece].append(bisect(newlines, end - len(piece)) + 1)
+    return lines
+
+
+def _index_tags(index: FeatureIndex, body: str, pieces: List[str], block: int):
+    """Keys of every distinct start tag; handlers and externals per occurrence."""
+    markups = [m for m in dict.fromkeys(pieces[1::2]) if m[1] not in "/!?"]
+    words = []
+    # Tag and attribute names are few: each is lowercased and keyed once
+    tags: Dict[str, str] = {}
+    names: Dict[str, str] = {}
+    # markup -> (name, value) of attributes that need the tag's lines
+    located: Dict[str, List[Tuple[str, str]]] = {}
+    position = -1
+    for tag_name, raw_name, double, single, bare in ATTRIBUTE_RE.findall(
+            "".join("\x00" + m for m in markups)):
+        if tag_name:
+            position += 1
+            markup = markups[position]
+            tag = tags.get(tag_name)
+            if tag is None:
+                tag = tags[tag_name] = tag_name.lower()
+                index.add(f"tag:{tag}", (block, markup))
+                words.append(tag)
+            continue
+
+        name = names.get(raw_name)
+        if name is None:
+            name = names[raw_name] = raw_name.lower()
+            index.add(f"attr:{name}", (block, markup))
+            words.append(name)
+            if name.startswith("aria-"):
+                index.add(f"aria:{name}", (block, markup))
+                index.add("aria:any", (block, markup))
+            if name.startswith("on") and len(name) > 2:
+                index.add(f"event:{name[2:]}", (block, markup))
+        value = double or single or bare
+
+        if name in SPECIAL_ATTRIBUTES or name.startswith("on"):
+            if name == "role":
+                index.add(f"role:{unescape(value).lower()}", (block, markup))
+            elif name == "style" or (len(name) > 2 and name.startswith("on")):
+                located.setdefault(markup, []).append((name, unescape(value)))
+                continue
+            elif name in ("src", "href") and EXTERNAL_RE.match(value):
+                if tag == "script" or (tag == "link" and name == "href"):
+                    located.setdefault(markup, []).append((name, unescape(value)))
+        words.append(value)
+
+    index.add_words(unescape(PROSE_SEPARATOR.join(words)))
+    if not located:
+        return
+    tag_lines = _tag_lines(body, pieces, set(located))
+    for markup, attributes in located.items():
+        lines = tag_lines[markup]
+        for name, value in attributes:
+            if name == "style":
+                index.add_css(value, lines[0], inline=True)
+            elif name in ("src", "href"):
+                index.external.extend((line, value) for line in lines)
+            else:
+                for line in lines:
+                    index.handlers.append((line, name[2:], value))
+                    index.add_javascript(value, line)
+
+
+def build_index(html_content: str) -> FeatureIndex:
+    """Build the feature index for an HTML document."""
+    index = FeatureIndex()
+    index._block(html_content, 1)
+    lower = html_content.lower()
+
+    # Cut out comments and raw-text bodies, keeping their line breaks so
+    # tag positions in what is left match the document
+    parts = []
+    last = 0
+    line = 1
+    m = RAW_START_RE.search(lower)
+    while m:
+        start = m.start()
+        opener = m.group()
+        if opener == "<!--":
+            end = lower.find("-->", start + 4)
+            end = len(lower) if end < 0 else end
+            start_tag_end = start + 4
+            resume = min(end + 3, len(lower))
+        else:
+            tag = START_TAG_RE.match(lower, start)
+            if tag is None:
+                m = RAW_START_RE.search(lower, start + 1)
+                continue
+            start_tag_end = tag.end()
+            end = lower.find(RAW_END[opener], start_tag_end)
+            end = len(lower) if end < 0 else end
+            close = lower.find(">", end)
+            resume = len(lower) if close < 0 else close + 1
+
+        parts.append(html_content[last:start])
+        line += html_content.count("\n", last, start)
+        content = html_content[start_tag_end:end]
+        start_tag = html_content[start:start_tag_end]
+        body_line = line + start_tag.count("\n")
+        if opener == "<!--":
+            index.add_words(content)
+        elif opener == "<script":
+            index.add_javascript(content, body_line)
+        else:
+            index.add_css(content, body_line)
+        kept = "" if opener == "<!--" else start_tag
+        parts.append(kept + "\n" * html_content.count("\n", start + len(kept), resume))
+        line += html_content.count("\n", start, resume)
+        last = resume
+        m = RAW_START_RE.search(lower, resume)
+    parts.append(html_content[last:])
+    body = "".join(parts)
+    block = index._block(body, 1)
+
+    # Text nodes, kept apart from each other by sentinel words, then tags
+    pieces = TAG_SPLIT_RE.split(body)
+    index.add_words(unescape(PROSE_SEPARATOR.join(pieces[::2])))
+    _index_tags(index, body, pieces, block)
+
+    # Handler scripts were added after the <script> bodies
+    index.scripts.sort(key=lambda script: script[0])
+    index._queued()
+    return index
@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+Render-cost rule pack for Problem 3: Kanban Board.
+
+Flags DOM-update patterns that make a board slow as it grows, using the
+inline scripts and handlers collected by the feature index:
+
+    full_rerender      innerHTML rebuilt by a looping function that many
+                       code paths call, i.e. the whole board on every change
+    stringify_on_drag  JSON.stringify reachable from a drag, move or scroll
+                       handler, i.e. the whole state serialized per event
+    layout_thrash      layout reads (offsetHeight, getBoundingClientRect...)
+                       inside a loop that also writes to the DOM
+    unbounded_undo     an undo/history stack that is pushed to but never
+                       trimmed
+
+Every rule that fires takes its penalty off the performance sub-score and
+reports the line it fired on.
+
+Usage: python render_cost.py kanban.html
+"""
+
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from feature_index import JS_LITERAL_RE, FeatureIndex, build_index
+
+PERFORMANCE_POINTS = 10
+
+# Events that fire many times per second while dragging or scrolling
+HOT_EVENTS = {
+    "drag", "dragover", "dragenter", "dragleave", "mousemove", "pointermove",
+    "touchmove", "scroll", "wheel",
+}
+
+# A looping function that rebuilds innerHTML and is called from at least
+# this many places is taken to re-render everything on every change
+RERENDER_CALLERS = 3
+
+# How many calls deep to follow from an event handler
+CALL_DEPTH = 3
+
+NON_NEWLINE_RE = re.compile(r"[^\n]")
+BRACE_RE = re.compile(r"[{}]")
+NAME = r"[A-Za-z_$][\w$]*"
+
+# Function definitions are found from their literal anchors ("function",
+# "=>") and the name they are assigned to is read backwards from there,
+# which keeps the scan fast on multi-megabyte bundles
+DEFINITION_RE = re.compile(r"function|=>")
+NAMED_FUNCTION_RE = re.compile(rf"\s*\*?\s*({NAME})\s*\([^)]*\)\s*\{{")
+ANONYMOUS_FUNCTION_RE = re.compile(r"\s*\*?\s*\([^)]*\)\s*\{")
+ARROW_BODY_RE = re.compile(r"\s*\{")
+METHOD_RE = re.compile(rf"^[ \t]*(?:async\s+|static\s+)?({NAME})\s*\([^()]*\)\s*\{{", re.MULTILINE)
+KEYWORDS = {"if", "for", "while", "switch", "catch", "function", "return", "with"}
+CALL_RE = re.compile(rf"(?<![\w$])({NAME})\s*\(")
+CALLBACK_RE = re.compile(
+    rf"\s*(?:async\s*)?(?:function\b[^{{]*|(?:\([^()]*\)|{NAME})\s*=>\s*)\{{")
+ARROW_EXPR_RE = re.compile(rf"\s*(?:async\s*)?(?:\([^()]*\)|{NAME})\s*=>")
+HANDLER_REF_RE = re.compile(rf"\s*(?:this\.)?({NAME})(?![\w$])(?!\s*\()")
+WHITESPACE_RE = re.compile(r"\s*")
+
+LISTENER_RE = re.compile(r"""addEventListener\s*\(\s*['"`]([\w-]+)['"`]\s*,""")
+ON_PROPERTY_RE = re.compile(r"\.on([a-z]+)\s*=(?!=)")
+STRINGIFY_RE = re.compile(r"\bJSON\s*\.\s*stringify\s*\(")
+INNERHTML_WRITE_RE = re.compile(r"\.innerHTML\s*\+?=(?!=)")
+INNERHTML_CLEAR_RE = re.compile(r"""\.innerHTML\s*=\s*(['"`])\1""")
+LOOP_RE = re.compile(r"(?:for|while)\s*\(|\.(?:forEach|map)\s*\(")
+LAYOUT_READ_RE = re.compile(
+    r"\.(?:offset|client|scroll)(?:Height|Width|Top|Left)\b(?!\s*=(?!=))"
+    r"|getBoundingClientRect\s*\(|getComputedStyle\s*\(|\.innerText\b(?!\s*=(?!=))")
+LAYOUT_READS = [
+    f"{kind}{side}" for kind in ("offset", "client", "scroll")
+    for side in ("Height", "Width", "Top", "Left")
+] + ["getBoundingClientRect", "getComputedStyle", "innerText"]
+DOM_WRITE_RE = re.compile(
+    r"\.style\.[\w$]+\s*=(?!=)|\.style\.(?:setProperty|cssText)"
+    r"|\.classList\.(?:add|remove|toggle)\s*\("
+    r"|\.(?:appendChild|insertBefore|removeChild|replaceChild|append|prepend|before|after|remove)\s*\("
+    r"|\.(?:innerHTML|textContent|innerText|className)\s*\+?=(?!=)"
+    r"|\.(?:scrollTop|scrollLeft)\s*=(?!=)|\.setAttribute\s*\(")
+STACK_PUSH_RE = re.compile(r"\.(?:push|unshift)\s*\(")
+STACK_NAME_RE = re.compile(r"undo|history|past", re.IGNORECASE)
+
+
+def _blank(text: str) -> str:
+    if "\n" not in text:
+        return " " * len(text)
+    return NON_NEWLINE_RE.sub(" ", text)
+
+
+def _is_name_char(c: str) -> bool:
+    return c.isalnum() or c in "_$"
+
+
+def _skip_space_back(text: str, pos: int) -> int:
+    while pos > 0 and text[pos - 1].isspace():
+        pos -= 1
+    return pos
+
+
+def _word_back(text: str, pos: int) -> int:
+    """Start of the identifier ending at pos."""
+    start = pos
+    while start > 0 and _is_name_char(text[start - 1]):
+        start -= 1
+    return start
+
+
+def _assigned_name(text: str, pos: int) -> Optional[Tuple[str, int]]:
+    """
+    Name in "name = <pos>" or "name: <pos>", skipping an async keyword.
+
+    Returns (name, offset) or None.
+    """
+    pos = _skip_space_back(text, pos)
+    if text[_word_back(text, pos):pos] == "async":
+        pos = _skip_space_back(text, _word_back(text, pos))
+    if pos == 0 or text[pos - 1] not in ":=" or (pos > 1 and text[pos - 2] in "=!<>+-*/%&|^?"):
+        return None
+    end = _skip_space_back(text, pos - 1)
+    start = _word_back(text, end)
+    if start == end or text[start].isdigit():
+        return None
+    return text[start:end], start
+
+
+def _chain_back(text: str, pos: int) -> int:
+    """Start of the dotted member chain ending at pos."""
+    start = _word_back(text, pos)
+    while start > 1 and text[start - 1] == "." and _is_name_char(text[start - 2]):
+        start = _word_back(text, start - 1)
+    return start
+
+
+def _arrow_params_start(text: str, pos: int) -> int:
+    """Start of the parameter list of an arrow whose "=>" is at pos."""
+    pos = _skip_space_back(text, pos)
+    if pos and text[pos - 1] == ")":
+        return max(0, text.rfind("(", 0, pos - 1))
+    return _word_back(text, pos)
+
+
+class Script:
+    """
+    One inline script prepared for structural matching.
+
+    code has comments blanked; masked also blanks string contents, so
+    braces and keywords inside strings can't confuse matching. Both keep
+    every offset and newline of the source.
+    """
+
+    def __init__(self, line: int, source: str):
+        self.line = line
+        code = []
+        masked = []
+        last = 0
+        for m in JS_LITERAL_RE.finditer(source):
+            text = m.group()
+            between = source[last:m.start()]
+            code.append(between)
+            masked.append(between)
+            if text[0] == "/":
+                code.append(_blank(text))
+                masked.append(code[-1])
+            else:
+                code.append(text)
+                masked.append(text[0] + _blank(text[1:-1]) + text[-1])
+            last = m.end()
+        code.append(source[last:])
+        masked.append(source[last:])
+        self.code = "".join(code)
+        self.masked = "".join(masked)
+        self.braces = self._match_braces()
+        # (name, open brace, close brace) and the offsets of definition names
+        self.functions: List[Tuple[str, int, int]] = []
+        self.definitions = set()
+        self._find_functions()
+
+    def _define(self, name: str, name_pos: int, open_brace: int):
+        close = self.braces.get(open_brace)
+        if name not in KEYWORDS and close is not None:
+            self.functions.append((name, open_brace, close))
+            self.definitions.add(name_pos)
+
+    def _find_functions(self):
+        masked = self.masked
+        for m in DEFINITION_RE.finditer(masked):
+            start = m.start()
+            if m.group() == "function":
+                if start and _is_name_char(masked[start - 1]):
+                    continue
+                named = NAMED_FUNCTION_RE.match(masked, m.end())
+                if named:
+                    self._define(named.group(1), named.start(1), named.end() - 1)
+                    continue
+                body = ANONYMOUS_FUNCTION_RE.match(masked, m.end())
+            else:
+                body = ARROW_BODY_RE.match(masked, m.end())
+                start = _arrow_params_start(masked, start)
+            owner = _assigned_name(masked, start) if body else None
+            if owner:
+                self._define(owner[0], owner[1], body.end() - 1)
+
+        for m in METHOD_RE.finditer(masked):
+            self._define(m.group(1), m.start(1), m.end() - 1)
+
+    def _match_braces(self) -> Dict[int, int]:
+        pairs = {}
+        stack = []
+        for m in BRACE_RE.finditer(self.masked):
+            if m.group() == "{":
+                stack.append(m.start())
+            elif stack:
+                pairs[stack.pop()] = m.start()
+        return pairs
+
+    def line_at(self, pos: int) -> int:
+        return self.line + self.masked.count("\n", 0, pos)
+
+    def enclosing_function(self, pos: int) -> Optional[Tuple[str, int, int]]:
+        """Innermost named function whose body contains pos."""
+        best = None
+        for function in self.functions:
+            if function[1] < pos < function[2] and (best is None or function[1] > best[1]):
+                best = function
+        return best
+
+    def callback_body(self, pos: int) -> Optional[Tuple[int, int]]:
+        """Body span of a function literal starting at pos, if there is one."""
+        m = CALLBACK_RE.match(self.masked, pos)
+        if m and (m.end() - 1) in self.braces:
+            return m.end() - 1, self.braces[m.end() - 1]
+        m = ARROW_EXPR_RE.match(self.masked, pos)
+        if m:
+            # Expression-bodied arrow: up to the end of the line
+            end = self.masked.find("\n", m.end())
+            return m.end(), end if end >= 0 else len(self.masked)
+        return None
+
+
+class Program:
+    """All inline scripts of a page with a shared function table."""
+
+    def __init__(self, index: FeatureIndex):
+        self.index = index
+        self.scripts = [Script(line, source) for line, source in index.scripts]
+        self.functions: Dict[str, List[tuple]] = {}
+        for script in self.scripts:
+            for name, start, end in script.functions:
+                self.functions.setdefault(name, []).append((script, start, end))
+        self._call_sites: Dict[str, int] = {}
+
+    def call_sites(self, name: str) -> int:
+        """Number of places that call name, definitions excluded."""
+        if name not in self._call_sites:
+            pattern = re.compile(rf"{re.escape(name)}\s*\(")
+            self._call_sites[name] = sum(
+                1 for script in self.scripts for m in pattern.finditer(script.masked)
+                if not (m.start() and _is_name_char(script.masked[m.start() - 1]))
+                and m.start() not in script.definitions
+            )
+        return self._call_sites[name]
+
+    def reaches(self, script: Script, start: int, end: int, target: re.Pattern,
+                depth: int = CALL_DEPTH, seen=None) -> Optional[Tuple[Script, int]]:
+        """First match of target in a span or in functions it calls."""
+        m = target.search(script.masked, start, end)
+        if m:
+            return script, m.start()
+        if depth == 0:
+            return None
+        seen = seen if seen is not None else set()
+        for call in CALL_RE.finditer(script.masked, start, end):
+            for callee, callee_start, callee_end in self.functions.get(call.group(1), []):
+                if (id(callee), callee_start) in seen:
+                    continue
+                seen.add((id(callee), callee_start))
+                found = self.reaches(callee, callee_start, callee_end, target, depth - 1, seen)
+                if found:
+                    return found
+        return None
+
+    def handlers(self, events: set):
+        """Yield (event, script, start, end, line) for handlers of the given events."""
+        for script in self.scripts:
+            registrations = [(m.group(1).lower(), m.end()) for m in LISTENER_RE.finditer(script.code)]
+            registrations += [(m.group(1), m.end()) for m in ON_PROPERTY_RE.finditer(script.masked)]
+            for event, pos in registrations:
+                if event not in events:
+                    continue
+                line = script.line_at(pos)
+                body = script.callback_body(pos)
+                if body:
+                    yield event, script, body[0], body[1], line
+                    continue
+                ref = HANDLER_REF_RE.match(script.masked, pos)
+                if ref:
+                    for callee, start, end in self.functions.get(ref.group(1), []):
+                        yield event, callee, start, end, line
+
+        for line, event, source in self.index.handlers:
+            if event in events:
+                script = Script(line, source)
+                yield event, script, 0, len(source), line
+
+
+def check_full_rerender(program: Program) -> List[tuple]:
+    findings = []
+    reported = set()
+    for script in program.scripts:
+        for m in INNERHTML_WRITE_RE.finditer(script.masked):
+            function = script.enclosing_function(m.start())
+            if function is None or function[0] in reported:
+                continue
+            name, start, end = function
+            rebuilds = (LOOP_RE.search(script.masked, start, end)
+                        or INNERHTML_CLEAR_RE.search(script.code, start, end))
+            if not rebuilds:
+                continue
+            callers = program.call_sites(name)
+            if callers >= RERENDER_CALLERS:
+                reported.add(name)
+                findings.append((
+                    script.line_at(m.start()),
+                    f"innerHTML rebuilt in {name}(), which is called from {callers} places"
+                ))
+    return findings
+
+
+def check_stringify_on_drag(program: Program) -> List[tuple]:
+    findings = []
+    reported = set()
+    for event, script, start, end, line in program.handlers(HOT_EVENTS):
+        found = program.reaches(script, start, end, STRINGIFY_RE)
+        if found:
+            at = found[0].line_at(found[1])
+            if (event, at) not in reported:
+                reported.add((event, at))
+                findings.append((at, f"JSON.stringify runs on every '{event}' event (handler on line {line})"))
+    return findings
+
+
+def _loop_body(script: Script, m: re.Match) -> Optional[Tuple[int, int]]:
+    masked = script.masked
+    open_paren = m.end() - 1
+    if m.group().startswith("."):
+        return script.callback_body(m.end())
+
+    depth = 0
+    for pos in range(open_paren, min(len(masked), open_paren + 2000)):
+        if masked[pos] == "(":
+            depth += 1
+        elif masked[pos] == ")":
+            depth -= 1
+            if depth == 0:
+                open_brace = WHITESPACE_RE.match(masked, pos + 1).end()
+                if open_brace in script.braces:
+                    return open_brace, script.braces[open_brace]
+                return None
+    return None
+
+
+def check_layout_thrash(program: Program) -> List[tuple]:
+    findings = []
+    reported = set()
+    for script in program.scripts:
+        if not LAYOUT_READ_RE.search(script.masked):
+            continue
+        for m in LOOP_RE.finditer(script.masked):
+            if m.start() and _is_name_char(script.masked[m.start() - 1]):
+                continue
+            body = _loop_body(script, m)
+            if body is None:
+                continue
+            read = LAYOUT_READ_RE.search(script.masked, *body)
+            if read and read.start() not in reported and DOM_WRITE_RE.search(script.masked, *body):
+                reported.add(read.start())
+                prop = read.group().strip(".(").strip()
+                findings.append((
+                    script.line_at(read.start()),
+                    f"{prop} read inside a loop that also writes to the DOM (layout per iteration)"
+                ))
+    return findings
+
+
+def check_unbounded_undo(program: Program) -> List[tuple]:
+    findings = []
+    text = "\n".join(script.masked for script in program.scripts)
+    stacks = {}
+    for script in program.scripts:
+        for m in STACK_PUSH_RE.finditer(script.masked):
+            name_start = _word_back(script.masked, m.start())
+            name = script.masked[name_start:m.start()]
+            if name and STACK_NAME_RE.search(name) and name not in stacks:
+                chain = script.masked[_chain_back(script.masked, m.start()):m.start()]
+                stacks[name] = (chain, script.line_at(m.start()))
+
+    for name, (chain, line) in stacks.items():
+        # Literal-first alternatives keep these scans fast
+        n = re.escape(name)
+        bounded = re.search(
+            rf"{n}\s*\.\s*(?:shift|splice)\s*\(|{n}\.length\s*(?:>|>=|=(?!=))"
+            rf"|{n}\s*=\s*[\w$.]*{n}\.slice\s*\(", text)
+        if not bounded:
+            findings.append((line, f"{chain} grows without bound (pushed to, never trimmed)"))
+    return findings
+
+
+RENDER_RULES = [
+    # (name, description, penalty, trigger keys, check)
+    # A rule only runs if the feature index has one of its trigger keys
+    ("full_rerender", "full-board innerHTML re-render", 3,
+     {"word:innerhtml"}, check_full_rerender),
+    ("stringify_on_drag", "JSON.stringify per drag/move event", 3,
+     {"api:json.stringify"}, check_stringify_on_drag),
+    ("layout_thrash", "layout read/write interleaving in loops", 2,
+     {f"word:{read.lower()}" for read in LAYOUT_READS}, check_layout_thrash),
+    ("unbounded_undo", "unbounded undo stack", 2,
+     {"word:undo", "word:history", "word:past"}, check_unbounded_undo),
+]
+
+
+def analyze_render_cost(index: FeatureIndex) -> dict:
+    """Run the render-cost rules and return the performance sub-score."""
+    results = {
+        "earned": 0,
+        "possible": PERFORMANCE_POINTS,
+        "details": [],
+        "findings": []
+    }
+
+    if not index.scripts:
+        results["details"].append("✗ Render cost: no inline JavaScript to analyze")
+        return results
+
+    program = Program(index)
+    earned = PERFORMANCE_POINTS
+    for name, desc, penalty, triggers, check in RENDER_RULES:
+        findings = check(program) if index.any(triggers) else []
+        for line, message in findings:
+            results["findings"].append({"rule": name, "line": line, "message": message})
+        if not findings:
+            results["details"].append(f"✓ No {desc} detected")
+            continue
+        earned -= penalty
+        line, message = findings[0]
+        more = f" (+{len(findings) - 1} more)" if len(findings) > 1 else ""
+        results["details"].append(f"✗ {desc}: line {line}: {message}{more} (-{penalty} pts)")
+
+    results["earned"] = max(0, earned)
+    return results
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python render_cost.py <kanban.html>")
+        sys.exit(1)
+
+    results = analyze_render_cost(build_index(Path(sys.argv[1]).read_text()))
+    for detail in results["details"]:
+        print(f"  {detail}")
+    print(f"\nRender Performance Score: {results['earned']}/{results['possible']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+asyncio stress mode for Problem 4: Concurrent Bug Hunt.
+
+Services call the ledger from thousands of coroutines on one event loop
+rather than from OS threads. Coroutines only interleave at an await, but a
+transfer that awaits between debit and credit (the simulated processing
+delay) has the same races as the threaded bank, and asyncio.Lock taken in
+inconsistent order deadlocks just as threading.Lock does.
+
+    AsyncBankSystem   reference: an asyncio.Lock per account, transfers take
+                      both in creation order but back off rather than hold
+                      the first while waiting; audit() takes every account
+                      lock; the log is a TransactionLog
+    the solution      its own AsyncBankSystem, if it defines one, with the
+                      same methods as BankSystem as coroutines (accounts
+                      stays a name -> balance mapping)
+
+COROUTINES tasks each make TRANSFERS_PER_TASK random transfers among
+ACCOUNTS accounts. A run passes when every task finishes within
+STALL_TIMEOUT, the balances still sum to the initial total, audit() agrees
+and the transfers logged match the successes. The same transfers are then
+made by THREADS threads on the threaded BankSystem for comparison.
+
+Usage: python async_bank.py [solution.py]
+"""
+
+import asyncio
+import importlib.util
+import inspect
+import random
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import bank_reference
+from transaction_log import CENTS, TransactionLog
+
+COROUTINES = 10_000
+TRANSFERS_PER_TASK = 5
+ACCOUNTS = 100
+INITIAL_BALANCE = 1000.0
+THREADS = 100
+STALL_TIMEOUT = 60.0
+PROCESSING_DELAY = bank_reference.PROCESSING_DELAY
+
+
+class _Account:
+    __slots__ = ("name", "index", "balance", "lock")
+
+    def __init__(self, name: str, index: int, balance: float):
+        self.name = name
+        self.index = index
+        self.balance = balance
+        self.lock = asyncio.Lock()
+
+
+async def _acquire_pair(first: asyncio.Lock, second: asyncio.Lock):
+    """
+    Take first then second without holding first while second is busy.
+
+    Waiting on the second lock while holding the first chains waiters
+    together: with thousands of coroutines over a few accounts nearly every
+    transfer ends up queued behind one chain and throughput collapses. Here
+    the first lock is released and the coroutine waits for the second before
+    trying again; the order is unchanged, so there is still no cycle.
+    """
+    while True:
+        await first.acquire()
+        if not second.locked():
+            await second.acquire()
+            return
+        first.release()
+        async with second:
+            pass
+
+
+class AsyncBankSystem:
+    """Coroutine bank with per-account asyncio locks taken in creation order."""
+
+    def __init__(self):
+        self._accounts: Dict[str, _Account] = {}
+        self.total_money = 0.0
+        self._log = TransactionLog()
+
+    @property
+    def accounts(self) -> Dict[str, float]:
+        """Snapshot of name -> balance."""
+        return {name: a.balance for name, a in self._accounts.items()}
+
+    async def create_account(self, name: str, initial_balance: float) -> bool:
+        """Create a new account with initial balance."""
+        # No await between the check and the insert, so this is atomic
+        if name in self._accounts:
+            return False
+        self._accounts[name] = _Account(name, len(self._accounts), initial_balance)
+        self.total_money += initial_balance
+        return True
+
+    async def get_balance(self, name: str) -> Optional[float]:
+        """Get account balance."""
+        account = self._accounts.get(name)
+        return account.balance if account else None
+
+    async def transfer(self, from_account: str, to_account: str, amount: float) -> bool:
+        """Transfer money between accounts."""
+        if from_account == to_account or amount <= 0:
+            return False
+        source = self._accounts.get(from_account)
+        target = self._accounts.get(to_account)
+        if source is None or target is None:
+            return False
+
+        first, second = (source, target) if source.index < target.index else (target, source)
+        await _acquire_pair(first.lock, second.lock)
+        try:
+            if source.balance < amount:
+                return False
+            await asyncio.sleep(PROCESSING_DELAY)
+            source.balance -= amount
+            await asyncio.sleep(PROCESSING_DELAY)
+            target.balance += amount
+            self._log.append(from_account, to_account, round(amount * CENTS))
+        finally:
+            second.lock.release()
+            first.lock.release()
+        return True
+
+    async def deposit(self, account: str, amount: float) -> bool:
+        """Deposit money into account."""
+        target = self._accounts.get(account)
+        if target is None or amount <= 0:
+            return False
+        async with target.lock:
+            target.balance += amount
+            self.total_money += amount
+        return True
+
+    async def withdraw(self, account: str, amount: float) -> bool:
+        """Withdraw money from account."""
+        source = self._accounts.get(account)
+        if source is None or amount <= 0:
+            return False
+        async with source.lock:
+            if source.balance < amount:
+                return False
+            await asyncio.sleep(PROCESSING_DELAY)
+            source.balance -= amount
+            self.total_money -= amount
+        return True
+
+    async def audit(self) -> bool:
+        """Verify, with every account locked, that balances sum to total_money."""
+        accounts = sorted(self._accounts.values(), key=lambda a: a.index)
+        for account in accounts:
+            await account.lock.acquire()
+        try:
+            discrepancy = abs(sum(a.balance for a in accounts) - self.total_money)
+        finally:
+            for account in reversed(accounts):
+                account.lock.release()
+        return discrepancy <= 0.01
+
+    def get_transaction_count(self) -> int:
+        """Get number of successful transactions."""
+        return self._log.count
+
+    def get_total_transferred(self) -> float:
+        """Get total amount successfully transferred."""
+        return self._log.total_cents / CENTS
+
+
+async def _maybe_await(value):
+    return await value if inspect.isawaitable(value) else value
+
+
+def _logged(bank) -> int:
+    if hasattr(bank, "get_transaction_count"):
+        return bank.get_transaction_count()
+    return len(bank.transaction_log)
+
+
+def _workload(seed: int = 0) -> tuple:
+    """Account names and one (from, to, amount) list per coroutine."""
+    names = [f"user_{i}" for i in range(ACCOUNTS)]
+    rng = random.Random(seed)
+    tasks = [[(*rng.sample(names, 2), float(rng.randint(1, 50)))
+              for _ in range(TRANSFERS_PER_TASK)]
+             for _ in range(COROUTINES)]
+    return names, tasks
+
+
+def _result(elapsed: float, succeeded: int, conserved: bool, audit: Optional[bool],
+            logged: int) -> dict:
+    return {
+        "error": None,
+        "transfers_per_sec": COROUTINES * TRANSFERS_PER_TASK / elapsed,
+        "succeeded": succeeded,
+        "conserved": conserved,
+        "audit": audit,
+        "logged": logged,
+        "log_consistent": logged == succeeded
+    }
+
+
+async def _async_stress(make_bank: Callable, names: List[str], tasks: List[list]) -> dict:
+    bank = make_bank()
+    for name in names:
+        await _maybe_await(bank.create_account(name, INITIAL_BALANCE))
+
+    async def worker(transfers: list) -> int:
+        done = 0
+        for item in transfers:
+            if await _maybe_await(bank.transfer(*item)):
+                done += 1
+        return done
+
+    start = time.perf_counter()
+    pending = [asyncio.ensure_future(worker(transfers)) for transfers in tasks]
+    finished, stalled = await asyncio.wait(pending, timeout=STALL_TIMEOUT)
+    elapsed = time.perf_counter() - start
+    if stalled:
+        for task in stalled:
+            task.cancel()
+        await asyncio.gather(*stalled, return_exceptions=True)
+        return {"error": f"deadlock: {len(stalled):,} of {len(tasks):,} coroutines "
+                         f"still waiting after {STALL_TIMEOUT:.0f}s"}
+    errors = [task.exception() for task in finished if task.exception()]
+    if errors:
+        return {"error": f"{type(errors[0]).__name__}: {errors[0]}"}
+
+    succeeded = sum(task.result() for task in finished)
+    conserved = abs(sum(bank.accounts.values()) - INITIAL_BALANCE * len(names)) < 0.01
+    audit = await _maybe_await(bank.audit()) if hasattr(bank, "audit") else None
+    return _result(elapsed, succeeded, conserved, audit, _logged(bank))
+
+
+def async_stress(make_bank: Callable, seed: int = 0) -> dict:
+    """Run the coroutine workload on a fresh event loop."""
+    names, tasks = _workload(seed)
+    try:
+        return asyncio.run(_async_stress(make_bank, names, tasks))
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+
+def thread_stress(make_bank: Callable, seed: int = 0) -> dict:
+    """The same transfers made by THREADS threads on a threaded bank."""
+    names, tasks = _workload(seed)
+    bank = make_bank()
+    for name in names:
+        bank.create_account(name, INITIAL_BALANCE)
+    shares = [[item for transfers in tasks[i::THREADS] for item in transfers]
+              for i in range(THREADS)]
+    counts = [0] * THREADS
+    errors = []
+
+    def worker(i: int):
+        try:
+            counts[i] = sum(1 for item in shares[i] if bank.transfer(*item))
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(THREADS)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    deadline = start + STALL_TIMEOUT
+    for t in threads:
+        t.join(timeout=max(0.0, deadline - time.perf_counter()))
+    elapsed = time.perf_counter() - start
+    stalled = sum(1 for t in threads if t.is_alive())
+    if stalled:
+        return {"error": f"deadlock: {stalled} of {THREADS} threads still running "
+                         f"after {STALL_TIMEOUT:.0f}s"}
+    if errors:
+        return {"error": errors[0]}
+
+    succeeded = sum(counts)
+    conserved = abs(sum(bank.accounts.values()) - INITIAL_BALANCE * len(names)) < 0.01
+    return _result(elapsed, succeeded, conserved, None, _logged(bank))
+
+
+def _describe(label: str, run: dict) -> str:
+    if run["error"]:
+        return f"✗ {label}: {run['error']}"
+    problems = []
+    if not run["conserved"]:
+        problems.append("money not conserved")
+    if run["audit"] is False:
+        problems.append("audit failed")
+    if not run["log_consistent"]:
+        problems.append(f"{run['logged']} logged vs {run['succeeded']} successful")
+    summary = f"{label}: {run['transfers_per_sec']:,.0f}/s"
+    if problems:
+        return f"✗ {summary} - " + "; ".join(problems)
+    return f"✓ {summary}, money conserved, {run['succeeded']:,} transfers logged"
+
+
+def evaluate_async(module=None) -> dict:
+    """Stress the async reference and the solution's AsyncBankSystem, then
+    compare with the solution's threaded BankSystem on the same transfers."""
+    results = {
+        "coroutines": COROUTINES,
+        "transfers": COROUTINES * TRANSFERS_PER_TASK,
+        "threads": THREADS,
+        "details": [],
+        "runs": {}
+    }
+
+    variants = [("async reference", AsyncBankSystem)]
+    if module is not None and hasattr(module, "AsyncBankSystem"):
+        variants.append(("async solution", module.AsyncBankSystem))
+    threaded = module.BankSystem if module is not None else bank_reference.BankSystem
+    label = "threaded solution" if module is not None else "threaded reference"
+
+    for name, make_bank in variants:
+        run = async_stress(make_bank)
+        results["runs"][name] = run
+        results["details"].append(_describe(name, run))
+    if module is not None and len(variants) == 1:
+        results["details"].append("- async solution: no AsyncBankSystem defined (skipped)")
+
+    run = thread_stress(threaded)
+    results["runs"][label] = run
+    results["details"].append(_describe(label, run))
+
+    async_run = results["runs"][variants[-1][0]]
+    if not async_run["error"] and not run["error"]:
+        ratio = async_run["transfers_per_sec"] / run["transfers_per_sec"]
+        results["async_vs_threaded"] = ratio
+        results["details"].append(f"{variants[-1][0]} vs {label}: {ratio:.2f}x throughput")
+    return results
+
+
+def main():
+    module = None
+    if len(sys.argv) > 1:
+        spec = importlib.util.spec_from_file_location("solution", sys.argv[1])
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+
+    results = evaluate_async(module)
+    print(f"  {results['coroutines']:,} coroutines, {results['transfers']:,} transfers "
+          f"(threaded: {results['threads']} threads)")
+    for detail in results["details"]:
+        print(f"  {detail}")
+
+
+if __name__ == "__main__":
+    main()
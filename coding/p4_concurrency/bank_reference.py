@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Reference BankSystem for Problem 4: Concurrent Bug Hunt.
+
+A known-good, high-throughput fix of buggy_bank.py, used as the performance
+baseline for the scaling curve and to regression-test the evaluator
+(`python evaluate_p4.py bank_reference.py` should score full marks).
+
+    accounts        each Account has its own lock; transfers take both locks
+                    in creation order, so opposite transfers cannot deadlock
+    accounts dict   striped: STRIPES dicts, each with a lock taken only to
+                    insert; lookups are plain dict reads
+    total_money     one shard per stripe, updated under that stripe's lock
+                    and summed on read
+    transfer_many   a batch takes every involved account lock once, in
+                    index order, and logs its transfers in one append
+    transaction_log LOG_SHARDS columnar TransactionLogs, each with its own
+                    lock and running count/amount counters; optionally
+                    fixed-capacity rings
+    snapshot        epoch-versioned balances and totals, so audit() reads a
+                    consistent state while transfers continue
+    cents           BankSystem(cents=True) takes and returns integer cents:
+                    balances, totals and the log are exact ints, audit()
+                    needs no epsilon and non-integer amounts are rejected
+    share_balances  balances of accounts created afterwards live in a given
+                    name -> balance mapping instead, such as the shared
+                    memory view used by shared_bank.py
+
+Lock hierarchy, always acquired in this order: account locks (by creation
+index), stripe locks (by stripe), log shard locks.
+
+Snapshots: every write to a balance or stripe total is stamped with the
+epoch read while the writer holds that account or stripe lock, and the
+first write in a new epoch saves the value it replaces. snapshot() advances
+the epoch, then takes and immediately releases each account and stripe lock
+once, so every writer stamped with the old epoch has finished. From then on
+each balance and total is read as of the old epoch: the current value if
+its stamp is old, else the saved one. No lock is held while reading, and a
+transfer waits at most for the one pass over its accounts.
+
+The simulated processing delay from buggy_bank.py is kept so timings are
+comparable.
+
+Usage: python bank_reference.py [--cents]
+"""
+
+import itertools
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, MutableMapping, Optional, Tuple, Union
+
+from transaction_log import CENTS, TransactionLog
+
+STRIPES = 16
+LOG_SHARDS = 16
+PROCESSING_DELAY = 0.0001
+
+
+@dataclass
+class Transaction:
+    """amount is in dollars, or integer cents for a cents-mode bank."""
+    timestamp: datetime
+    from_account: str
+    to_account: str
+    amount: float
+    success: bool
+
+
+class Account:
+    __slots__ = ("name", "index", "balance", "lock", "created", "epoch", "previous")
+
+    def __init__(self, name: str, index: int, balance: Union[float, int], epoch: int = 0):
+        self.name = name
+        self.index = index
+        self.balance = balance
+        self.lock = threading.Lock()
+        self.created = epoch
+        # Epoch of the last write, and the balance before that epoch began
+        self.epoch = epoch
+        self.previous = 0
+
+    def stamp(self, epoch: int):
+        """Call under self.lock before changing balance."""
+        if self.epoch != epoch:
+            self.previous = self.balance
+            self.epoch = epoch
+
+    def as_of(self, epoch: int) -> float:
+        """Balance at the end of epoch, once its writers have finished."""
+        if self.epoch > epoch:
+            return self.previous
+        balance = self.balance
+        # stamp() sets epoch before the balance changes
+        if self.epoch > epoch:
+            return self.previous
+        return balance
+
+
+class SharedAccount(Account):
+    """Account whose balance is kept in an external name -> balance mapping."""
+
+    __slots__ = ("balances",)
+
+    def __init__(self, balances: MutableMapping[str, float], name: str, index: int,
+                 balance: Union[float, int], epoch: int = 0):
+        self.balances = balances
+        super().__init__(name, index, balance, epoch)
+
+    @property
+    def balance(self) -> Union[float, int]:
+        return self.balances[self.name]
+
+    @balance.setter
+    def balance(self, value: Union[float, int]):
+        self.balances[self.name] = value
+
+
+class BankSystem:
+    """Fine-grained, deadlock-free bank with sharded totals and log."""
+
+    def __init__(self, stripes: int = STRIPES, log_shards: int = LOG_SHARDS,
+                 log_capacity: Optional[int] = None, cents: bool = False):
+        self.cents = cents
+        zero = 0 if cents else 0.0
+        self._stripes: List[Dict[str, Account]] = [{} for _ in range(stripes)]
+        self._stripe_locks = [threading.Lock() for _ in range(stripes)]
+        self._totals = [zero] * stripes
+        self._total_epochs = [0] * stripes
+        self._total_previous = [zero] * stripes
+        # next() on a count is a single C call, so indexes are unique
+        self._order = itertools.count()
+        self._epoch = 0
+        self._snapshot_lock = threading.Lock()
+
+        # log_capacity is per shard; counters still cover every transfer
+        self._logs = [TransactionLog(log_capacity) for _ in range(log_shards)]
+        self._balances: Optional[MutableMapping[str, float]] = None
+
+    def share_balances(self, balances: MutableMapping[str, float]):
+        """Keep the balances of accounts created from now on in balances."""
+        self._balances = balances
+
+    def _stripe(self, name: str) -> int:
+        return hash(name) % len(self._stripes)
+
+    def _account(self, name: str) -> Optional[Account]:
+        return self._stripes[self._stripe(name)].get(name)
+
+    def _all_accounts(self) -> List[Account]:
+        accounts = [a for stripe in self._stripes for a in list(stripe.values())]
+        return sorted(accounts, key=lambda a: a.index)
+
+    def _require_int(self, amount):
+        if self.cents and not isinstance(amount, int):
+            raise TypeError(f"cents mode takes integer amounts, got {amount!r}")
+
+    def _valid(self, amount) -> bool:
+        """Positive amount; in cents mode anything but an int is an error."""
+        self._require_int(amount)
+        return amount > 0
+
+    def _to_cents(self, amount) -> int:
+        return amount if self.cents else round(amount * CENTS)
+
+    def _add_total(self, stripe: int, amount: float, epoch: int):
+        """Call under the stripe lock, with the epoch the operation read once
+        under its locks and stamped its accounts with."""
+        if self._total_epochs[stripe] != epoch:
+            self._total_previous[stripe] = self._totals[stripe]
+            self._total_epochs[stripe] = epoch
+        self._totals[stripe] += amount
+
+    def _total_as_of(self, stripe: int, epoch: int) -> float:
+        if self._total_epochs[stripe] > epoch:
+            return self._total_previous[stripe]
+        total = self._totals[stripe]
+        if self._total_epochs[stripe] > epoch:
+            return self._total_previous[stripe]
+        return total
+
+    @property
+    def accounts(self) -> Dict[str, float]:
+        """Snapshot of name -> balance."""
+        return {a.name: a.balance for a in self._all_accounts()}
+
+    @property
+    def total_money(self) -> float:
+        return sum(self._totals)
+
+    @property
+    def transaction_log(self) -> List[Transaction]:
+        """Snapshot of the retained entries of all shards in timestamp order."""
+        records = sorted(r for log in self._logs for r in log.records())
+        return [Transaction(datetime.fromtimestamp(ns / 1e9), source, target,
+                            cents if self.cents else cents / CENTS, success)
+                for ns, source, target, cents, success in records]
+
+    def create_account(self, name: str, initial_balance: Union[float, int]) -> bool:
+        """Create a new account with initial balance."""
+        self._require_int(initial_balance)
+        stripe = self._stripe(name)
+        with self._stripe_locks[stripe]:
+            if name in self._stripes[stripe]:
+                return False
+            epoch = self._epoch
+            if self._balances is None:
+                account = Account(name, next(self._order), initial_balance, epoch)
+            else:
+                account = SharedAccount(self._balances, name, next(self._order),
+                                        initial_balance, epoch)
+            self._stripes[stripe][name] = account
+            self._add_total(stripe, initial_balance, epoch)
+        return True
+
+    def get_balance(self, name: str) -> Optional[float]:
+        """Get account balance."""
+        account = self._account(name)
+        return account.balance if account else None
+
+    def transfer(self, from_account: str, to_account: str, amount: float) -> bool:
+        """Transfer money between accounts."""
+        if not self._valid(amount) or from_account == to_account:
+            return False
+        source = self._account(from_account)
+        target = self._account(to_account)
+        if source is None or target is None:
+            return False
+
+        first, second = (source, target) if source.index < target.index else (target, source)
+        with first.lock, second.lock:
+            if source.balance < amount:
+                return False
+            epoch = self._epoch
+            source.stamp(epoch)
+            target.stamp(epoch)
+            time.sleep(PROCESSING_DELAY)
+            source.balance -= amount
+            time.sleep(PROCESSING_DELAY)
+            target.balance += amount
+            self._logs[source.index % len(self._logs)].append(
+                from_account, to_account, self._to_cents(amount))
+        return True
+
+    def transfer_many(self, batch: List[tuple], atomic: bool = False) -> List[bool]:
+        """
+        Apply (from_account, to_account, amount) transfers in order under one
+        acquisition of every involved account lock.
+
+        Returns a result per transfer. With atomic, either every transfer
+        succeeds or none is applied. Successful transfers are logged in one
+        append.
+        """
+        resolved = []
+        involved = {}
+        for from_account, to_account, amount in batch:
+            source = self._account(from_account)
+            target = self._account(to_account)
+            if not self._valid(amount) or source is None or target is None or source is target:
+                resolved.append(None)
+                continue
+            resolved.append((source, target, amount))
+            involved[source.index] = source
+            involved[target.index] = target
+
+        locks = [involved[i].lock for i in sorted(involved)]
+        for lock in locks:
+            lock.acquire()
+        try:
+            balances = {i: a.balance for i, a in involved.items()}
+            results = []
+            for item in resolved:
+                if item is None or balances[item[0].index] < item[2]:
+                    results.append(False)
+                    continue
+                source, target, amount = item
+                balances[source.index] -= amount
+                balances[target.index] += amount
+                results.append(True)
+            if atomic and not all(results):
+                return [False] * len(batch)
+            if not any(results):
+                return results
+
+            epoch = self._epoch
+            for account in involved.values():
+                account.stamp(epoch)
+            time.sleep(PROCESSING_DELAY)
+            for index, balance in balances.items():
+                involved[index].balance = balance
+            time.sleep(PROCESSING_DELAY)
+            applied = [item for item, ok in zip(resolved, results) if ok]
+            self._logs[applied[0][0].index % len(self._logs)].extend(
+                (source.name, target.name, self._to_cents(amount), True)
+                for source, target, amount in applied)
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+        return results
+
+    def deposit(self, account: str, amount: float) -> bool:
+        """Deposit money into account."""
+        target = self._account(account)
+        if not self._valid(amount) or target is None:
+            return False
+
+        stripe = self._stripe(account)
+        with target.lock, self._stripe_locks[stripe]:
+            epoch = self._epoch
+            target.stamp(epoch)
+            target.balance += amount
+            self._add_total(stripe, amount, epoch)
+        return True
+
+    def withdraw(self, account: str, amount: float) -> bool:
+        """Withdraw money from account."""
+        source = self._account(account)
+        if not self._valid(amount) or source is None:
+            return False
+
+        stripe = self._stripe(account)
+        with source.lock:
+            if source.balance < amount:
+                return False
+            time.sleep(PROCESSING_DELAY)
+            with self._stripe_locks[stripe]:
+                epoch = self._epoch
+                source.stamp(epoch)
+                source.balance -= amount
+                self._add_total(stripe, -amount, epoch)
+        return True
+
+    def snapshot(self) -> Tuple[Dict[str, float], float]:
+        """
+        Consistent (name -> balance, total_money) without stopping
+        transfers: every operation is either wholly in it or not at all.
+        """
+        with self._snapshot_lock:
+            epoch = self._epoch
+            self._epoch = epoch + 1
+            # Anyone still writing with the old epoch holds one of these
+            for lock in [a.lock for a in self._all_accounts()] + self._stripe_locks:
+                with lock:
+                    pass
+            balances = {a.name: a.as_of(epoch) for a in self._all_accounts() if a.created <= epoch}
+            total = sum(self._total_as_of(stripe, epoch) for stripe in range(len(self._stripes)))
+        return balances, total
+
+    def audit(self) -> bool:
+        """
+        Verify that total money in system matches expected amount.
+        Returns True if money is conserved, False if there's a discrepancy.
+        """
+        balances, expected_total = self.snapshot()
+        actual_total = sum(balances.values())
+        discrepancy = abs(actual_total - expected_total)
+        # Integer cents are exact; allow tiny floating point errors otherwise
+        if discrepancy > (0 if self.cents else 0.01):
+            print(f"AUDIT FAILED: Expected {expected_total}, found {actual_total}")
+            print(f"Discrepancy: {discrepancy}")
+            return False
+        return True
+
+    def get_transaction_count(self) -> int:
+        """Get number of successful transactions."""
+        return sum(log.count for log in self._logs)
+
+    def get_total_transferred(self) -> Union[float, int]:
+        """Get total amount successfully transferred."""
+        total = sum(log.total_cents for log in self._logs)
+        return total if self.cents else total / CENTS
+
+
+def stress_test(bank: BankSystem, num_transfers: int):
+    """Perform random transfers."""
+    accounts = list(bank.accounts.keys())
+    if len(accounts) < 2:
+        return
+
+    for _ in range(num_transfers):
+        from_acc = random.choice(accounts)
+        to_acc = random.choice(accounts)
+        if from_acc != to_acc:
+            amount = random.randint(100, 5000) if bank.cents else random.uniform(1, 50)
+            bank.transfer(from_acc, to_acc, amount)
+
+
+def main():
+    """Run the buggy_bank.py demo against the reference."""
+    bank = BankSystem(cents="--cents" in sys.argv[1:])
+    for i in range(10):
+        bank.create_account(f"user_{i}", 100_000 if bank.cents else 1000.0)
+
+    print("Running 100 threads with 50 transfers each...")
+    threads = [threading.Thread(target=stress_test, args=(bank, 50)) for _ in range(100)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    print(f"Audit: {bank.audit()}")
+    money = (lambda v: f"{v} cents") if bank.cents else (lambda v: f"${v}")
+    print(f"Expected total: {money(bank.total_money)}")
+    print(f"Actual total: {money(sum(bank.accounts.values()))}")
+    print(f"Transactions logged: {bank.get_transaction_count()}")
+
+
+if __name__ == "__main__":
+    main()
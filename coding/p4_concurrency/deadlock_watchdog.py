@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Wait-for-graph deadlock watchdog for Problem 4: Concurrent Bug Hunt.
+
+The stress tests notice a deadlock only when their deadline passes with
+threads still alive. Here the solution's threading.Lock, RLock and Condition
+are replaced (as in lock_profiler.py) by watched locks that record their
+owner thread and which lock each blocked thread is waiting for. Those two
+maps form the wait-for graph: thread -> lock it waits for -> thread that
+owns that lock -> ... A thread that cannot get a lock walks the graph from
+itself, and again every POLL_SECONDS while it waits, so a cycle is found as
+soon as it closes.
+
+Owners and waiters are read without a global lock, so a cycle is declared
+only once the same cycle is still there POLL_SECONDS later; a real deadlock
+never goes away. The watchdog then records a report (every thread in the
+cycle, the lock it waits for, the locks it holds and its stack in solution
+code) and every blocked acquire raises DeadlockDetected, so the stuck
+threads unwind and the test can stop at once.
+
+Only untimed blocking acquires take part: a timed acquire gives up by
+itself, and Condition.wait() is not a lock wait.
+
+Usage: python deadlock_watchdog.py solution.py
+"""
+
+import importlib.util
+import random
+import sys
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import lock_profiler
+from lock_profiler import _creation_site
+
+POLL_SECONDS = 0.005
+STACK_FRAMES = 4
+_INTERNAL = (__file__, lock_profiler.__file__, threading.__file__)
+
+
+class DeadlockDetected(RuntimeError):
+    """Raised in threads blocked on a watched lock once a cycle is found."""
+
+
+class WatchedLock:
+    """threading.Lock stand-in that records its owner and its waiters."""
+
+    _factory = staticmethod(threading.Lock)
+
+    def __init__(self, watchdog: "Watchdog", site: tuple, ordinal: int = 0):
+        self._inner = self._factory()
+        self._watchdog = watchdog
+        self.site = site
+        self.ordinal = ordinal
+        self.owner: Optional[int] = None
+
+    @property
+    def label(self) -> str:
+        """Creation site, with #n for the n-th lock made there."""
+        label, function, line = self.site
+        return f"{label}#{self.ordinal} ({function}:{line})"
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        if not self._inner.acquire(False):
+            if not blocking:
+                return False
+            if timeout >= 0:
+                if not self._inner.acquire(True, timeout):
+                    return False
+            else:
+                self._watchdog.wait(self)
+        self.owner = threading.get_ident()
+        return True
+
+    def release(self):
+        self.owner = None
+        self._inner.release()
+
+    def locked(self) -> bool:
+        return self._inner.locked()
+
+    __enter__ = acquire
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class WatchedRLock(WatchedLock):
+    """Reentrant variant; only the first acquire can wait."""
+
+    _factory = staticmethod(threading.RLock)
+
+    def __init__(self, watchdog: "Watchdog", site: tuple, ordinal: int = 0):
+        super().__init__(watchdog, site, ordinal)
+        self._depth = 0
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        if self.owner == threading.get_ident():
+            self._inner.acquire()
+            self._depth += 1
+            return True
+        if not super().acquire(blocking, timeout):
+            return False
+        self._depth = 1
+        return True
+
+    def release(self):
+        if self.owner != threading.get_ident():
+            self._inner.release()  # raises like an unowned RLock
+        self._depth -= 1
+        if not self._depth:
+            self.owner = None
+        self._inner.release()
+
+    def locked(self) -> bool:
+        return self.owner is not None
+
+    __enter__ = acquire
+
+    # Condition.wait() releases and restores every level at once
+    def _is_owned(self) -> bool:
+        return self.owner == threading.get_ident()
+
+    def _release_save(self):
+        depth = self._depth
+        self.owner = None
+        self._depth = 0
+        return self._inner._release_save(), depth
+
+    def _acquire_restore(self, state):
+        inner_state, depth = state
+        self._inner._acquire_restore(inner_state)
+        self.owner = threading.get_ident()
+        self._depth = depth
+
+
+class Watchdog:
+    """Creates watched locks and finds cycles in their wait-for graph."""
+
+    def __init__(self):
+        self.locks: List[WatchedLock] = []
+        self.waiting: Dict[int, WatchedLock] = {}
+        self.deadlock: Optional[dict] = None
+        self._sites: Dict[tuple, int] = {}
+        self._guard = threading.Lock()
+        self._start = time.perf_counter()
+
+    def _watched(self, cls):
+        site = _creation_site(_INTERNAL)
+        ordinal = self._sites[site] = self._sites.get(site, -1) + 1
+        lock = cls(self, site, ordinal)
+        self.locks.append(lock)
+        return lock
+
+    def Lock(self):
+        return self._watched(WatchedLock)
+
+    def RLock(self):
+        return self._watched(WatchedRLock)
+
+    def Condition(self, lock=None):
+        return threading.Condition(lock if lock is not None else self.RLock())
+
+    def _cycle(self, thread: int) -> Optional[List[tuple]]:
+        """(thread, lock it waits for) around a cycle through thread, if any."""
+        path = []
+        seen = set()
+        while thread not in seen:
+            seen.add(thread)
+            lock = self.waiting.get(thread)
+            owner = lock.owner if lock is not None else None
+            if owner is None:
+                return None
+            path.append((thread, lock))
+            thread = owner
+        start = next(i for i, (t, _) in enumerate(path) if t == thread)
+        return path[start:]
+
+    def wait(self, lock: WatchedLock):
+        """Block on lock's inner lock, checking for a cycle every poll."""
+        me = threading.get_ident()
+        self.waiting[me] = lock
+        suspect = None
+        try:
+            while not lock._inner.acquire(True, POLL_SECONDS):
+                if self.deadlock is not None:
+                    raise DeadlockDetected(self.deadlock["summary"])
+                cycle = self._cycle(me)
+                if cycle is not None and cycle == suspect:
+                    self._declare(cycle)
+                    raise DeadlockDetected(self.deadlock["summary"])
+                suspect = cycle
+        finally:
+            del self.waiting[me]
+
+    def _declare(self, cycle: List[tuple]):
+        with self._guard:
+            if self.deadlock is not None:
+                return
+            names = {t.ident: t.name for t in threading.enumerate()}
+            frames = sys._current_frames()
+            threads = []
+            for thread, lock in cycle:
+                threads.append({
+                    "thread": names.get(thread, str(thread)),
+                    "waiting_for": lock.label,
+                    "held_by": names.get(lock.owner, str(lock.owner)),
+                    "holds": [held.label for held in self.locks if held.owner == thread],
+                    "stack": _stack(frames.get(thread))
+                })
+            self.deadlock = {
+                "summary": f"lock cycle between {len(cycle)} thread(s)",
+                "detected_ms": (time.perf_counter() - self._start) * 1000,
+                "threads": threads
+            }
+
+
+def _stack(frame) -> List[str]:
+    """Innermost STACK_FRAMES frames of solution code, outermost first."""
+    if frame is None:
+        return []
+    summary = [f for f in traceback.extract_stack(frame) if f.filename not in _INTERNAL]
+    return [f"{f.name}:{f.lineno}: {f.line}" for f in summary[-STACK_FRAMES:]]
+
+
+class _WatchedThreading:
+    """Stand-in for a solution's threading module with watched locks."""
+
+    def __init__(self, watchdog: Watchdog):
+        self.Lock = watchdog.Lock
+        self.RLock = watchdog.RLock
+        self.Condition = watchdog.Condition
+
+    def __getattr__(self, name):
+        return getattr(threading, name)
+
+
+@contextmanager
+def watched_locks(module):
+    """Route lock creation in the module through a fresh Watchdog."""
+    watchdog = Watchdog()
+    saved = {}
+    if getattr(module, "threading", None) is threading:
+        saved["threading"] = module.threading
+        module.threading = _WatchedThreading(watchdog)
+    for name in ("Lock", "RLock", "Condition"):
+        if getattr(module, name, None) is getattr(threading, name):
+            saved[name] = getattr(module, name)
+            setattr(module, name, getattr(watchdog, name))
+
+    # Threads aborted by the watchdog should not each print a traceback
+    excepthook = threading.excepthook
+
+    def quiet(args):
+        if not issubclass(args.exc_type, DeadlockDetected):
+            excepthook(args)
+
+    threading.excepthook = quiet
+    try:
+        yield watchdog
+    finally:
+        threading.excepthook = excepthook
+        for name, value in saved.items():
+            setattr(module, name, value)
+
+
+def format_deadlock(report: dict) -> List[str]:
+    """Human-readable lines for a deadlock report."""
+    lines = [f"{report['summary']} (detected after {report['detected_ms']:.0f}ms)"]
+    for entry in report["threads"]:
+        lines.append(f"{entry['thread']} waits for {entry['waiting_for']}, "
+                     f"held by {entry['held_by']}")
+        if entry["holds"]:
+            lines.append(f"    holds: {', '.join(entry['holds'])}")
+        for frame in entry["stack"]:
+            lines.append(f"    {frame}")
+    return lines
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python deadlock_watchdog.py <solution.py>")
+        sys.exit(1)
+
+    spec = importlib.util.spec_from_file_location("solution", sys.argv[1])
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    # Few accounts and many threads: the evaluator's cross-transfer test
+    with watched_locks(module) as watchdog:
+        bank = module.BankSystem()
+        names = [f"user_{i}" for i in range(5)]
+        for name in names:
+            bank.create_account(name, 1000.0)
+
+        def worker(seed: int):
+            rng = random.Random(seed)
+            for _ in range(100):
+                bank.transfer(*rng.sample(names, 2), rng.uniform(1, 100))
+
+        threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(50)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = (time.perf_counter() - start) * 1000
+
+    if watchdog.deadlock is None:
+        print(f"  ✓ no deadlock ({elapsed:.0f}ms)")
+        return
+    for line in format_deadlock(watchdog.deadlock):
+        print(f"  {line}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,10 @@ Evaluation script for Problem 4: Concurrent Bug Hunt
 Tests the solution under various concurrency scenarios.
 """
 
+import contextlib
 import importlib.util
+import inspect
+import io
 import json
 import random
 import sys
@@ -13,6 +16,12 @@ import time
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor, TimeoutError
 
+from deadlock_watchdog import format_deadlock, watched_locks
+from interleave import explore_all, format_result
+from latency import evaluate_latency
+from lock_profiler import format_report, profile_contention
+from scaling import evaluate_scaling, patched_sleep
+
 
 def load_solution(solution_path: str):
     """Dynamically load the solution module."""
@@ -22,34 +31,46 @@ def load_solution(solution_path: str):
     return module
 
 
-def stress_transfer(bank, accounts, num_transfers):
+def stress_transfer(bank, accounts, num_transfers, cents: bool = False):
     """Perform random transfers between accounts."""
     for _ in range(num_transfers):
         from_acc = random.choice(accounts)
         to_acc = random.choice(accounts)
         if from_acc != to_acc:
-            amount = random.uniform(1, 100)
+            amount = random.randint(100, 10_000) if cents else random.uniform(1, 100)
             bank.transfer(from_acc, to_acc, amount)
 
 
+def supports_cents(BankSystem) -> bool:
+    """Whether BankSystem(cents=True) gives an integer-cents ledger."""
+    try:
+        return "cents" in inspect.signature(BankSystem).parameters
+    except (TypeError, ValueError):
+        return False
+
+
 def test_concurrency(BankSystem, num_accounts: int, num_threads: int,
-                     transfers_per_thread: int, timeout: int = 30) -> dict:
-    """Run a concurrency test and return results."""
+                     transfers_per_thread: int, timeout: int = 30, watchdog=None,
+                     cents: bool = False) -> dict:
+    """Run a concurrency test and return results; with a watchdog, a lock
+    cycle ends the test as soon as it is detected. With cents, the bank runs
+    in integer-cents mode and money must be conserved exactly."""
     result = {
         "passed": False,
         "audit_passed": False,
         "completed": False,
         "deadlock": False,
         "error": None,
+        "discrepancy": 0,
         "runtime_ms": 0
     }
 
     try:
-        bank = BankSystem()
+        bank = BankSystem(cents=True) if cents else BankSystem()
 
         # Create accounts
         for i in range(num_accounts):
-            bank.create_account(f"user_{i}", 1000.0)
+            bank.create_account(f"user_{i}", 100_000 if cents else 1000.0)
 
         initial_total = bank.total_money
         accounts = list(bank.accounts.keys())
@@ -61,7 +82,7 @@ def test_concurrency(BankSystem, num_accounts: int, num_threads: int,
         for _ in range(num_threads):
             t = threading.Thread(
                 target=stress_transfer,
-                args=(bank, accounts, transfers_per_thread)
+                args=(bank, accounts, transfers_per_thread, cents)
             )
             threads.append(t)
             t.start()
@@ -74,7 +95,19 @@ def test_concurrency(BankSystem, num_accounts: int, num_threads: int,
                 result["deadlock"] = True
                 result["error"] = "Timeout - possible deadlock"
                 return result
-            t.join(timeout=remaining)
+            while watchdog is not None and t.is_alive() and time.time() < deadline:
+                if watchdog.deadlock is not None:
+                    result["deadlock"] = True
+                    result["error"] = f"Deadlock: {watchdog.deadlock['summary']}"
+                    result["deadlock_report"] = watchdog.deadlock
+                    result["runtime_ms"] = (time.time() - start) * 1000
+                    # Blocked threads raise DeadlockDetected; let them unwind
+                    unwind = time.time() + 1.0
+                    for other in threads:
+                        other.join(timeout=max(0.0, unwind - time.time()))
+                    return result
+                t.join(timeout=0.01)
+            t.join(timeout=max(0.0, deadline - time.time()))
             if t.is_alive():
                 result["deadlock"] = True
                 result["error"] = "Thread still running - possible deadlock"
@@ -89,8 +122,16 @@ def test_concurrency(BankSystem, num_accounts: int, num_threads: int,
         # Verify total money conserved
         final_total = sum(bank.accounts.values())
         discrepancy = abs(final_total - initial_total)
-
-        if discrepancy < 0.01:
+        result["discrepancy"] = final_total - initial_total
+
+        if cents:
+            if discrepancy == 0 and isinstance(final_total, int):
+                result["passed"] = True
+            elif discrepancy == 0:
+                result["error"] = f"Balances are not integer cents ({type(final_total).__name__})"
+            else:
+                result["error"] = f"Money not conserved: off by {discrepancy} cents"
+        elif discrepancy < 0.01:
             result["passed"] = True
         else:
             result["error"] = f"Money not conserved: lost ${discrepancy:.2f}"
@@ -101,55 +142,191 @@ def test_concurrency(BankSystem, num_accounts: int, num_threads: int,
     return result
 
 
-def test_not_serialized(BankSystem) -> dict:
-    """Test that the solution is actually concurrent, not serialized."""
-    result = {"passed": False, "error": None}
+def watched_concurrency(module, *args, **kwargs) -> dict:
+    """test_concurrency with the solution's locks under a deadlock watchdog."""
+    with watched_locks(module) as watchdog:
+        return test_concurrency(module.BankSystem, *args, watchdog=watchdog, **kwargs)
 
-    try:
-        bank = BankSystem()
 
-        for i in range(4):
-            bank.create_account(f"user_{i}", 10000.0)
+def report_failure(test: dict, default: str = "audit failed"):
+    print(f"  ✗ Failed: {test.get('error', default)}")
+    if "deadlock_report" in test:
+        for line in format_deadlock(test["deadlock_report"]):
+            print(f"    {line}")
 
-        accounts = list(bank.accounts.keys())
 
-        # Time sequential transfers
-        start_seq = time.time()
-        for _ in range(100):
-            bank.transfer(accounts[0], accounts[1], 1)
-        seq_time = time.time() - start_seq
+# In test_concurrent_audits, one deposit and one withdrawal per this many
+# operations
+DEPOSIT_EVERY = 5
 
-        # Time concurrent transfers
-        start_conc = time.time()
-        threads = []
-        for _ in range(4):
-            t = threading.Thread(target=lambda: [
-                bank.transfer(accounts[i % 4], accounts[(i + 1) % 4], 1)
-                for i in range(25)
-            ])
-            threads.append(t)
-            t.start()
 
+def test_concurrent_audits(BankSystem, num_accounts: int = 20, num_threads: int = 16,
+                           duration: float = 1.0) -> dict:
+    """
+    Operation throughput with and without one thread auditing continuously.
+
+    Every DEPOSIT_EVERY-th operation of a thread is a deposit and the one
+    after it a withdrawal, so audits also see total_money change.
+    """
+    result = {
+        "passed": False,
+        "audits": 0,
+        "failed_audits": 0,
+        "tps_alone": 0,
+        "tps_audited": 0,
+        "retained": 0,
+        "error": None
+    }
+
+    def run(audit: bool) -> tuple:
+        bank = BankSystem()
+        names = [f"user_{i}" for i in range(num_accounts)]
+        for name in names:
+            bank.create_account(name, 1000.0)
+        stop = threading.Event()
+        counts = [0] * num_threads
+        net = [0.0] * num_threads
+        audits = [0, 0]
+
+        def transfers(i: int):
+            rng = random.Random(i)
+            while not stop.is_set():
+                step = counts[i] % DEPOSIT_EVERY
+                if step == 0:
+                    amount = float(rng.randint(1, 50))
+                    if bank.deposit(rng.choice(names), amount):
+                        net[i] += amount
+                elif step == 1:
+                    amount = float(rng.randint(1, 50))
+                    if bank.withdraw(rng.choice(names), amount):
+                        net[i] -= amount
+                else:
+                    bank.transfer(*rng.sample(names, 2), rng.uniform(1, 100))
+                counts[i] += 1
+
+        def auditor():
+            while not stop.is_set():
+                audits[0] += 1
+                if not bank.audit():
+                    audits[1] += 1
+
+        threads = [threading.Thread(target=transfers, args=(i,), daemon=True) for i in range(num_threads)]
+        if audit:
+            threads.append(threading.Thread(target=auditor, daemon=True))
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        time.sleep(duration)
+        stop.set()
         for t in threads:
-            t.join()
+            t.join(timeout=30)
+            if t.is_alive():
+                raise RuntimeError("Thread still running - possible deadlock")
+        elapsed = time.perf_counter() - start
+        if abs(sum(bank.accounts.values()) - 1000.0 * num_accounts - sum(net)) >= 0.01:
+            raise RuntimeError("Money not conserved")
+        return sum(counts) / elapsed, audits
 
-        conc_time = time.time() - start_conc
+    try:
+        # Audits of broken solutions print their discrepancies; keep them quiet
+        with contextlib.redirect_stdout(io.StringIO()):
+            result["tps_alone"], _ = run(False)
+            result["tps_audited"], (audits, failed) = run(True)
+        result["audits"] = audits
+        result["failed_audits"] = failed
+        result["retained"] = result["tps_audited"] / result["tps_alone"]
+        result["passed"] = audits > 0 and failed == 0
+        if not audits:
+            result["error"] = "no audit completed"
+        elif failed:
+            result["error"] = f"{failed} of {audits} audits reported a discrepancy"
+    except Exception as e:
+        result["error"] = str(e)
+
+    return result
 
-        # If fully serialized, concurrent should take ~same as sequential
-        # If concurrent, should be faster (or at least not much slower)
-        # Allow 3x slower due to lock overhead, but not 10x (which would indicate serialization)
-        if conc_time < seq_time * 5:
-            result["passed"] = True
-        else:
-            result["error"] = f"Appears serialized: seq={seq_time*1000:.0f}ms, conc={conc_time*1000:.0f}ms"
 
+def test_batch_transfers(module, num_accounts: int = 32, num_threads: int = 8,
+                         batches_per_thread: int = 10, batch_size: int = 50) -> dict:
+    """Compare transfer_many() with the same transfers as single calls."""
+    result = {
+        "passed": False,
+        "transfers": num_threads * batches_per_thread * batch_size,
+        "batch_tps": 0,
+        "single_tps": 0,
+        "speedup": 0,
+        "error": None
+    }
+    BankSystem = module.BankSystem
+    if not hasattr(BankSystem, "transfer_many"):
+        result["error"] = "transfer_many not implemented"
+        return result
+
+    names = [f"user_{i}" for i in range(num_accounts)]
+    rng = random.Random(0)
+    work = [[[(*rng.sample(names, 2), rng.randint(1, 50)) for _ in range(batch_size)]
+             for _ in range(batches_per_thread)]
+            for _ in range(num_threads)]
+
+    def single(bank, batches, counts, i):
+        counts[i] = sum(1 for batch in batches for item in batch if bank.transfer(*item))
+
+    def batched(bank, batches, counts, i):
+        for batch in batches:
+            outcome = bank.transfer_many(batch)
+            if len(outcome) != len(batch):
+                raise ValueError(f"transfer_many returned {len(outcome)} results for {len(batch)} transfers")
+            counts[i] += sum(1 for ok in outcome if ok)
+
+    def run(worker) -> tuple:
+        bank = BankSystem()
+        for name in names:
+            bank.create_account(name, 1000.0)
+        counts = [0] * num_threads
+        errors = []
+
+        def guarded(i):
+            try:
+                worker(bank, work[i], counts, i)
+            except Exception as e:
+                errors.append(str(e))
+
+        threads = [threading.Thread(target=guarded, args=(i,), daemon=True) for i in range(num_threads)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=30)
+            if t.is_alive():
+                raise RuntimeError("Thread still running - possible deadlock")
+        elapsed = time.perf_counter() - start
+        if errors:
+            raise RuntimeError(errors[0])
+
+        succeeded = sum(counts)
+        if abs(sum(bank.accounts.values()) - 1000.0 * num_accounts - sum(net)) >= 0.01:
+            raise RuntimeError("Money not conserved")
+        logged = bank.get_transaction_count() if hasattr(bank, 'get_transaction_count') else len(bank.transaction_log)
+        if logged != succeeded:
+            raise RuntimeError(f"{logged} logged vs {succeeded} successful")
+        return elapsed, succeeded
+
+    try:
+        # Simulated delays neutralised: this compares lock and log overhead
+        with patched_sleep(module, 0):
+            single_time, _ = run(single)
+            batch_time, _ = run(batched)
+        result["single_tps"] = result["transfers"] / single_time
+        result["batch_tps"] = result["transfers"] / batch_time
+        result["speedup"] = single_time / batch_time
+        result["passed"] = True
     except Exception as e:
         result["error"] = str(e)
 
     return result
 
 
-def evaluate(solution_path: str) -> dict:
+def evaluate(solution_path: str, multiprocess: bool = False, use_asyncio: bool = False) -> dict:
     """Run all tests on the solution."""
     results = {
         "tests": [],
@@ -167,47 +344,47 @@ def evaluate(solution_path: str) -> dict:
 
     # Test 1: 2 threads (10 pts)
     print("Test 1: 2 threads, 10 accounts, 100 transfers each...")
-    test1 = test_concurrency(BankSystem, 10, 2, 100)
+    test1 = watched_concurrency(module, 10, 2, 100)
     results["tests"].append({"name": "2_threads", **test1})
     if test1["passed"]:
         results["scores"]["2_threads"] = 10
         print("  ✓ Passed")
     else:
         results["scores"]["2_threads"] = 0
-        print(f"  ✗ Failed: {test1.get('error', 'audit failed')}")
+        report_failure(test1)
 
     # Test 2: 10 threads (15 pts)
     print("Test 2: 10 threads, 10 accounts, 50 transfers each...")
-    test2 = test_concurrency(BankSystem, 10, 10, 50)
+    test2 = watched_concurrency(module, 10, 10, 50)
     results["tests"].append({"name": "10_threads", **test2})
     if test2["passed"]:
         results["scores"]["10_threads"] = 15
         print("  ✓ Passed")
     else:
         results["scores"]["10_threads"] = 0
-        print(f"  ✗ Failed: {test2.get('error', 'audit failed')}")
+        report_failure(test2)
 
     # Test 3: 100 threads (15 pts)
     print("Test 3: 100 threads, 20 accounts, 20 transfers each...")
-    test3 = test_concurrency(BankSystem, 20, 100, 20, timeout=60)
+    test3 = watched_concurrency(module, 20, 100, 20, timeout=60)
     results["tests"].append({"name": "100_threads", **test3})
     if test3["passed"]:
         results["scores"]["100_threads"] = 15
         print("  ✓ Passed")
     else:
         results["scores"]["100_threads"] = 0
-        print(f"  ✗ Failed: {test3.get('error', 'audit failed')}")
+        report_failure(test3)
 
     # Test 4: No deadlocks (20 pts)
     print("Test 4: Deadlock test (many cross transfers)...")
-    test4 = test_concurrency(BankSystem, 5, 50, 100, timeout=30)
+    test4 = watched_concurrency(module, 5, 50, 100, timeout=30)
     results["tests"].append({"name": "deadlock_test", **test4})
     if test4["completed"] and not test4["deadlock"]:
         results["scores"]["no_deadlock"] = 20
         print(f"  ✓ Passed ({test4['runtime_ms']:.0f}ms)")
     else:
         results["scores"]["no_deadlock"] = 0
-        print(f"  ✗ Failed: {test4.get('error', 'deadlock detected')}")
+        report_failure(test4, "deadlock detected")
 
     # Test 5: Transaction log consistency (15 pts)
     print("Test 5: Transaction log consistency...")
@@ -233,20 +410,101 @@ def evaluate(solution_path: str) -> dict:
         results["scores"]["transaction_log"] = 0
         print(f"  ✗ Failed: {e}")
 
-    # Test 6: Not serialized (15 pts)
-    print("Test 6: Concurrency preserved (not serialized)...")
-    test6 = test_not_serialized(BankSystem)
-    results["tests"].append({"name": "not_serialized", **test6})
-    if test6["passed"]:
-        results["scores"]["concurrent"] = 15
-        print("  ✓ Passed")
+    # Concurrent audits (not scored); run before the speed tests, which only
+    # score a bank that passed them and Tests 1-4
+    print("Concurrent audits: continuous audit() during transfers, deposits, withdrawals...")
+    audited = test_concurrent_audits(BankSystem)
+    results["concurrent_audits"] = audited
+    if audited["audits"]:
+        mark = "✓" if audited["passed"] else "✗"
+        print(f"  {mark} {audited['audits']:,} audits, {audited['failed_audits']} failed; operations "
+              f"{audited['tps_audited']:,.0f}/s audited vs {audited['tps_alone']:,.0f}/s alone "
+              f"({audited['retained']:.0%} retained)")
     else:
-        results["scores"]["concurrent"] = 0
-        print(f"  ✗ Failed: {test6.get('error', 'appears serialized')}")
-
-    # Test 7: Code quality (10 pts) - manual assessment
+        print(f"  ✗ Failed: {audited['error']}")
+    correct = audited["passed"] and all(test["passed"] for test in (test1, test2, test3, test4))
+
+    # Test 6: Throughput scaling vs a global lock (10 pts)
+    print("Test 6: Throughput scaling (disjoint vs contended accounts)...")
+    test6 = evaluate_scaling(module, points=10, correct=correct)
+    results["scaling"] = test6
+    results["scores"]["concurrent"] = test6["earned"]
+    for detail in test6["details"]:
+        print(f"  {detail}")
+
+    # Test 7: Tail latency under contention (5 pts)
+    print("Test 7: Operation latency percentiles (us)...")
+    test7 = evaluate_latency(module, points=5, correct=correct)
+    results["latency"] = test7
+    results["scores"]["tail_latency"] = test7["earned"]
+    for detail in test7["details"]:
+        print(f"  {detail}")
+
+    # Integer-cents ledger (not scored)
+    print("Integer-cents ledger: exact conservation...")
+    if supports_cents(BankSystem):
+        exact = watched_concurrency(module, 10, 10, 50, cents=True)
+        results["cents"] = exact
+        if exact["passed"]:
+            print(f"  ✓ Exact: 0 cents discrepancy (float mode drift in Test 2: "
+                  f"{test2['discrepancy']:+.2e})")
+        else:
+            report_failure(exact)
+    else:
+        print("  - Skipped: BankSystem has no cents mode")
+
+    # Batch transfers (not scored)
+    print("Batch transfers: transfer_many vs single calls...")
+    batch = test_batch_transfers(module)
+    results["batch"] = batch
+    if batch["passed"]:
+        print(f"  ✓ {batch['transfers']:,} transfers: {batch['batch_tps']:,.0f}/s batched vs "
+              f"{batch['single_tps']:,.0f}/s single ({batch['speedup']:.1f}x)")
+    elif batch["error"] == "transfer_many not implemented":
+        print("  - Skipped: transfer_many not implemented")
+    else:
+        print(f"  ✗ Failed: {batch['error']}")
+
+    # Lock contention profile (not scored)
+    print("Lock contention profile (10 threads, ranked by wait)...")
+    profile = profile_contention(module)
+    results["lock_profile"] = profile
+    for line in format_report(profile):
+        print(f"  {line}")
+
+    # Interleaving exploration (not scored)
+    print("Interleaving exploration (controlled schedules, replayable)...")
+    explored = explore_all(module)
+    results["interleavings"] = explored
+    for result in explored:
+        print(f"  {format_result(result)}")
+
+    if multiprocess:
+        # Unscored: balances in shared memory, transfers from forked processes
+        from shared_bank import evaluate_multiprocess
+
+        print("Multiprocess shared-memory stress...")
+        shared = evaluate_multiprocess(module)
+        results["multiprocess"] = shared
+        print(f"  cores: {shared['cores']}")
+        for detail in shared["details"]:
+            print(f"  {detail}")
+
+    if use_asyncio:
+        # Unscored: 10k coroutines over an AsyncBankSystem vs the threaded bank
+        from async_bank import evaluate_async
+
+        print("asyncio coroutine stress...")
+        coroutines = evaluate_async(module)
+        results["asyncio"] = coroutines
+        print(f"  {coroutines['coroutines']:,} coroutines, {coroutines['transfers']:,} transfers "
+              f"(threaded: {coroutines['threads']} threads)")
+        for detail in coroutines["details"]:
+            print(f"  {detail}")
+
+    # Test 8: Code quality (10 pts) - manual assessment
     results["scores"]["code_quality"] = 10  # Assume pass for automated
-    print("Test 7: Code quality (manual review)...")
+    print("Test 8: Code quality (manual review)...")
     print("  ◐ Assumed 10 pts (requires manual review)")
 
     results["total_score"] = sum(results["scores"].values())
@@ -256,7 +514,7 @@ def evaluate(solution_path: str) -> dict:
 
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python evaluate_p4.py <solution.py>")
+        print("Usage: python evaluate_p4.py <solution.py> [--multiprocess] [--asyncio]")
         sys.exit(1)
 
     solution_path = sys.argv[1]
@@ -265,7 +523,8 @@ def main():
     print("Problem 4: Concurrent Bug Hunt - Evaluation")
     print("=" * 60 + "\n")
 
-    results = evaluate(solution_path)
+    results = evaluate(solution_path, multiprocess="--multiprocess" in sys.argv[2:],
+                       use_asyncio="--asyncio" in sys.argv[2:])
 
     print("\n" + "=" * 60)
     print("Score Breakdown:")
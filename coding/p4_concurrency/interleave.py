@@ -0,0 +1,649 @@
+#!/usr/bin/env python3
+"""
+Deterministic interleaving explorer for Problem 4: Concurrent Bug Hunt.
+
+Runs small BankSystem scenarios under a cooperative scheduler: each task is a
+real thread, but only the one the scheduler picks runs, and control can only
+change hands at preemption points:
+
+    lock operations       acquire on the module's Lock/RLock/Condition
+    shared attributes     reads of numbers/strings and writes of existing
+                          attributes on instances of the solution's classes
+    shared containers     item reads/writes of the bank's dicts, list appends
+    time.sleep            yields instead of sleeping
+
+Schedules are explored systematically (depth-first over choice points with a
+preemption bound) and then randomly from a seed. Every run records the task
+chosen at each choice point, so any race or deadlock found can be replayed
+exactly with that schedule. A deadlock is detected the moment no task can
+run, and reported with the locks each task holds and waits for.
+
+Usage: python interleave.py solution.py [scenario schedule]
+       schedule is comma-separated task ids, e.g. 0,1,1,0
+"""
+
+import importlib.util
+import io
+import numbers
+import random
+import sys
+import threading
+import time
+from contextlib import redirect_stdout
+from typing import Callable, Dict, List, Optional
+
+MAIN = -1
+RUN_TIMEOUT = 5.0
+PREEMPTION_BOUND = 2
+SYSTEMATIC_RUNS = 200
+RANDOM_RUNS = 200
+
+# Attribute and item values whose reads are preemption points
+SHARED_VALUES = (numbers.Number, str)
+
+REAL_LOCK_TYPES = (type(threading.Lock()), type(threading.RLock()))
+
+# (name, description, initial balances, operations per task)
+SCENARIOS = [
+    ("overdraft", "two transfers racing to spend one balance",
+     {"a": 100, "b": 0, "c": 0},
+     [[("transfer", "a", "b", 100)],
+      [("transfer", "a", "c", 100)],
+      [("audit",)]]),
+    ("opposite_transfers", "transfers in opposite directions",
+     {"a": 100, "b": 100},
+     [[("transfer", "a", "b", 10), ("transfer", "a", "b", 10)],
+      [("transfer", "b", "a", 10), ("transfer", "b", "a", 10)],
+      [("audit",)]]),
+    ("deposit_withdraw", "deposits, withdrawals and transfers on shared accounts",
+     {"a": 100, "b": 100},
+     [[("deposit", "a", 10), ("withdraw", "b", 30)],
+      [("withdraw", "a", 50), ("transfer", "b", "a", 20)],
+      [("deposit", "b", 5), ("audit",)]]),
+    ("create_accounts", "accounts created concurrently",
+     {"a": 100},
+     [[("create_account", "x", 50)],
+      [("create_account", "y", 25)],
+      [("create_account", "x", 10)]]),
+]
+
+
+class _Abort(BaseException):
+    """Unwinds scheduled tasks once a run has failed."""
+
+
+class Task:
+    __slots__ = ("id", "done", "ready", "timed", "timed_out", "wants")
+
+    def __init__(self, task_id: int):
+        self.id = task_id
+        self.done = False
+        self.ready: Optional[Callable] = None
+        self.timed = False
+        self.timed_out = False
+        self.wants = None
+
+
+class Scheduler:
+    """Runs one task at a time, switching only at preemption points."""
+
+    def __init__(self, chooser: Callable):
+        self.chooser = chooser
+        self.cv = threading.Condition()
+        self.local = threading.local()
+        self.tasks: List[Task] = []
+        self.locks: List["SchedLock"] = []
+        self.current: Optional[int] = None
+        # (task running before the choice, runnable task ids, task chosen)
+        self.choices: List[tuple] = []
+        self.failure: Optional[tuple] = None
+        self.aborted = False
+
+    def task(self) -> Optional[Task]:
+        return getattr(self.local, "task", None)
+
+    def preempt(self):
+        """Give the scheduler a chance to switch tasks."""
+        task = self.task()
+        if task is None:
+            return
+        with self.cv:
+            self._switch()
+            self._wait_turn(task)
+
+    def block(self, task: Task, ready: Callable, timed: bool) -> bool:
+        """Park the task until ready() holds; False if it timed out instead."""
+        task.ready = ready
+        task.timed = timed
+        task.timed_out = False
+        try:
+            self.preempt()
+        finally:
+            task.ready = None
+            task.timed = False
+        return not task.timed_out
+
+    def _wait_turn(self, task: Task):
+        self.cv.wait_for(lambda: self.current == task.id or self.aborted)
+        if self.aborted:
+            raise _Abort()
+
+    def _switch(self):
+        alive = [t for t in self.tasks if not t.done]
+        runnable = [t.id for t in alive if t.ready is None or t.ready()]
+        if not runnable:
+            if not alive:
+                self.current = None
+                self.cv.notify_all()
+                return
+            timed = [t for t in alive if t.timed]
+            if not timed:
+                self.failure = ("deadlock", self._describe(alive))
+                self.aborted = True
+                self.cv.notify_all()
+                return
+            # Only timed waits remain: the first one times out
+            timed[0].timed_out = True
+            runnable = [timed[0].id]
+
+        if len(runnable) == 1:
+            chosen = runnable[0]
+        else:
+            chosen = self.chooser(len(self.choices), self.current, runnable)
+            self.choices.append((self.current, runnable, chosen))
+        self.current = chosen
+        self.cv.notify_all()
+
+    def _describe(self, alive: List[Task]) -> str:
+        parts = []
+        for task in alive:
+            holds = [lock.label for lock in self.locks if lock.owner == task.id]
+            wants = task.wants.label if task.wants is not None else "?"
+            parts.append(f"task {task.id} holds [{', '.join(holds)}] waits for {wants}")
+        return "; ".join(parts)
+
+    def _run_task(self, task: Task, body: Callable):
+        self.local.task = task
+        try:
+            with self.cv:
+                self._wait_turn(task)
+            body()
+        except _Abort:
+            pass
+        except Exception as e:
+            with self.cv:
+                if self.failure is None:
+                    self.failure = ("error", f"task {task.id}: {type(e).__name__}: {e}")
+                self.aborted = True
+        finally:
+            with self.cv:
+                task.done = True
+                if self.aborted:
+                    self.cv.notify_all()
+                else:
+                    self._switch()
+
+    def run(self, bodies: List[Callable], timeout: float = RUN_TIMEOUT):
+        """Run bodies as scheduled tasks until all finish or the run fails."""
+        self.tasks = [Task(i) for i in range(len(bodies))]
+        for task, body in zip(self.tasks, bodies):
+            threading.Thread(target=self._run_task, args=(task, body), daemon=True).start()
+
+        finished = lambda: all(t.done for t in self.tasks)
+        with self.cv:
+            self._switch()
+            if not self.cv.wait_for(lambda: finished() or self.aborted, timeout):
+                self.failure = ("hang", "blocked outside the instrumented locks "
+                                        f"for {timeout:.0f}s")
+                self.aborted = True
+                self.cv.notify_all()
+            if self.aborted:
+                self.cv.wait_for(finished, 1.0)
+
+
+class SchedLock:
+    """Cooperative stand-in for threading.Lock."""
+
+    reentrant = False
+
+    def __init__(self, scheduler: Scheduler, label: str):
+        self._scheduler = scheduler
+        self.label = label
+        self.owner: Optional[int] = None
+        self.count = 0
+        scheduler.locks.append(self)
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        scheduler = self._scheduler
+        task = scheduler.task()
+        me = task.id if task is not None else MAIN
+        if task is not None:
+            scheduler.preempt()
+
+        if self.reentrant and self.owner == me:
+            self.count += 1
+            return True
+        if self.owner is not None:
+            if task is None:
+                raise RuntimeError(f"{self.label} held by task {self.owner} outside a schedule")
+            if not blocking:
+                return False
+            task.wants = self
+            acquired = scheduler.block(task, lambda: self.owner is None, timeout >= 0)
+            task.wants = None
+            if not acquired:
+                return False
+        self.owner = me
+        self.count = 1
+        return True
+
+    def release(self):
+        if self.owner is None:
+            raise RuntimeError("release unlocked lock")
+        if self.reentrant:
+            task = self._scheduler.task()
+            if self.owner != (task.id if task is not None else MAIN):
+                raise RuntimeError("cannot release un-acquired lock")
+            self.count -= 1
+            if self.count:
+                return
+        self.owner = None
+        self.count = 0
+
+    def locked(self) -> bool:
+        return self.owner is not None
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class SchedRLock(SchedLock):
+    """Cooperative stand-in for threading.RLock."""
+
+    reentrant = True
+
+
+class SchedCondition:
+    """Cooperative stand-in for threading.Condition."""
+
+    def __init__(self, scheduler: Scheduler, label: str, lock=None):
+        self._scheduler = scheduler
+        self._lock = lock if lock is not None else SchedRLock(scheduler, label)
+        self._waiters: List[Task] = []
+        self.label = label
+        self.acquire = self._lock.acquire
+        self.release = self._lock.release
+
+    def __enter__(self):
+        return self._lock.__enter__()
+
+    def __exit__(self, *exc):
+        self._lock.__exit__(*exc)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        task = self._scheduler.task()
+        if task is None:
+            raise RuntimeError("Condition.wait outside a schedule")
+        lock = self._lock
+        depth = lock.count
+        lock.owner = None
+        lock.count = 0
+        self._waiters.append(task)
+        task.wants = self
+        notified = self._scheduler.block(task, lambda: task not in self._waiters,
+                                         timeout is not None)
+        task.wants = None
+        if not notified:
+            self._waiters.remove(task)
+        lock.acquire()
+        lock.count = depth
+        return notified
+
+    def wait_for(self, predicate: Callable, timeout: Optional[float] = None):
+        result = predicate()
+        while not result:
+            if not self.wait(timeout):
+                return predicate()
+            result = predicate()
+        return result
+
+    def notify(self, n: int = 1):
+        del self._waiters[:n]
+
+    def notify_all(self):
+        self._waiters.clear()
+
+
+def _creation_label(scheduler: Scheduler) -> str:
+    frame = sys._getframe(2)
+    while frame and frame.f_code.co_filename == __file__:
+        frame = frame.f_back
+    where = f"{frame.f_code.co_name}:{frame.f_lineno}" if frame else "?"
+    return f"lock#{len(scheduler.locks)}@{where}"
+
+
+class _CoopThreading:
+    """Stand-in for a solution's threading module with cooperative locks."""
+
+    def __init__(self, scheduler: Scheduler):
+        self.Lock = lambda: SchedLock(scheduler, _creation_label(scheduler))
+        self.RLock = lambda: SchedRLock(scheduler, _creation_label(scheduler))
+        self.Condition = lambda lock=None: SchedCondition(
+            scheduler, _creation_label(scheduler), lock)
+
+    def __getattr__(self, name):
+        return getattr(threading, name)
+
+
+class _CoopTime:
+    """Stand-in for a solution's time module whose sleep is a preemption point."""
+
+    def __init__(self, scheduler: Scheduler):
+        self.sleep = lambda seconds: scheduler.preempt()
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+class SchedDict(dict):
+    """dict whose item reads and writes are preemption points."""
+
+    _scheduler: Scheduler = None
+
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        if isinstance(value, SHARED_VALUES):
+            self._scheduler.preempt()
+        return value
+
+    def get(self, key, default=None):
+        value = dict.get(self, key, default)
+        if isinstance(value, SHARED_VALUES):
+            self._scheduler.preempt()
+        return value
+
+    def __setitem__(self, key, value):
+        self._scheduler.preempt()
+        dict.__setitem__(self, key, value)
+
+
+class SchedList(list):
+    """list whose appends are preemption points."""
+
+    _scheduler: Scheduler = None
+
+    def append(self, item):
+        self._scheduler.preempt()
+        list.append(self, item)
+
+
+def _hook_class(cls, scheduler: Scheduler):
+    get = cls.__getattribute__
+    set_ = cls.__setattr__
+
+    def __getattribute__(self, name):
+        value = get(self, name)
+        if isinstance(value, SHARED_VALUES) and name[:2] != "__":
+            scheduler.preempt()
+        return value
+
+    def __setattr__(self, name, value):
+        # Writes to attributes that already exist; __init__ is not a race
+        if name[:2] != "__" and scheduler.task() is not None:
+            try:
+                get(self, name)
+                scheduler.preempt()
+            except AttributeError:
+                pass
+        set_(self, name, value)
+
+    cls.__getattribute__ = __getattribute__
+    cls.__setattr__ = __setattr__
+
+
+def install(module, scheduler: Scheduler) -> Callable:
+    """Instrument a loaded solution module; returns a function undoing it."""
+    saved = []
+
+    def replace(owner, name, value):
+        saved.append((owner, name, owner.__dict__.get(name, saved)))
+        setattr(owner, name, value)
+
+    coop = _CoopThreading(scheduler)
+    if getattr(module, "threading", None) is threading:
+        replace(module, "threading", coop)
+    if getattr(module, "time", None) is time:
+        replace(module, "time", _CoopTime(scheduler))
+    if getattr(module, "sleep", None) is time.sleep:
+        replace(module, "sleep", _CoopTime(scheduler).sleep)
+    for name in ("Lock", "RLock", "Condition"):
+        if getattr(module, name, None) is getattr(threading, name):
+            replace(module, name, getattr(coop, name))
+
+    classes = [value for value in vars(module).values()
+               if isinstance(value, type) and value.__module__ == module.__name__]
+    for owner in [module] + classes:
+        for name, value in list(vars(owner).items()):
+            if isinstance(value, REAL_LOCK_TYPES):
+                lock_type = SchedRLock if isinstance(value, REAL_LOCK_TYPES[1]) else SchedLock
+                replace(owner, name, lock_type(scheduler, f"{owner.__name__}.{name}"))
+    for cls in classes:
+        saved.append((cls, "__getattribute__", cls.__dict__.get("__getattribute__", saved)))
+        saved.append((cls, "__setattr__", cls.__dict__.get("__setattr__", saved)))
+        _hook_class(cls, scheduler)
+
+    SchedDict._scheduler = SchedList._scheduler = scheduler
+
+    def restore():
+        for owner, name, value in reversed(saved):
+            if value is saved:
+                delattr(owner, name)
+            else:
+                setattr(owner, name, value)
+
+    return restore
+
+
+def _wrap_containers(bank):
+    for name, value in list(vars(bank).items()):
+        if type(value) is dict:
+            object.__setattr__(bank, name, SchedDict(value))
+        elif type(value) is list:
+            object.__setattr__(bank, name, SchedList(value))
+
+
+def check_invariants(bank, balances: Dict[str, float], outcomes: List[list]) -> Optional[str]:
+    """
+    Audits during the run, then conservation, non-negative balances, audit
+    and log count after it.
+    """
+    expected = sum(balances.values())
+    names = set(balances)
+    transfers = 0
+    for task, entries in enumerate(outcomes):
+        for op, ok in entries:
+            if op[0] == "audit" and not ok:
+                return f"audit() returned False during the run (task {task})"
+    for op, ok in (entry for task in outcomes for entry in task):
+        if not ok:
+            continue
+        if op[0] == "deposit":
+            expected += op[2]
+        elif op[0] == "withdraw":
+            expected -= op[2]
+        elif op[0] == "create_account":
+            expected += op[2]
+            names.add(op[1])
+        elif op[0] == "transfer":
+            transfers += 1
+
+    found = {name: bank.get_balance(name) for name in sorted(names)}
+    negative = [f"{name}={value}" for name, value in found.items() if value is not None and value < 0]
+    if negative:
+        return f"negative balance: {', '.join(negative)}"
+    total = sum(value or 0 for value in found.values())
+    if abs(total - expected) >= 0.01:
+        return f"money not conserved: expected {expected}, found {total} {found}"
+    if not bank.audit():
+        return "audit() failed after all tasks finished"
+    if hasattr(bank, "get_transaction_count"):
+        logged = bank.get_transaction_count()
+        if logged != transfers:
+            return f"{logged} transfers logged vs {transfers} successful"
+    return None
+
+
+def run_schedule(module, scenario: tuple, chooser: Callable,
+                 timeout: float = RUN_TIMEOUT) -> dict:
+    """Run one scenario under one schedule; returns failure, schedule and choices."""
+    _, _, balances, task_ops = scenario
+    scheduler = Scheduler(chooser)
+    restore = install(module, scheduler)
+    failure = None
+    try:
+        with redirect_stdout(io.StringIO()):
+            bank = module.BankSystem()
+            for name, balance in balances.items():
+                bank.create_account(name, balance)
+            _wrap_containers(bank)
+
+            outcomes = [[] for _ in task_ops]
+
+            def body(i: int) -> Callable:
+                def run_ops():
+                    for op in task_ops[i]:
+                        outcomes[i].append((op, getattr(bank, op[0])(*op[1:])))
+                return run_ops
+
+            scheduler.run([body(i) for i in range(len(task_ops))], timeout)
+            failure = scheduler.failure
+            if failure is None:
+                message = check_invariants(bank, balances, outcomes)
+                if message:
+                    failure = ("race", message)
+    except Exception as e:
+        failure = ("error", f"{type(e).__name__}: {e}")
+    finally:
+        restore()
+
+    return {
+        "failure": failure,
+        "schedule": [chosen for _, _, chosen in scheduler.choices],
+        "choices": scheduler.choices,
+    }
+
+
+def _prefix_chooser(prefix: List[int]) -> Callable:
+    """Follow prefix, then keep running the current task when possible."""
+    def choose(step: int, current: Optional[int], runnable: List[int]) -> int:
+        if step < len(prefix) and prefix[step] in runnable:
+            return prefix[step]
+        return current if current in runnable else runnable[0]
+    return choose
+
+
+def _random_chooser(seed: int) -> Callable:
+    rng = random.Random(seed)
+    return lambda step, current, runnable: rng.choice(runnable)
+
+
+def _preemptions(choices: List[tuple]) -> int:
+    return sum(1 for current, runnable, chosen in choices
+               if current in runnable and chosen != current)
+
+
+def explore(module, scenario: tuple, preemption_bound: int = PREEMPTION_BOUND,
+            systematic_runs: int = SYSTEMATIC_RUNS, random_runs: int = RANDOM_RUNS,
+            seed: int = 0) -> dict:
+    """
+    Search a scenario's schedules for a race, deadlock or error.
+
+    Depth-first over choice points with at most preemption_bound preemptions,
+    then random schedules from seed. Stops at the first failure.
+    """
+    result = {"scenario": scenario[0], "runs": 0, "failure": None,
+              "schedule": None, "mode": None, "elapsed_ms": 0.0}
+    start = time.perf_counter()
+
+    def finish(run: dict, mode: str) -> dict:
+        result.update(failure=run["failure"], schedule=run["schedule"], mode=mode)
+        result["elapsed_ms"] = (time.perf_counter() - start) * 1000
+        return result
+
+    stack = [[]]
+    while stack and result["runs"] < systematic_runs:
+        prefix = stack.pop()
+        run = run_schedule(module, scenario, _prefix_chooser(prefix))
+        result["runs"] += 1
+        if run["failure"]:
+            return finish(run, "systematic")
+        choices = run["choices"]
+        for i in range(len(choices) - 1, len(prefix) - 1, -1):
+            current, runnable, chosen = choices[i]
+            for alternative in runnable:
+                if alternative == chosen:
+                    continue
+                preempts = _preemptions(choices[:i]) + (current in runnable and alternative != current)
+                if preempts <= preemption_bound:
+                    stack.append([c for _, _, c in choices[:i]] + [alternative])
+
+    for offset in range(random_runs):
+        run = run_schedule(module, scenario, _random_chooser(seed + offset))
+        result["runs"] += 1
+        if run["failure"]:
+            result["seed"] = seed + offset
+            return finish(run, "random")
+
+    result["elapsed_ms"] = (time.perf_counter() - start) * 1000
+    return result
+
+
+def replay(module, scenario_name: str, schedule: List[int]) -> dict:
+    """Rerun one scenario under a recorded schedule."""
+    scenario = next(s for s in SCENARIOS if s[0] == scenario_name)
+    return run_schedule(module, scenario, _prefix_chooser(schedule))
+
+
+def explore_all(module, **kwargs) -> List[dict]:
+    return [explore(module, scenario, **kwargs) for scenario in SCENARIOS]
+
+
+def format_result(result: dict) -> str:
+    name = result["scenario"]
+    if result["failure"] is None:
+        return (f"✓ {name}: no race or deadlock in {result['runs']} schedules "
+                f"({result['elapsed_ms']:.0f}ms)")
+    kind, message = result["failure"]
+    schedule = ",".join(map(str, result["schedule"]))
+    return (f"✗ {name}: {kind} after {result['runs']} schedules "
+            f"({result['elapsed_ms']:.0f}ms) - {message} [replay: {name} {schedule or '-'}]")
+
+
+def load_module(path: str):
+    spec = importlib.util.spec_from_file_location("solution", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def main():
+    if len(sys.argv) not in (2, 4):
+        print("Usage: python interleave.py <solution.py> [scenario schedule]")
+        sys.exit(1)
+
+    module = load_module(sys.argv[1])
+    if len(sys.argv) == 4:
+        schedule = [int(t) for t in sys.argv[3].split(",") if t not in ("", "-")]
+        run = replay(module, sys.argv[2], schedule)
+        print(f"  {run['failure'] or 'no failure'}")
+        return
+
+    for result in explore_all(module):
+        print(f"  {format_result(result)}")
+
+
+if __name__ == "__main__":
+    main()
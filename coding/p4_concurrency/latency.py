@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Per-operation latency histograms for Problem 4: Concurrent Bug Hunt.
+
+Averages hide tails: a lock convoy or an audit that stops every transfer
+shows up at p99, not in the mean. Each worker thread times its own
+transfer/deposit/withdraw/audit calls with perf_counter_ns into
+thread-local LatencyHistograms, so recording takes no lock. The histograms
+are merged once the threads finish.
+
+LatencyHistogram is log-bucketed in the HDR style: values below
+2**SUB_BUCKET_BITS ns get a bucket each, and above that every power of two
+is split into 2**(SUB_BUCKET_BITS - 1) buckets. The relative error is
+under 1 / 2**(SUB_BUCKET_BITS - 1) (about 3%), and the bucket count is a
+few hundred for any duration.
+
+The workload is a mix of random operations (OPERATION_MIX) among
+LATENCY_ACCOUNTS accounts, at each of THREAD_COUNTS. The solution's
+transfer p99 at SCORED_THREADS is scored against bank_reference.py under the
+same workload. As in scaling.py, both run with the same delay: every
+time.sleep becomes PROCESSING_DELAY, or, if the solution's transfer() never
+sleeps, sleeps are neutralised and PROCESSING_DELAY is added to every lock
+acquisition instead, so a tail reflects locking rather than a different
+delay. A fast tail is only worth something in a correct bank, so nothing is
+scored when the caller's correctness tests failed.
+
+Usage: python latency.py solution.py
+"""
+
+import importlib.util
+import io
+import random
+import sys
+import threading
+import time
+from contextlib import redirect_stdout
+from typing import Callable, Dict, List, Optional
+
+import bank_reference
+from scaling import _fraction, injected_delay, sleeps_per_transfer
+
+SUB_BUCKET_BITS = 5
+PERCENTILES = [50, 90, 99, 99.9]
+OPERATIONS = ["transfer", "deposit", "withdraw", "audit"]
+OPERATION_MIX = [0.9, 0.04, 0.04, 0.02]
+
+THREAD_COUNTS = [1, 4, 16, 64]
+LATENCY_ACCOUNTS = 8
+OPS_PER_THREAD = 200
+STALL_TIMEOUT = 30.0
+
+# Transfer p99 at SCORED_THREADS as a multiple of the reference's p99:
+# full credit at or below FULL_CREDIT_RATIO, none at or above ZERO_CREDIT_RATIO
+SCORED_THREADS = 16
+FULL_CREDIT_RATIO = 2.0
+ZERO_CREDIT_RATIO = 6.0
+
+
+class LatencyHistogram:
+    """Log-bucketed histogram of nanosecond durations."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts: List[int] = [0] * (1 << SUB_BUCKET_BITS)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    @staticmethod
+    def _index(value: int) -> int:
+        shift = value.bit_length() - SUB_BUCKET_BITS
+        if shift <= 0:
+            return value
+        half = 1 << (SUB_BUCKET_BITS - 1)
+        return (shift + 1) * half + (value >> shift) - half
+
+    @staticmethod
+    def _upper(index: int) -> int:
+        """Largest value that falls in bucket index."""
+        full = 1 << SUB_BUCKET_BITS
+        if index < full:
+            return index
+        half = full >> 1
+        shift = (index - full) // half + 1
+        mantissa = (index - full) % half + half
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, value: int):
+        index = self._index(value)
+        counts = self.counts
+        if index >= len(counts):
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "LatencyHistogram"):
+        if len(other.counts) > len(self.counts):
+            self.counts.extend([0] * (len(other.counts) - len(self.counts)))
+        for i, n in enumerate(other.counts):
+            self.counts[i] += n
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, p: float) -> int:
+        """Upper bound of the bucket holding the p-th percentile, in ns."""
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * p // 100))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(self._upper(index), self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        """Count, mean and percentiles, in microseconds."""
+        result = {"count": self.count,
+                  "mean_us": self.total / self.count / 1000 if self.count else 0.0,
+                  "max_us": self.max / 1000}
+        for p in PERCENTILES:
+            result[f"p{p:g}_us"] = self.percentile(p) / 1000
+        return result
+
+
+class LatencyRecorder:
+    """Thread-local histograms per operation, merged on demand."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._all: List[Dict[str, LatencyHistogram]] = []
+        self._lock = threading.Lock()
+
+    def _histograms(self) -> Dict[str, LatencyHistogram]:
+        histograms = getattr(self._local, "histograms", None)
+        if histograms is None:
+            histograms = self._local.histograms = {op: LatencyHistogram() for op in OPERATIONS}
+            with self._lock:
+                self._all.append(histograms)
+        return histograms
+
+    def timed(self, operation: str, call: Callable, *args):
+        """call(*args), recording its duration under operation."""
+        histogram = self._histograms()[operation]
+        start = time.perf_counter_ns()
+        try:
+            return call(*args)
+        finally:
+            histogram.record(time.perf_counter_ns() - start)
+
+    def merged(self) -> Dict[str, LatencyHistogram]:
+        result = {op: LatencyHistogram() for op in OPERATIONS}
+        with self._lock:
+            for histograms in self._all:
+                for op, histogram in histograms.items():
+                    result[op].merge(histogram)
+        return result
+
+
+def measure_latencies(make_bank: Callable, num_threads: int,
+                      ops_per_thread: int = OPS_PER_THREAD) -> Optional[Dict[str, dict]]:
+    """
+    {operation: summary} for one thread count, or None if threads stalled or
+    raised. Operations the bank does not define are left out of the mix.
+    Errors creating the bank or its accounts propagate.
+    """
+    bank = make_bank()
+    names = [f"user_{i}" for i in range(LATENCY_ACCOUNTS)]
+    for name in names:
+        bank.create_account(name, 1000.0)
+    mix = [(op, weight) for op, weight in zip(OPERATIONS, OPERATION_MIX) if hasattr(bank, op)]
+    recorder = LatencyRecorder()
+    start_line = threading.Barrier(num_threads)
+    errors = []
+
+    def worker(seed: int):
+        rng = random.Random(seed)
+        ops = rng.choices([op for op, _ in mix], [weight for _, weight in mix], k=ops_per_thread)
+        start_line.wait()
+        try:
+            for op in ops:
+                if op == "transfer":
+                    from_acc, to_acc = rng.sample(names, 2)
+                    recorder.timed(op, bank.transfer, from_acc, to_acc, rng.uniform(1, 100))
+                elif op == "audit":
+                    recorder.timed(op, bank.audit)
+                else:
+                    recorder.timed(op, getattr(bank, op), rng.choice(names), rng.uniform(1, 50))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(num_threads)]
+    # Audits of broken solutions print their discrepancies; keep them quiet
+    with redirect_stdout(io.StringIO()):
+        for t in threads:
+            t.start()
+        deadline = time.perf_counter() + STALL_TIMEOUT
+        for t in threads:
+            t.join(timeout=max(0.0, deadline - time.perf_counter()))
+            if t.is_alive():
+                return None
+    if errors:
+        return None
+    return {op: histogram.summary() for op, histogram in recorder.merged().items()}
+
+
+def latency_table(make_bank: Callable,
+                  thread_counts: List[int] = THREAD_COUNTS) -> Dict[int, Optional[dict]]:
+    """{threads: {operation: summary}}; stops once a thread count stalls."""
+    table = {}
+    for count in thread_counts:
+        table[count] = measure_latencies(make_bank, count)
+        if table[count] is None:
+            break
+    return table
+
+
+def format_table(table: Dict[int, Optional[dict]]) -> List[str]:
+    """One line per thread count and operation, in microseconds."""
+    lines = [f"{'threads':>7} {'op':<9} {'n':>6} " +
+             " ".join(f"{f'p{p:g}':>8}" for p in PERCENTILES) + f" {'max':>8}"]
+    for count, summaries in table.items():
+        if summaries is None:
+            lines.append(f"{count:>7} stalled or failed")
+            continue
+        for op in OPERATIONS:
+            s = summaries[op]
+            if not s["count"]:
+                continue
+            lines.append(f"{count:>7} {op:<9} {s['count']:>6} " +
+                         " ".join(f"{s[f'p{p:g}_us']:>8.0f}" for p in PERCENTILES) +
+                         f" {s['max_us']:>8.0f}")
+    return lines
+
+
+def evaluate_latency(module, points: int = 5,
+                     thread_counts: List[int] = THREAD_COUNTS,
+                     correct: bool = True) -> dict:
+    """
+    Latency tables for the solution and reference; scores transfer p99.
+    With correct=False (money lost or an audit failed in the caller's
+    correctness tests) the tables are still reported but earn nothing.
+    """
+    results = {"earned": 0, "possible": points, "details": [], "tables": {}}
+
+    try:
+        sleeps = bool(sleeps_per_transfer(module))
+    except Exception as e:
+        results["details"].append(f"✗ transfer() probe raised {type(e).__name__}: {e}")
+        return results
+    delay = bank_reference.PROCESSING_DELAY
+    try:
+        with injected_delay(module, sleeps, delay):
+            solution = latency_table(module.BankSystem, thread_counts)
+        with injected_delay(bank_reference, sleeps, delay):
+            reference = latency_table(bank_reference.BankSystem, thread_counts)
+    except Exception as e:
+        results["details"].append(f"✗ bank setup raised {type(e).__name__}: {e}")
+        return results
+    results["tables"] = {"solution": solution, "reference": reference}
+    results["details"].extend(format_table(solution))
+
+    if not correct:
+        results["details"].append("✗ the bank failed the correctness tests, "
+                                  "so its latency earns nothing")
+        return results
+    scored = min(SCORED_THREADS, max(thread_counts))
+    if solution.get(scored) is None:
+        results["details"].append(f"✗ operations stalled or failed before {scored} threads")
+        return results
+    if reference.get(scored) is None:
+        results["details"].append(f"✗ reference stalled or failed before {scored} threads")
+        return results
+
+    p99 = solution[scored]["transfer"]["p99_us"]
+    reference_p99 = reference[scored]["transfer"]["p99_us"]
+    ratio = p99 / reference_p99
+    fraction = _fraction(ratio, ZERO_CREDIT_RATIO, FULL_CREDIT_RATIO)
+    earned = round(points * fraction)
+    results["earned"] = earned
+    results["p99_ratio"] = ratio
+    mark = "✓" if earned == points else ("◐" if earned else "✗")
+    results["details"].append(
+        f"{mark} transfer p99 at {scored} threads {p99:,.0f}us vs reference "
+        f"{reference_p99:,.0f}us ({ratio:.1f}x, full credit at {FULL_CREDIT_RATIO:g}x) "
+        f"({earned}/{points} pts)")
+    return results
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python latency.py <solution.py>")
+        sys.exit(1)
+
+    spec = importlib.util.spec_from_file_location("solution", sys.argv[1])
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    results = evaluate_latency(module)
+    for detail in results["details"]:
+        print(f"  {detail}")
+    print(f"\nLatency Score: {results['earned']}/{results['possible']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Lock contention profiler for Problem 4: Concurrent Bug Hunt.
+
+While profiling, threading.Lock and RLock (and any copies of them the
+solution module imported) create instrumented locks that record
+acquisitions, wait time and hold time. Which locks are profiled is decided
+by creation call site, not by module: standard library frames are skipped
+(so a Condition or Queue counts where the solution made it), and every
+lock whose first remaining frame is outside this profiler is profiled,
+including those made by helpers the solution imports, such as the
+reference's TransactionLog. Locks are grouped by the source line that
+created them (so the per-account locks in a dict form one row), labelled
+by the assignment target, and attributed to accounts, total_money or
+transaction_log from that label, or failing that from the class and
+function that created them.
+
+Statistics are updated while the profiled lock itself is held, so they need
+no extra locking. Only failed non-blocking attempts are counted unguarded.
+
+Usage: python lock_profiler.py solution.py
+"""
+
+import importlib.util
+import io
+import linecache
+import random
+import sys
+import sysconfig
+import threading
+import time
+from contextlib import contextmanager, redirect_stdout
+from typing import Dict, List, Optional
+
+# (category, words in a lock's label that attribute it to that state)
+CATEGORIES = [
+    ("transaction_log", ("log", "transaction", "history")),
+    ("total_money", ("total", "money", "sum")),
+    ("accounts", ("account", "balance", "acct")),
+]
+
+PROFILE_ACCOUNTS = 10
+PROFILE_THREADS = 10
+PROFILE_TRANSFERS = 50
+
+# Less total wait than this is noise, not a hotspot
+HOTSPOT_MIN_WAIT_MS = 1.0
+
+# Lock creation inside these is attributed to the code that called them
+LIBRARY_PATHS = tuple({sysconfig.get_paths()[key] for key in ("stdlib", "purelib", "platlib")})
+
+
+class LockStats:
+    """Counters for one lock instance."""
+
+    __slots__ = ("site", "owner", "acquisitions", "contended", "failed",
+                 "wait_total", "wait_max", "hold_total", "hold_max")
+
+    def __init__(self, site: tuple, owner: str = ""):
+        self.site = site
+        self.owner = owner
+        self.acquisitions = 0
+        self.contended = 0
+        self.failed = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.hold_total = 0.0
+        self.hold_max = 0.0
+
+
+class ProfiledLock:
+    """threading.Lock stand-in that records wait and hold times."""
+
+    _factory = staticmethod(threading.Lock)
+
+    def __init__(self, stats: LockStats):
+        self._inner = self._factory()
+        self._stats = stats
+        self._held_since = 0.0
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        if self._inner.acquire(False):
+            waited = 0.0
+        else:
+            if not blocking:
+                self._stats.failed += 1
+                return False
+            start = time.perf_counter()
+            if not self._inner.acquire(True, timeout):
+                self._stats.failed += 1
+                return False
+            waited = time.perf_counter() - start
+            self._stats.contended += 1
+
+        self._acquired(waited)
+        return True
+
+    def _acquired(self, waited: float):
+        stats = self._stats
+        stats.acquisitions += 1
+        stats.wait_total += waited
+        if waited > stats.wait_max:
+            stats.wait_max = waited
+        self._held_since = time.perf_counter()
+
+    def _releasing(self):
+        held = time.perf_counter() - self._held_since
+        stats = self._stats
+        stats.hold_total += held
+        if held > stats.hold_max:
+            stats.hold_max = held
+
+    def release(self):
+        self._releasing()
+        self._inner.release()
+
+    def locked(self) -> bool:
+        return self._inner.locked()
+
+    __enter__ = acquire
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class ProfiledRLock(ProfiledLock):
+    """Reentrant variant; hold time runs from the outermost acquire."""
+
+    _factory = staticmethod(threading.RLock)
+
+    def __init__(self, stats: LockStats):
+        super().__init__(stats)
+        self._owner = None
+        self._depth = 0
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        if self._owner == threading.get_ident():
+            self._inner.acquire()
+            self._depth += 1
+            return True
+        if not super().acquire(blocking, timeout):
+            return False
+        self._owner = threading.get_ident()
+        self._depth = 1
+        return True
+
+    def release(self):
+        if self._owner != threading.get_ident():
+            self._inner.release()  # raises like an unowned RLock
+        self._depth -= 1
+        if not self._depth:
+            self._owner = None
+            self._releasing()
+        self._inner.release()
+
+    def locked(self) -> bool:
+        return self._owner is not None
+
+    __enter__ = acquire
+
+    # Condition.wait() releases and restores every level at once
+    def _is_owned(self) -> bool:
+        return self._owner == threading.get_ident()
+
+    def _release_save(self):
+        depth = self._depth
+        self._owner = None
+        self._depth = 0
+        self._releasing()
+        return self._inner._release_save(), depth
+
+    def _acquire_restore(self, state):
+        inner_state, depth = state
+        start = time.perf_counter()
+        self._inner._acquire_restore(inner_state)
+        self._acquired(time.perf_counter() - start)
+        self._owner = threading.get_ident()
+        self._depth = depth
+
+
+def _caller(frame, internal: tuple = ()):
+    """First frame from frame outwards that is not library or internal code."""
+    while frame:
+        filename = frame.f_code.co_filename
+        if not (filename in internal or filename.startswith(LIBRARY_PATHS)
+                or filename.startswith("<frozen")):
+            break
+        frame = frame.f_back
+    return frame
+
+
+def _site(frame) -> tuple:
+    """(label, function, line) of a frame creating a lock."""
+    if frame is None:
+        return ("<unknown>", "", 0)
+    code = frame.f_code
+    text = linecache.getline(code.co_filename, frame.f_lineno).strip()
+    label = text.split("=", 1)[0].strip() if "=" in text else text
+    return (label or "<unknown>", code.co_name, frame.f_lineno)
+
+
+def _creation_site(internal: tuple = (__file__,)) -> tuple:
+    """(label, function, line) of the solution code creating a lock; frames
+    from the internal files and libraries are skipped."""
+    return _site(_caller(sys._getframe(1), internal))
+
+
+def categorize(label: str, instances: int = 1, owner: str = "") -> str:
+    """Attribute a lock to the state it guards from its label, or else from
+    the qualified name of the function that created it."""
+    for text in (label, owner):
+        lower = text.lower()
+        for category, words in CATEGORIES:
+            if any(word in lower for word in words):
+                return category
+    # Many locks created on one line, or stored under a key, are per-account
+    if instances > 1 or "[" in label:
+        return "accounts"
+    return "other"
+
+
+class LockProfiler:
+    """Creates profiled locks and aggregates their statistics."""
+
+    def __init__(self):
+        self.locks: List[LockStats] = []
+
+    def _stats(self, frame) -> Optional[LockStats]:
+        """Statistics for a lock created from frame, or None if it is one of
+        the profiler's own (thread start-up, for instance)."""
+        frame = _caller(frame)
+        if frame is None or frame.f_code.co_filename == __file__:
+            return None
+        code = frame.f_code
+        stats = LockStats(_site(frame), getattr(code, "co_qualname", code.co_name))
+        self.locks.append(stats)
+        return stats
+
+    def Lock(self):
+        stats = self._stats(sys._getframe(1))
+        return ProfiledLock(stats) if stats else ProfiledLock._factory()
+
+    def RLock(self):
+        stats = self._stats(sys._getframe(1))
+        return ProfiledRLock(stats) if stats else ProfiledRLock._factory()
+
+    def report(self) -> List[dict]:
+        """One row per creation site, ranked by total wait time."""
+        rows: Dict[tuple, dict] = {}
+        for stats in self.locks:
+            label, function, line = stats.site
+            row = rows.setdefault((stats.site, stats.owner), {
+                "label": label,
+                "function": function,
+                "line": line,
+                "owner": stats.owner,
+                "locks": 0,
+                "acquisitions": 0,
+                "contended": 0,
+                "failed": 0,
+                "wait_total_ms": 0.0,
+                "wait_max_ms": 0.0,
+                "hold_total_ms": 0.0,
+                "hold_max_ms": 0.0,
+            })
+            row["locks"] += 1
+            row["acquisitions"] += stats.acquisitions
+            row["contended"] += stats.contended
+            row["failed"] += stats.failed
+            row["wait_total_ms"] += stats.wait_total * 1000
+            row["wait_max_ms"] = max(row["wait_max_ms"], stats.wait_max * 1000)
+            row["hold_total_ms"] += stats.hold_total * 1000
+            row["hold_max_ms"] = max(row["hold_max_ms"], stats.hold_max * 1000)
+        for row in rows.values():
+            row["category"] = categorize(row["label"], row["locks"], row["owner"])
+        return sorted(rows.values(), key=lambda r: r["wait_total_ms"], reverse=True)
+
+
+@contextmanager
+def profiled_locks(module):
+    """Route lock creation through a LockProfiler while the block runs."""
+    profiler = LockProfiler()
+    saved = []
+    for name in ("Lock", "RLock"):
+        original = getattr(threading, name)
+        # Copies made by "from threading import Lock" are swapped as well
+        for owner in (module, threading):
+            if getattr(owner, name, None) is original:
+                saved.append((owner, name, original))
+                setattr(owner, name, getattr(profiler, name))
+    try:
+        yield profiler
+    finally:
+        for owner, name, value in saved:
+            setattr(owner, name, value)
+
+
+def hotspot(rows: List[dict]) -> Optional[str]:
+    """Category with the most total wait, or None if nothing waited."""
+    waits: Dict[str, float] = {}
+    for row in rows:
+        waits[row["category"]] = waits.get(row["category"], 0.0) + row["wait_total_ms"]
+    if not waits or max(waits.values()) < HOTSPOT_MIN_WAIT_MS:
+        return None
+    return max(waits, key=waits.get)
+
+
+def profile_contention(module, num_accounts: int = PROFILE_ACCOUNTS,
+                       num_threads: int = PROFILE_THREADS,
+                       transfers_per_thread: int = PROFILE_TRANSFERS) -> dict:
+    """Run a random-transfer workload with profiled locks and report on it."""
+    result = {"rows": [], "hotspot": None, "runtime_ms": 0.0, "error": None}
+
+    # Audits of broken solutions print their discrepancies; keep them quiet
+    with profiled_locks(module) as profiler, redirect_stdout(io.StringIO()):
+        try:
+            bank = module.BankSystem()
+            names = [f"user_{i}" for i in range(num_accounts)]
+            for name in names:
+                bank.create_account(name, 1000.0)
+
+            def worker(seed: int):
+                rng = random.Random(seed)
+                for _ in range(transfers_per_thread):
+                    from_acc, to_acc = rng.sample(names, 2)
+                    bank.transfer(from_acc, to_acc, rng.uniform(1, 100))
+                bank.audit()
+
+            threads = [threading.Thread(target=worker, args=(i,), daemon=True)
+                       for i in range(num_threads)]
+            start = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join(timeout=30)
+                if t.is_alive():
+                    result["error"] = "Thread still running - possible deadlock"
+                    break
+            result["runtime_ms"] = (time.perf_counter() - start) * 1000
+        except Exception as e:
+            result["error"] = str(e)
+
+        result["rows"] = profiler.report()
+    result["hotspot"] = hotspot(result["rows"])
+    return result
+
+
+def format_report(result: dict, limit: int = 8) -> List[str]:
+    """Human-readable contention report lines."""
+    rows = result["rows"]
+    if not rows:
+        return ["no threading locks created (none profiled)"]
+    lines = [f"{'lock':<32} {'n':>4} {'acq':>7} {'cont':>6} "
+             f"{'wait ms':>9} {'max':>7} {'hold ms':>9} {'max':>7}"]
+    for row in rows[:limit]:
+        name = f"{row['label']} ({row['category']})"
+        lines.append(
+            f"{name[:32]:<32} {row['locks']:>4} {row['acquisitions']:>7} "
+            f"{row['contended']:>6} {row['wait_total_ms']:>9.1f} {row['wait_max_ms']:>7.2f} "
+            f"{row['hold_total_ms']:>9.1f} {row['hold_max_ms']:>7.2f}"
+        )
+    if result["hotspot"]:
+        lines.append(f"hotspot: {result['hotspot']}")
+    if result["error"]:
+        lines.append(f"error: {result['error']}")
+    return lines
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python lock_profiler.py <solution.py>")
+        sys.exit(1)
+
+    spec = importlib.util.spec_from_file_location("solution", sys.argv[1])
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    result = profile_contention(module)
+    for line in format_report(result):
+        print(f"  {line}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Throughput scaling curve for Problem 4: Concurrent Bug Hunt.
+
+Measures transfers/sec at 1 to 64 threads on two account patterns:
+
+    disjoint    every thread moves money between its own two accounts
+    contended   all threads transfer at random among CONTENDED_ACCOUNTS
+
+Under the GIL only time spent blocked can overlap, so the simulated
+processing delay inside transfer() is what lock granularity is measured
+against. Every time.sleep the solution makes is replaced by a fixed
+SLEEP_SECONDS. If transfer() never sleeps, its sleeps stay neutralised and
+the same delay is injected into every acquisition of a lock the solution
+creates, as work done while holding it. Two baselines run under the same
+delay: GlobalLockBank, which delays as many times per transfer under one
+lock, and bank_reference.py. The solution's disjoint speedup is scored on
+the scale between them. A solution that keeps disjoint transfers
+independent scales with the thread count; one that serializes them stays
+flat like the global lock. A contended curve that stalls (threads still
+blocked STALL_TIMEOUT after being stopped, i.e. a deadlock) scores nothing,
+and so does a bank that failed the caller's correctness tests: skipping
+locks is the easiest way to scale.
+
+Usage: python scaling.py solution.py
+"""
+
+import importlib.util
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+import bank_reference
+
+THREAD_COUNTS = [1, 2, 4, 8, 16, 64]
+PATTERNS = ["disjoint", "contended"]
+CONTENDED_ACCOUNTS = 4
+SLEEP_SECONDS = 0.0005
+DURATION = 0.25
+STALL_TIMEOUT = 5.0
+INITIAL_BALANCE = 1e9
+
+# Speedup at SCORED_THREADS over the solution's own single-thread rate:
+# none at or below the global lock's speedup, full credit at or above
+# REFERENCE_SHARE of the reference bank's speedup
+SCORED_THREADS = 16
+REFERENCE_SHARE = 0.5
+
+
+class GlobalLockBank:
+    """Correct but fully serialized bank: one lock around every transfer."""
+
+    def __init__(self, sleeps_per_transfer: int = 2, delay: float = SLEEP_SECONDS):
+        self.accounts: Dict[str, float] = {}
+        self.transaction_log: List[tuple] = []
+        self.total_money = 0.0
+        self.sleeps_per_transfer = sleeps_per_transfer
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def create_account(self, name: str, initial_balance: float) -> bool:
+        with self._lock:
+            if name in self.accounts:
+                return False
+            self.accounts[name] = initial_balance
+            self.total_money += initial_balance
+            return True
+
+    def transfer(self, from_account: str, to_account: str, amount: float) -> bool:
+        with self._lock:
+            if from_account not in self.accounts or to_account not in self.accounts:
+                return False
+            if from_account == to_account or amount <= 0:
+                return False
+            if self.accounts[from_account] < amount:
+                return False
+            for _ in range(self.sleeps_per_transfer):
+                time.sleep(self.delay)
+            self.accounts[from_account] -= amount
+            self.accounts[to_account] += amount
+            self.transaction_log.append((from_account, to_account, amount))
+            return True
+
+
+class _PatchedTime:
+    """Stand-in for a solution's time module with sleep replaced."""
+
+    def __init__(self, sleep: Callable):
+        self.sleep = sleep
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+@contextmanager
+def patched_sleep(module, delay: Optional[float]):
+    """
+    Route the module's time.sleep calls through a counting replacement.
+
+    delay None keeps the requested durations, 0 neutralises them and any
+    other value replaces them. Yields a list that grows by one per call.
+    """
+    calls = []
+
+    def sleep(seconds):
+        calls.append(None)
+        seconds = seconds if delay is None else delay
+        if seconds > 0:
+            time.sleep(seconds)
+
+    saved = {}
+    if getattr(module, "time", None) is time:
+        saved["time"] = module.time
+        module.time = _PatchedTime(sleep)
+    if getattr(module, "sleep", None) is time.sleep:
+        saved["sleep"] = module.sleep
+        module.sleep = sleep
+    try:
+        yield calls
+    finally:
+        for name, value in saved.items():
+            setattr(module, name, value)
+
+
+class _DelayedLock:
+    """Lock wrapper that holds for a fixed delay after every acquisition."""
+
+    def __init__(self, inner, delay: float, calls: list):
+        self._inner = inner
+        self._delay = delay
+        self._calls = calls
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        if not self._inner.acquire(blocking, timeout):
+            return False
+        self._calls.append(None)
+        if self._delay > 0:
+            time.sleep(self._delay)
+        return True
+
+    def release(self):
+        self._inner.release()
+
+    __enter__ = acquire
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def __getattr__(self, name):
+        # locked(), and the RLock internals Condition relies on
+        return getattr(self._inner, name)
+
+
+class _DelayedThreading:
+    """Stand-in for a solution's threading module with delayed locks."""
+
+    def __init__(self, delay: float, calls: list):
+        self.Lock = lambda: _DelayedLock(threading.Lock(), delay, calls)
+        self.RLock = lambda: _DelayedLock(threading.RLock(), delay, calls)
+        self.Condition = lambda lock=None: threading.Condition(
+            lock if lock is not None else self.RLock())
+
+    def __getattr__(self, name):
+        return getattr(threading, name)
+
+
+@contextmanager
+def delayed_locks(module, delay: float):
+    """
+    Make locks the module creates hold for delay after each acquisition.
+
+    Only locks created while patched are affected. Yields a list that
+    grows by one per acquisition.
+    """
+    calls = []
+    proxy = _DelayedThreading(delay, calls)
+    saved = {}
+    if getattr(module, "threading", None) is threading:
+        saved["threading"] = module.threading
+        module.threading = proxy
+    for name in ("Lock", "RLock", "Condition"):
+        if getattr(module, name, None) is getattr(threading, name):
+            saved[name] = getattr(module, name)
+            setattr(module, name, getattr(proxy, name))
+    try:
+        yield calls
+    finally:
+        for name, value in saved.items():
+            setattr(module, name, value)
+
+
+@contextmanager
+def injected_delay(module, sleeps: bool, delay: float = SLEEP_SECONDS):
+    """delay in the module's sleeps, or in its lock holds if it has none."""
+    if sleeps:
+        with patched_sleep(module, delay):
+            yield
+    else:
+        with patched_sleep(module, 0), delayed_locks(module, delay):
+            yield
+
+
+def _account_names(num_threads: int) -> List[str]:
+    return [f"acct_{i}" for i in range(2 * max(num_threads, CONTENDED_ACCOUNTS))]
+
+
+def measure_throughput(make_bank: Callable, num_threads: int, pattern: str,
+                       duration: float = DURATION) -> Optional[float]:
+    """Transfers/sec for one configuration, or None if threads stalled."""
+    bank = make_bank()
+    names = _account_names(num_threads)
+    for name in names:
+        bank.create_account(name, INITIAL_BALANCE)
+
+    stop = threading.Event()
+    start_line = threading.Barrier(num_threads + 1)
+    counts = [0] * num_threads
+
+    def worker(i: int):
+        rng = random.Random(i)
+        own = names[2 * i:2 * i + 2]
+        shared = names[:CONTENDED_ACCOUNTS]
+        start_line.wait()
+        done = 0
+        while not stop.is_set():
+            if pattern == "disjoint":
+                from_acc, to_acc = own if done % 2 == 0 else own[::-1]
+            else:
+                from_acc, to_acc = rng.sample(shared, 2)
+            bank.transfer(from_acc, to_acc, 1.0)
+            done += 1
+            counts[i] = done
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True)
+               for i in range(num_threads)]
+    for t in threads:
+        t.start()
+    start_line.wait()
+    start = time.perf_counter()
+    time.sleep(duration)
+    stop.set()
+
+    deadline = time.perf_counter() + STALL_TIMEOUT
+    for t in threads:
+        t.join(timeout=max(0.0, deadline - time.perf_counter()))
+        if t.is_alive():
+            return None
+    return sum(counts) / (time.perf_counter() - start)
+
+
+def sleeps_per_transfer(module, samples: int = 20) -> int:
+    """How many times the solution's transfer() sleeps, from a quick probe."""
+    bank = module.BankSystem()
+    bank.create_account("probe_a", INITIAL_BALANCE)
+    bank.create_account("probe_b", INITIAL_BALANCE)
+    with patched_sleep(module, 0) as calls:
+        for _ in range(samples):
+            bank.transfer("probe_a", "probe_b", 1.0)
+    return round(len(calls) / samples)
+
+
+def locks_per_transfer(module, samples: int = 20) -> int:
+    """How many lock acquisitions the solution's transfer() makes."""
+    with patched_sleep(module, 0), delayed_locks(module, 0) as calls:
+        bank = module.BankSystem()
+        bank.create_account("probe_a", INITIAL_BALANCE)
+        bank.create_account("probe_b", INITIAL_BALANCE)
+        del calls[:]
+        for _ in range(samples):
+            bank.transfer("probe_a", "probe_b", 1.0)
+    return round(len(calls) / samples)
+
+
+def scaling_curve(make_bank: Callable, thread_counts: List[int] = THREAD_COUNTS,
+                  patterns: List[str] = PATTERNS) -> dict:
+    """{pattern: {threads: transfers/sec or None}}; stops a pattern once it stalls."""
+    curve = {}
+    for pattern in patterns:
+        curve[pattern] = {}
+        for count in thread_counts:
+            tps = measure_throughput(make_bank, count, pattern)
+            curve[pattern][count] = tps
+            if tps is None:
+                break
+    return curve
+
+
+def _speedup(curve: dict, threads: int) -> Optional[float]:
+    base = curve.get(1)
+    scaled = curve.get(threads)
+    if not base or scaled is None:
+        return None
+    return scaled / base
+
+
+def _fraction(value: float, zero: float, full: float) -> float:
+    return max(0.0, min(1.0, (value - zero) / (full - zero)))
+
+
+def evaluate_scaling(module, points: int = 15,
+                     thread_counts: List[int] = THREAD_COUNTS,
+                     correct: bool = True) -> dict:
+    """
+    Measure the solution and both baselines and score the result. With
+    correct=False the curves are still reported but earn nothing.
+    """
+    results = {
+        "earned": 0,
+        "possible": points,
+        "details": [],
+        "sleeps_per_transfer": 0,
+        "locks_per_transfer": 0,
+        "sleep_seconds": SLEEP_SECONDS,
+        "curves": {}
+    }
+
+    try:
+        sleeps = sleeps_per_transfer(module)
+        delays = sleeps or locks_per_transfer(module)
+    except Exception as e:
+        results["details"].append(f"✗ transfer() probe raised {type(e).__name__}: {e}")
+        return results
+    results["sleeps_per_transfer"] = sleeps
+    results["locks_per_transfer"] = 0 if sleeps else delays
+    if not delays:
+        results["details"].append(
+            "✗ transfer() neither sleeps nor takes a lock, so no delay can be placed")
+        return results
+
+    try:
+        with injected_delay(module, bool(sleeps)):
+            solution = scaling_curve(module.BankSystem, thread_counts)
+        baseline = scaling_curve(lambda: GlobalLockBank(delays), thread_counts, ["disjoint"])
+        with injected_delay(bank_reference, bool(sleeps)):
+            reference = scaling_curve(bank_reference.BankSystem, thread_counts, ["disjoint"])
+    except Exception as e:
+        results["details"].append(f"✗ scaling run raised {type(e).__name__}: {e}")
+        return results
+    results["curves"] = {"solution": solution, "baseline": baseline, "reference": reference}
+
+    where = "sleeps" if sleeps else "lock holds"
+    results["details"].append(f"{SLEEP_SECONDS * 1000:g}ms delay in {where}, "
+                              f"{delays} per transfer")
+    stalled = {}
+    for pattern in PATTERNS:
+        cells = []
+        for count in thread_counts:
+            tps = solution[pattern].get(count)
+            if count in solution[pattern] and tps is None:
+                cells.append(f"{count}t stalled")
+                stalled[pattern] = count
+                break
+            if tps is not None:
+                cells.append(f"{count}t {tps:,.0f}/s")
+        results["details"].append(f"{pattern}: " + ", ".join(cells))
+
+    if "contended" in stalled:
+        results["details"].append(
+            f"✗ contended transfers stalled at {stalled['contended']} threads (deadlock?)")
+        return results
+    if not correct:
+        results["details"].append("✗ the bank failed the correctness tests, "
+                                  "so its scaling earns nothing")
+        return results
+    scored = min(SCORED_THREADS, max(thread_counts))
+    disjoint = solution["disjoint"]
+    if disjoint.get(scored) is None:
+        results["details"].append(f"✗ disjoint transfers stalled before {scored} threads")
+        return results
+
+    speedup = _speedup(disjoint, scored)
+    base_speedup = _speedup(baseline["disjoint"], scored)
+    reference_speedup = _speedup(reference["disjoint"], scored)
+    if speedup is None or not base_speedup or reference_speedup is None:
+        results["details"].append("✗ no transfers completed on a single thread")
+        return results
+
+    target = REFERENCE_SHARE * reference_speedup
+    fraction = 1.0 if target <= base_speedup else _fraction(speedup, base_speedup, target)
+    earned = round(points * fraction)
+    results["earned"] = earned
+    results["relative"] = speedup / base_speedup
+    mark = "✓" if earned == points else ("◐" if earned else "✗")
+    results["details"].append(
+        f"{mark} disjoint speedup at {scored} threads {speedup:.1f}x (global lock "
+        f"{base_speedup:.1f}x, full credit at {target:.1f}x) ({earned}/{points} pts)")
+    return results
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python scaling.py <solution.py>")
+        sys.exit(1)
+
+    spec = importlib.util.spec_from_file_location("solution", sys.argv[1])
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    results = evaluate_scaling(module)
+    for detail in results["details"]:
+        print(f"  {detail}")
+    print(f"\nScaling Score: {results['earned']}/{results['possible']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Multiprocess shared-memory stress mode for Problem 4: Concurrent Bug Hunt.
+
+Thread stress is GIL-bound and never shows parallel scaling. Here balances
+live in a multiprocessing.shared_memory block as int64 cents, one
+process-shared lock per slot, and forked worker processes transfer money
+concurrently on separate cores.
+
+Two banks are driven the same way:
+
+    SharedBankSystem   array-backed variant of BankSystem: integer cents,
+                       per-slot locks taken in slot order, total_money and
+                       log counters in shared slots
+    the solution       its accounts dict replaced by SharedBalances (a
+                       name -> float view of the same shared slots), or
+                       that view passed to its share_balances() if it has
+                       one, and its threading.Lock/RLock/Condition by
+                       multiprocessing ones, so locks it creates before
+                       the fork are shared
+
+After each run the shared balances must still sum to the initial cents, and
+the transfers logged must match the transfers that succeeded. A solution
+whose locks do not generalise to processes loses or creates money here.
+Solutions that store objects rather than numbers in accounts, and have no
+share_balances() hook, cannot be adapted and are reported as such.
+bank_reference.py has the hook, so `python shared_bank.py bank_reference.py`
+stresses it.
+
+Usage: python shared_bank.py [solution.py]
+"""
+
+import importlib.util
+import multiprocessing
+import numbers
+import os
+import random
+import sys
+import threading
+import time
+from collections.abc import MutableMapping
+from contextlib import nullcontext
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional
+
+from scaling import patched_sleep
+
+CENTS = 100
+PROCESS_COUNTS = [1, 2, 4, 8]
+ACCOUNTS = 16
+INITIAL_BALANCE = 1000
+TRANSFERS_PER_PROCESS = 2000
+JOIN_TIMEOUT = 60.0
+
+
+class SharedLedger:
+    """int64 slots in shared memory with one process-shared lock per slot."""
+
+    def __init__(self, slots: int, ctx):
+        self.shm = shared_memory.SharedMemory(create=True, size=8 * slots)
+        self.cents = self.shm.buf.cast("q")
+        for i in range(slots):
+            self.cents[i] = 0
+        self.locks = [ctx.Lock() for _ in range(slots)]
+
+    def total(self, slots: int) -> int:
+        return sum(self.cents[i] for i in range(slots))
+
+    def close(self):
+        self.cents.release()
+        self.shm.close()
+        self.shm.unlink()
+
+
+class SharedBankSystem:
+    """
+    BankSystem over a SharedLedger, amounts in integer cents.
+
+    Accounts must be created before workers fork. Slots 0..capacity-1 hold
+    balances; the next three hold total_money, the successful transfer count
+    and the cents transferred, each behind its own lock.
+    """
+
+    def __init__(self, capacity: int = ACCOUNTS, ctx=None):
+        ctx = ctx or multiprocessing.get_context("fork")
+        self.capacity = capacity
+        self.ledger = SharedLedger(capacity + 3, ctx)
+        self.slots: Dict[str, int] = {}
+        self._total = capacity
+        self._count = capacity + 1
+        self._transferred = capacity + 2
+
+    @property
+    def accounts(self) -> Dict[str, int]:
+        return {name: self.ledger.cents[slot] for name, slot in self.slots.items()}
+
+    @property
+    def total_money(self) -> int:
+        return self.ledger.cents[self._total]
+
+    def create_account(self, name: str, initial_cents: int) -> bool:
+        if name in self.slots or len(self.slots) >= self.capacity:
+            return False
+        slot = len(self.slots)
+        self.slots[name] = slot
+        cents, locks = self.ledger.cents, self.ledger.locks
+        with locks[slot]:
+            cents[slot] = initial_cents
+        with locks[self._total]:
+            cents[self._total] += initial_cents
+        return True
+
+    def get_balance(self, name: str) -> Optional[int]:
+        slot = self.slots.get(name)
+        return self.ledger.cents[slot] if slot is not None else None
+
+    def transfer(self, from_account: str, to_account: str, cents: int) -> bool:
+        source = self.slots.get(from_account)
+        target = self.slots.get(to_account)
+        if source is None or target is None or source == target or cents <= 0:
+            return False
+
+        balances, locks = self.ledger.cents, self.ledger.locks
+        first, second = sorted((source, target))
+        with locks[first], locks[second]:
+            if balances[source] < cents:
+                return False
+            balances[source] -= cents
+            balances[target] += cents
+        with locks[self._count]:
+            balances[self._count] += 1
+            balances[self._transferred] += cents
+        return True
+
+    def deposit(self, account: str, cents: int) -> bool:
+        slot = self.slots.get(account)
+        if slot is None or cents <= 0:
+            return False
+        balances, locks = self.ledger.cents, self.ledger.locks
+        with locks[slot], locks[self._total]:
+            balances[slot] += cents
+            balances[self._total] += cents
+        return True
+
+    def withdraw(self, account: str, cents: int) -> bool:
+        slot = self.slots.get(account)
+        if slot is None or cents <= 0:
+            return False
+        balances, locks = self.ledger.cents, self.ledger.locks
+        with locks[slot]:
+            if balances[slot] < cents:
+                return False
+            with locks[self._total]:
+                balances[slot] -= cents
+                balances[self._total] -= cents
+        return True
+
+    def audit(self) -> bool:
+        """Exact: integer cents need no epsilon."""
+        locks = self.ledger.locks[:len(self.slots)] + [self.ledger.locks[self._total]]
+        for lock in locks:
+            lock.acquire()
+        try:
+            return self.ledger.total(len(self.slots)) == self.ledger.cents[self._total]
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def get_transaction_count(self) -> int:
+        return self.ledger.cents[self._count]
+
+    def get_total_transferred(self) -> int:
+        return self.ledger.cents[self._transferred]
+
+    def close(self):
+        self.ledger.close()
+
+
+class SharedBalances(MutableMapping):
+    """name -> float balance view of a SharedLedger, for a solution's accounts."""
+
+    def __init__(self, ledger: SharedLedger, capacity: int):
+        self.ledger = ledger
+        self.capacity = capacity
+        self.slots: Dict[str, int] = {}
+
+    def __getitem__(self, name):
+        return self.ledger.cents[self.slots[name]] / CENTS
+
+    def __setitem__(self, name, value):
+        if not isinstance(value, numbers.Real):
+            raise TypeError(f"accounts[{name!r}] is {type(value).__name__}, not a number")
+        slot = self.slots.get(name)
+        if slot is None:
+            if len(self.slots) >= self.capacity:
+                raise KeyError(f"shared ledger full ({self.capacity} accounts)")
+            slot = self.slots[name] = len(self.slots)
+        self.ledger.cents[slot] = round(value * CENTS)
+
+    def __delitem__(self, name):
+        raise TypeError("accounts cannot be removed from a shared ledger")
+
+    def __iter__(self):
+        return iter(self.slots)
+
+    def __len__(self):
+        return len(self.slots)
+
+
+class _ProcessThreading:
+    """Stand-in for a solution's threading module with process-shared locks."""
+
+    def __init__(self, ctx):
+        self.Lock = ctx.Lock
+        self.RLock = ctx.RLock
+        self.Condition = ctx.Condition
+
+    def __getattr__(self, name):
+        return getattr(threading, name)
+
+
+def _logged(bank) -> int:
+    if hasattr(bank, "get_transaction_count"):
+        return bank.get_transaction_count()
+    return len(bank.transaction_log)
+
+
+def _worker(bank, names: List[str], transfers: int, amount: Callable,
+            seed: int, start, results):
+    rng = random.Random(seed)
+    try:
+        logged = _logged(bank)
+        start.wait()
+        succeeded = 0
+        for _ in range(transfers):
+            from_acc, to_acc = rng.sample(names, 2)
+            if bank.transfer(from_acc, to_acc, amount(rng)):
+                succeeded += 1
+        results.put((succeeded, _logged(bank) - logged, None))
+    except Exception as e:
+        results.put((0, 0, f"{type(e).__name__}: {e}"))
+
+
+def run_stress(bank, ledger: SharedLedger, num_processes: int, amount: Callable,
+               shared_log: bool, ctx, transfers: int = TRANSFERS_PER_PROCESS) -> dict:
+    """Fork workers against one bank and check conservation and the log."""
+    names = list(bank.accounts.keys())
+    initial = ledger.total(len(names))
+    logged_before = _logged(bank)
+    result = {"processes": num_processes, "transfers_per_sec": None,
+              "conserved": False, "log_consistent": False, "error": None}
+
+    start = ctx.Event()
+    results = ctx.Queue()
+    workers = [ctx.Process(target=_worker, args=(bank, names, transfers, amount, seed, start, results),
+                           daemon=True)
+               for seed in range(num_processes)]
+    for w in workers:
+        w.start()
+    began = time.perf_counter()
+    start.set()
+
+    outcomes = []
+    deadline = began + JOIN_TIMEOUT
+    try:
+        for _ in workers:
+            outcomes.append(results.get(timeout=max(0.1, deadline - time.perf_counter())))
+    except Exception:
+        result["error"] = "workers still running - possible deadlock"
+    elapsed = time.perf_counter() - began
+    for w in workers:
+        w.join(timeout=1)
+        if w.is_alive():
+            w.terminate()
+    if result["error"]:
+        return result
+
+    errors = [error for _, _, error in outcomes if error]
+    if errors:
+        result["error"] = errors[0]
+        return result
+
+    succeeded = sum(s for s, _, _ in outcomes)
+    logged = _logged(bank) - logged_before if shared_log else sum(l for _, l, _ in outcomes)
+    final = ledger.total(len(names))
+    result.update({
+        "transfers_per_sec": num_processes * transfers / elapsed,
+        "succeeded": succeeded,
+        "logged": logged,
+        "conserved": final == initial,
+        "discrepancy_cents": final - initial,
+        "log_consistent": logged == succeeded,
+    })
+    return result
+
+
+def _reference_bank(ctx):
+    bank = SharedBankSystem(ACCOUNTS, ctx)
+    for i in range(ACCOUNTS):
+        bank.create_account(f"user_{i}", INITIAL_BALANCE * CENTS)
+    return bank, bank.ledger, bank.close
+
+
+def _solution_bank(module, ctx):
+    """The solution's BankSystem with shared balances and process-shared locks."""
+    ledger = SharedLedger(ACCOUNTS, ctx)
+    try:
+        bank = module.BankSystem()
+        balances = SharedBalances(ledger, ACCOUNTS)
+        if hasattr(bank, "share_balances"):
+            bank.share_balances(balances)
+        elif isinstance(vars(bank).get("accounts"), dict):
+            bank.accounts = balances
+        else:
+            raise TypeError("BankSystem.accounts is not a plain dict attribute "
+                            "and there is no share_balances() hook")
+        for i in range(ACCOUNTS):
+            bank.create_account(f"user_{i}", float(INITIAL_BALANCE))
+        if len(bank.accounts) != ACCOUNTS:
+            raise TypeError("accounts are not stored in BankSystem.accounts")
+    except Exception:
+        ledger.close()
+        raise
+    return bank, ledger, ledger.close
+
+
+def _process_counts() -> List[int]:
+    cores = os.cpu_count() or 1
+    return [n for n in PROCESS_COUNTS if n <= max(2, cores)]
+
+
+def _install(module, ctx) -> Callable:
+    saved = {}
+    if getattr(module, "threading", None) is threading:
+        saved["threading"] = module.threading
+        module.threading = _ProcessThreading(ctx)
+    for name in ("Lock", "RLock", "Condition"):
+        if getattr(module, name, None) is getattr(threading, name):
+            saved[name] = getattr(module, name)
+            setattr(module, name, getattr(ctx, name))
+
+    def restore():
+        for name, value in saved.items():
+            setattr(module, name, value)
+    return restore
+
+
+def evaluate_multiprocess(module=None) -> dict:
+    """Stress the shared reference and, if given, the adapted solution."""
+    results = {"available": True, "cores": os.cpu_count(), "details": [], "runs": {}}
+    if "fork" not in multiprocessing.get_all_start_methods():
+        results["available"] = False
+        results["details"].append("- Multiprocess stress skipped: fork start method not available")
+        return results
+    ctx = multiprocessing.get_context("fork")
+
+    variants = [("shared reference", lambda: _reference_bank(ctx),
+                 lambda rng: rng.randint(1, 100) * CENTS, True)]
+    if module is not None:
+        variants.append(("solution", lambda: _solution_bank(module, ctx),
+                         lambda rng: float(rng.randint(1, 100)), False))
+
+    for label, make, amount, shared_log in variants:
+        runs = []
+        restore = _install(module, ctx) if label == "solution" else (lambda: None)
+        try:
+            with patched_sleep(module, 0) if label == "solution" else nullcontext():
+                for count in _process_counts():
+                    try:
+                        bank, ledger, close = make()
+                    except Exception as e:
+                        results["details"].append(f"- {label}: not adaptable to shared memory ({e})")
+                        break
+                    try:
+                        run = run_stress(bank, ledger, count, amount, shared_log, ctx)
+                    finally:
+                        close()
+                    runs.append(run)
+                    if run["error"]:
+                        break
+        finally:
+            restore()
+        results["runs"][label] = runs
+        if runs:
+            results["details"].append(_summarize(label, runs))
+    return results
+
+
+def _summarize(label: str, runs: List[dict]) -> str:
+    cells = []
+    problems = []
+    for run in runs:
+        if run["error"]:
+            problems.append(f"{run['processes']}p: {run['error']}")
+            continue
+        cells.append(f"{run['processes']}p {run['transfers_per_sec']:,.0f}/s")
+        if not run["conserved"]:
+            problems.append(f"{run['processes']}p: money not conserved "
+                            f"({run['discrepancy_cents'] / CENTS:+.2f})")
+        if not run["log_consistent"]:
+            problems.append(f"{run['processes']}p: {run['logged']} logged vs "
+                            f"{run['succeeded']} successful")
+    mark = "✗" if problems else "✓"
+    summary = f"{mark} {label}: " + ", ".join(cells)
+    if problems:
+        summary += " - " + "; ".join(problems)
+    return summary
+
+
+def main():
+    module = None
+    if len(sys.argv) > 1:
+        spec = importlib.util.spec_from_file_location("solution", sys.argv[1])
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+
+    results = evaluate_multiprocess(module)
+    print(f"  cores: {results['cores']}")
+    for detail in results["details"]:
+        print(f"  {detail}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Compact transaction log for Problem 4 BankSystem implementations.
+
+Stores transactions column by column in typed arrays instead of one
+dataclass with a datetime per entry:
+
+    timestamps   array('q') of time.time_ns()
+    from / to    array('i') of interned account ids
+    cents        array('q') of integer amounts
+    success      bytearray of 0/1 flags
+
+About 25 bytes per entry. Successful-transfer count and total cents are
+running counters, so get_transaction_count()/get_total_transferred() are O(1)
+instead of scanning the log. Appends are thread-safe behind one lock; with a
+capacity the log is a fixed-size ring that keeps the newest entries, while
+the counters still cover everything ever appended.
+
+Usage: python transaction_log.py   (compares with a list of dataclasses)
+"""
+
+import sys
+import threading
+import time
+import tracemalloc
+from array import array
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+CENTS = 100
+
+
+class TransactionLog:
+    """Columnar, append-only transaction log with O(1) counters."""
+
+    def __init__(self, capacity: Optional[int] = None):
+        if capacity is not None and capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._names: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+        size = capacity or 0
+        self._timestamps = array("q", bytes(8 * size))
+        self._from = array("i", bytes(array("i").itemsize * size))
+        self._to = array("i", bytes(array("i").itemsize * size))
+        self._cents = array("q", bytes(8 * size))
+        self._success = bytearray(size)
+
+        self._appended = 0
+        self._count = 0
+        self._total_cents = 0
+
+    def _intern(self, name: str) -> int:
+        account_id = self._ids.get(name)
+        if account_id is None:
+            account_id = self._ids[name] = len(self._names)
+            self._names.append(name)
+        return account_id
+
+    def append(self, from_account: str, to_account: str, cents: int,
+               success: bool = True, timestamp_ns: Optional[int] = None):
+        """Record one transaction; amounts are integer cents."""
+        if timestamp_ns is None:
+            timestamp_ns = time.time_ns()
+        with self._lock:
+            self._append_locked(from_account, to_account, cents, success, timestamp_ns)
+
+    def _append_locked(self, from_account: str, to_account: str, cents: int,
+                       success: bool, timestamp_ns: int):
+        ids = self._ids
+        source = ids.get(from_account)
+        if source is None:
+            source = self._intern(from_account)
+        target = ids.get(to_account)
+        if target is None:
+            target = self._intern(to_account)
+        if self.capacity is None:
+            self._timestamps.append(timestamp_ns)
+            self._from.append(source)
+            self._to.append(target)
+            self._cents.append(cents)
+            self._success.append(1 if success else 0)
+        else:
+            i = self._appended % self.capacity
+            self._timestamps[i] = timestamp_ns
+            self._from[i] = source
+            self._to[i] = target
+            self._cents[i] = cents
+            self._success[i] = 1 if success else 0
+        self._appended += 1
+        if success:
+            self._count += 1
+            self._total_cents += cents
+
+    def extend(self, entries, timestamp_ns: Optional[int] = None):
+        """Record (from_account, to_account, cents, success) entries under
+        one lock acquisition, all with the same timestamp."""
+        if timestamp_ns is None:
+            timestamp_ns = time.time_ns()
+        with self._lock:
+            for from_account, to_account, cents, success in entries:
+                self._append_locked(from_account, to_account, cents, success, timestamp_ns)
+
+    @property
+    def count(self) -> int:
+        """Successful transactions ever appended."""
+        return self._count
+
+    @property
+    def total_cents(self) -> int:
+        """Cents moved by successful transactions ever appended."""
+        return self._total_cents
+
+    @property
+    def appended(self) -> int:
+        return self._appended
+
+    def __len__(self) -> int:
+        """Entries currently retained."""
+        if self.capacity is None:
+            return self._appended
+        return min(self._appended, self.capacity)
+
+    def records(self) -> List[Tuple[int, str, str, int, bool]]:
+        """Snapshot of retained entries, oldest first, as
+        (timestamp_ns, from_account, to_account, cents, success)."""
+        with self._lock:
+            retained = len(self)
+            if self.capacity is None or self._appended <= self.capacity:
+                order = range(retained)
+            else:
+                start = self._appended % self.capacity
+                order = list(range(start, self.capacity)) + list(range(start))
+            names = self._names
+            return [(self._timestamps[i], names[self._from[i]], names[self._to[i]],
+                     self._cents[i], bool(self._success[i])) for i in order]
+
+    def __iter__(self) -> Iterator[Tuple[int, str, str, int, bool]]:
+        return iter(self.records())
+
+
+@dataclass
+class _Transaction:
+    timestamp: datetime
+    from_account: str
+    to_account: str
+    amount: float
+    success: bool
+
+
+def _fill_objects(entries: int, names: List[str]) -> list:
+    objects = []
+    for i in range(entries):
+        objects.append(_Transaction(datetime.now(), names[i % 20], names[(i + 1) % 20], 12.5, True))
+    return objects
+
+
+def _fill_log(entries: int, names: List[str]) -> TransactionLog:
+    log = TransactionLog()
+    for i in range(entries):
+        log.append(names[i % 20], names[(i + 1) % 20], 1250)
+    return log
+
+
+def _measure(fill, entries: int, names: List[str]) -> tuple:
+    """(result, seconds, bytes per entry); timed without tracemalloc running."""
+    start = time.perf_counter()
+    result = fill(entries, names)
+    seconds = time.perf_counter() - start
+    del result
+    tracemalloc.start()
+    result = fill(entries, names)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, seconds, size / entries
+
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    names = [f"user_{i}" for i in range(20)]
+
+    objects, append_s, object_bytes = _measure(_fill_objects, entries, names)
+    start = time.perf_counter()
+    count = len([t for t in objects if t.success])
+    total = sum(t.amount for t in objects if t.success)
+    scan_s = time.perf_counter() - start
+
+    log, log_append_s, log_bytes = _measure(_fill_log, entries, names)
+    assert log.count == count and log.total_cents == round(total * CENTS)
+
+    print(f"{entries:,} entries")
+    print(f"  dataclass list: {object_bytes:6.1f} B/entry, "
+          f"append {append_s * 1000:.0f}ms, count+total scan {scan_s * 1000:.1f}ms")
+    print(f"  TransactionLog: {log_bytes:6.1f} B/entry, "
+          f"append {log_append_s * 1000:.0f}ms, count+total O(1)")
+
+
+if __name__ == "__main__":
+    main()
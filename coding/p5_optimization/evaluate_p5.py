@@ -12,6 +12,10 @@ import time
 from collections import defaultdict
 from pathlib import Path
 
+from memory_probe import evaluate_memory
+from perf_timer import cached_timing
+from words_loader import load_words
+
 
 def load_solution(solution_path: str):
     """Load the solution module."""
@@ -59,18 +63,17 @@ def validate_groups(solution_groups: list, reference: dict) -> tuple:
 
 
 def test_correctness(module, words_file: str, name: str) -> dict:
-    """Test correctness on a word file."""
+    """Test correctness on a word file (loaded once, shared with other tests)."""
     result = {"passed": False, "error": None, "time_ms": 0}
 
     try:
-        with open(words_file) as f:
-            words = [line.strip() for line in f if line.strip()]
+        words = load_words(words_file)
 
         # Get reference
         reference = reference_anagram_groups(words)
 
         # Run solution
-        start = time.time()
+        start = time.perf_counter()
         if hasattr(module, 'find_anagram_groups'):
             solution_groups = module.find_anagram_groups(words)
         elif hasattr(module, 'main'):
@@ -86,7 +89,7 @@ def test_correctness(module, words_file: str, name: str) -> dict:
             result["error"] = "No find_anagram_groups function found"
             return result
 
-        result["time_ms"] = (time.time() - start) * 1000
+        result["time_ms"] = (time.perf_counter() - start) * 1000
 
         # Validate
         correct, error = validate_groups(solution_groups, reference)
@@ -100,24 +103,24 @@ def test_correctness(module, words_file: str, name: str) -> dict:
     return result
 
 
-def test_performance(module, words_file: str, target_ms: int) -> dict:
-    """Test performance on a word file."""
-    result = {"passed": False, "time_ms": 0, "target_ms": target_ms}
-
-    try:
-        with open(words_file) as f:
-            words = [line.strip() for line in f if line.strip()]
-
-        start = time.time()
-        module.find_anagram_groups(words)
-        result["time_ms"] = (time.time() - start) * 1000
-
+def test_performance(solution_path: str, words_file: str, target_ms: int,
+                     freeze: bool = True) -> dict:
+    """Test performance on a word file (median of repeats in a fresh process)."""
+    result = {"passed": False, "target_ms": target_ms, **cached_timing(solution_path, words_file, freeze)}
+    if result["error"] is None:
         result["passed"] = result["time_ms"] <= target_ms
+    return result
 
-    except Exception as e:
-        result["error"] = str(e)
 
-    return result
+def describe_performance(test: dict) -> str:
+    """One result line for a performance test."""
+    if test["error"]:
+        return f"  ✗ Failed: {test['error']}"
+    samples = ", ".join(f"{ms:.0f}" for ms in test["samples_ms"])
+    if test["passed"]:
+        return f"  ✓ Passed (median {test['time_ms']:.0f}ms of [{samples}]ms)"
+    return (f"  ✗ Failed (median {test['time_ms']:.0f}ms > {test['target_ms']}ms, "
+            f"samples [{samples}]ms)")
 
 
 def test_unicode(module) -> dict:
@@ -168,7 +171,7 @@ def test_case_insensitive(module) -> dict:
     return result
 
 
-def evaluate(solution_path: str) -> dict:
+def evaluate(solution_path: str, freeze: bool = True) -> dict:
     """Run all evaluations."""
     results = {
         "tests": {},
@@ -209,25 +212,17 @@ def evaluate(solution_path: str) -> dict:
 
     # Test 3: 1M in < 5 seconds (15 pts)
     print("Test 3: 1M words in < 5 seconds...")
-    test3 = test_performance(module, base_path / "words_1m.txt", 5000)
+    test3 = test_performance(solution_path, base_path / "words_1m.txt", 5000, freeze)
     results["tests"]["perf_5s"] = test3
-    if test3["passed"]:
-        results["scores"]["perf_5s"] = 15
-        print(f"  ✓ Passed ({test3['time_ms']:.0f}ms)")
-    else:
-        results["scores"]["perf_5s"] = 0
-        print(f"  ✗ Failed ({test3['time_ms']:.0f}ms > 5000ms)")
+    results["scores"]["perf_5s"] = 15 if test3["passed"] else 0
+    print(describe_performance(test3))
 
     # Test 4: 1M in < 1 second (15 pts)
     print("Test 4: 1M words in < 1 second...")
-    test4 = test_performance(module, base_path / "words_1m.txt", 1000)
+    test4 = test_performance(solution_path, base_path / "words_1m.txt", 1000, freeze)
     results["tests"]["perf_1s"] = test4
-    if test4["passed"]:
-        results["scores"]["perf_1s"] = 15
-        print(f"  ✓ Passed ({test4['time_ms']:.0f}ms)")
-    else:
-        results["scores"]["perf_1s"] = 0
-        print(f"  ✗ Failed ({test4['time_ms']:.0f}ms > 1000ms)")
+    results["scores"]["perf_1s"] = 15 if test4["passed"] else 0
+    print(describe_performance(test4))
 
     # Test 5: Unicode (10 pts)
     print("Test 5: Unicode handling...")
@@ -260,10 +255,17 @@ def evaluate(solution_path: str) -> dict:
         results["scores"]["statistics"] = 5
         print("  ◐ No get_statistics() function (partial credit)")
 
-    # Test 8: Memory efficiency (10 pts) - hard to test, give benefit of doubt
+    # Test 8: Memory efficiency (10 pts) - peak of one call vs the input size
     print("Test 8: Memory efficiency...")
-    results["scores"]["memory"] = 10
-    print("  ◐ Assumed pass (requires manual review)")
+    test8 = evaluate_memory(module, [
+        ("10k", base_path / "words_10k.txt"),
+        ("100k", base_path / "words_100k.txt"),
+        ("1m", base_path / "words_1m.txt")
+    ], points=10)
+    results["tests"]["memory"] = test8
+    results["scores"]["memory"] = test8["earned"]
+    for detail in test8["details"]:
+        print(f"  {detail}")
 
     results["total_score"] = sum(results["scores"].values())
 
@@ -272,7 +274,7 @@ def evaluate(solution_path: str) -> dict:
 
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python evaluate_p5.py <solution.py>")
+        print("Usage: python evaluate_p5.py <solution.py> [--no-gc-freeze]")
         sys.exit(1)
 
     solution_path = sys.argv[1]
@@ -281,7 +283,7 @@ def main():
     print("Problem 5: Performance Optimization - Evaluation")
     print("=" * 60 + "\n")
 
-    results = evaluate(solution_path)
+    results = evaluate(solution_path, freeze="--no-gc-freeze" not in sys.argv[2:])
 
     print("\n" + "=" * 60)
     print("Score Breakdown:")
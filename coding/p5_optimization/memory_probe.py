@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Peak-memory measurement for Problem 5 solutions.
+
+Each input size is measured in a forked child, so allocations from earlier
+tests (and the solution's own garbage) cannot hide or inflate its peak. The
+child inherits the evaluator's already-loaded words and calls
+find_anagram_groups twice:
+
+    rss_growth  first call, untraced: rise in ru_maxrss over the child's
+                starting maximum, which also counts C-level allocations
+    peak        second call, under tracemalloc: highest traced Python
+                allocation during the call
+    retained    traced memory still held by the result afterwards
+
+The untraced call gets CHILD_TIMEOUT. tracemalloc slows allocation-heavy
+code considerably, so the traced call gets TRACE_SLOWDOWN times as long as
+the untraced one took (at least CHILD_TIMEOUT). A child that runs out of
+time is killed and its size reported as not measured, which is not a
+memory failure; larger sizes are then skipped and the score uses the
+largest size that was measured.
+
+The score compares peak with the size of the input itself (the words tuple
+plus its strings). A solution that keys a dict by sorted word strings peaks
+at about 2x the input; one that builds a sorted tuple per word plus
+lowered and regrouped copies of the list peaks near 5x.
+
+Usage: python memory_probe.py solution.py words.txt [...]
+"""
+
+import gc
+import importlib.util
+import multiprocessing
+import resource
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import List, Tuple
+
+from words_loader import load_words
+
+# Peak as a multiple of input_bytes(): full credit at or below
+# FULL_CREDIT_RATIO, none at or above ZERO_CREDIT_RATIO
+FULL_CREDIT_RATIO = 2.5
+ZERO_CREDIT_RATIO = 5.0
+CHILD_TIMEOUT = 60.0
+# Upper bound on how much slower a call runs under tracemalloc
+TRACE_SLOWDOWN = 15
+
+
+def input_bytes(words) -> int:
+    """Memory held by the input: the sequence and every string in it."""
+    return sys.getsizeof(words) + sum(map(sys.getsizeof, words))
+
+
+def _maxrss_bytes() -> int:
+    # Kilobytes on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def _traced(module, words) -> dict:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        groups = module.find_anagram_groups(words)
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"peak": peak, "retained": retained, "groups": len(groups)}
+
+
+def _child(module, words, conn):
+    try:
+        gc.collect()
+        rss_before = _maxrss_bytes()
+        start = time.perf_counter()
+        groups = module.find_anagram_groups(words)
+        seconds = time.perf_counter() - start
+        rss_growth = max(0, _maxrss_bytes() - rss_before)
+        del groups
+        conn.send({"rss_growth": rss_growth, "seconds": seconds})
+        conn.send(_traced(module, words))
+    except BaseException as e:
+        conn.send({"error": f"{type(e).__name__}: {e}"})
+    finally:
+        conn.close()
+
+
+def peak_memory(module, words) -> dict:
+    """
+    Measure one call in a forked child (in-process where fork is missing).
+    error is set if the call failed, timed_out if it ran out of time.
+    """
+    result = {"words": len(words), "input_bytes": input_bytes(words),
+              "error": None, "timed_out": None}
+    if "fork" not in multiprocessing.get_all_start_methods():
+        try:
+            result.update(_traced(module, words))
+            result["rss_growth"] = None
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+        return result
+
+    ctx = multiprocessing.get_context("fork")
+    receive, send = ctx.Pipe(duplex=False)
+    child = ctx.Process(target=_child, args=(module, words, send), daemon=True)
+    child.start()
+    send.close()
+    timeout = CHILD_TIMEOUT
+    for call in ("untraced", "traced"):
+        if not receive.poll(timeout):
+            result["timed_out"] = f"{call} call still running after {timeout:.0f}s"
+            child.kill()
+            break
+        try:
+            result.update(receive.recv())
+        except EOFError:
+            result["error"] = f"child exited with code {child.exitcode}"
+        if result["error"]:
+            break
+        timeout = max(CHILD_TIMEOUT, TRACE_SLOWDOWN * result["seconds"])
+    child.join()
+    if result["error"] is None and result["timed_out"] is None and "peak" not in result:
+        result["error"] = f"child exited with code {child.exitcode}"
+    if result.get("peak") is not None:
+        result["ratio"] = result["peak"] / result["input_bytes"]
+    return result
+
+
+def _mb(n: int) -> str:
+    return f"{n / 1024 / 1024:.1f}MB"
+
+
+def evaluate_memory(module, files: List[Tuple[str, Path]], points: int = 10) -> dict:
+    """Peak memory at each available input size; scores the largest one measured."""
+    results = {"earned": 0, "possible": points, "details": [], "runs": {}}
+    if not hasattr(module, "find_anagram_groups"):
+        results["details"].append("✗ No find_anagram_groups function found")
+        return results
+
+    scored = stopped = None
+    for name, path in files:
+        if stopped:
+            # Larger inputs would only take longer or fail the same way
+            results["details"].append(f"- {name}: skipped after {stopped}")
+            continue
+        if not Path(path).exists():
+            results["details"].append(f"- {name}: {Path(path).name} not found (skipped)")
+            continue
+        run = peak_memory(module, load_words(path))
+        results["runs"][name] = run
+        if run["error"]:
+            results["details"].append(f"✗ {name}: {run['error']}")
+            stopped = f"{name} failed"
+            continue
+        if run["timed_out"]:
+            results["details"].append(f"- {name}: not measured, {run['timed_out']}")
+            stopped = f"{name} was not measured"
+            continue
+        rss = f", rss +{_mb(run['rss_growth'])}" if run["rss_growth"] is not None else ""
+        results["details"].append(
+            f"{name}: peak {_mb(run['peak'])} ({run['peak'] / run['words']:.0f} B/word, "
+            f"{run['ratio']:.1f}x input), retained {_mb(run['retained'])}{rss}")
+        scored = name
+
+    if scored is None:
+        if any(run["timed_out"] for run in results["runs"].values()):
+            results["details"].append("- Memory not measured: no input size finished in time")
+        else:
+            results["details"].append("✗ No input size could be measured")
+        return results
+
+    ratio = results["runs"][scored]["ratio"]
+    fraction = max(0.0, min(1.0, (ZERO_CREDIT_RATIO - ratio) / (ZERO_CREDIT_RATIO - FULL_CREDIT_RATIO)))
+    earned = round(points * fraction)
+    results["earned"] = earned
+    results["scored_size"] = scored
+    mark = "✓" if earned == points else ("◐" if earned else "✗")
+    larger = f"; {stopped}, so {scored} is the largest size scored" if stopped else ""
+    results["details"].append(
+        f"{mark} peak at {scored} is {ratio:.1f}x the input (full credit at "
+        f"{FULL_CREDIT_RATIO:g}x, none at {ZERO_CREDIT_RATIO:g}x{larger}) ({earned}/{points} pts)")
+    return results
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python memory_probe.py <solution.py> <words.txt> [...]")
+        sys.exit(1)
+
+    spec = importlib.util.spec_from_file_location("solution", sys.argv[1])
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    files = [(Path(p).stem, Path(p)) for p in sys.argv[2:]]
+    results = evaluate_memory(module, files)
+    for detail in results["details"]:
+        print(f"  {detail}")
+    print(f"\nMemory Score: {results['earned']}/{results['possible']}")
+
+
+if __name__ == "__main__":
+    main()
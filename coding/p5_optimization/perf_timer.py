@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Repeatable timing of find_anagram_groups for the Problem 5 evaluator.
+
+A single time.time() call in the evaluator's own process is noisy: the
+collector may pause to scan garbage left by earlier tests, and the first
+call pays for cold caches and lazy imports. Near the 1 second threshold
+that decides 15 points.
+
+Each timing therefore runs in a fresh interpreter (this file with --child).
+The child loads the words, optionally gc.freeze()s everything allocated so
+far (the input included) so collections during a call never rescan it,
+makes WARMUP untimed calls, then times up to REPEATS calls with
+perf_counter_ns after a gc.collect() each. Repeats stop early once
+REPEAT_BUDGET seconds have been spent, with at least one timed sample.
+Pass/fail uses the median; every sample is recorded.
+
+Usage: python perf_timer.py solution.py words.txt [--no-gc-freeze]
+"""
+
+import gc
+import importlib.util
+import io
+import json
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Dict, Tuple
+
+from words_loader import load_words
+
+WARMUP = 1
+REPEATS = 5
+REPEAT_BUDGET = 30.0
+CHILD_TIMEOUT = 300.0
+
+
+def _child(solution_path: str, words_file: str, freeze: bool) -> dict:
+    spec = importlib.util.spec_from_file_location("solution", solution_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    words = load_words(words_file)
+
+    gc.collect()
+    if freeze:
+        gc.freeze()
+
+    # Solutions that print would corrupt the JSON on stdout
+    with redirect_stdout(io.StringIO()):
+        warmup_ns = []
+        for _ in range(WARMUP):
+            start = time.perf_counter_ns()
+            module.find_anagram_groups(words)
+            warmup_ns.append(time.perf_counter_ns() - start)
+
+        samples_ns = []
+        spent = 0
+        while len(samples_ns) < REPEATS and (not samples_ns or spent < REPEAT_BUDGET * 1e9):
+            gc.collect()
+            start = time.perf_counter_ns()
+            groups = module.find_anagram_groups(words)
+            samples_ns.append(time.perf_counter_ns() - start)
+            spent += samples_ns[-1]
+            del groups
+
+    return {"warmup_ns": warmup_ns, "samples_ns": samples_ns}
+
+
+def time_solution(solution_path, words_file, freeze: bool = True) -> dict:
+    """Median and samples (ms) of find_anagram_groups in a fresh interpreter."""
+    result = {"error": None, "time_ms": None, "samples_ms": [], "warmup_ms": [],
+              "gc_frozen": freeze}
+    # The child runs from this directory, so relative paths must be resolved
+    command = [sys.executable, str(Path(__file__).resolve()), "--child",
+               str(Path(solution_path).resolve()), str(Path(words_file).resolve())]
+    if not freeze:
+        command.append("--no-gc-freeze")
+
+    try:
+        proc = subprocess.run(command, capture_output=True, text=True,
+                              timeout=CHILD_TIMEOUT, cwd=Path(__file__).parent)
+    except subprocess.TimeoutExpired:
+        result["error"] = f"timed out after {CHILD_TIMEOUT:.0f}s"
+        return result
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        result["error"] = lines[-1] if lines else f"exited with code {proc.returncode}"
+        return result
+
+    child = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["warmup_ms"] = [ns / 1e6 for ns in child["warmup_ns"]]
+    result["samples_ms"] = [ns / 1e6 for ns in child["samples_ns"]]
+    result["time_ms"] = statistics.median(result["samples_ms"])
+    return result
+
+
+_timings: Dict[Tuple[str, str, bool], dict] = {}
+
+
+def cached_timing(solution_path, words_file, freeze: bool = True) -> dict:
+    """time_solution, measured once per solution, file and freeze setting."""
+    key = (str(Path(solution_path).resolve()), str(Path(words_file).resolve()), freeze)
+    if key not in _timings:
+        _timings[key] = time_solution(solution_path, words_file, freeze)
+    return _timings[key]
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python perf_timer.py <solution.py> <words.txt> [--no-gc-freeze]")
+        sys.exit(1)
+
+    freeze = "--no-gc-freeze" not in sys.argv[2:]
+    if sys.argv[1] == "--child":
+        print(json.dumps(_child(sys.argv[2], sys.argv[3], freeze)))
+        return
+
+    result = time_solution(sys.argv[1], sys.argv[2], freeze)
+    if result["error"]:
+        print(f"  ✗ {result['error']}")
+        sys.exit(1)
+    print(f"  warmup: {', '.join(f'{ms:.0f}ms' for ms in result['warmup_ms'])}")
+    print(f"  samples: {', '.join(f'{ms:.0f}ms' for ms in result['samples_ms'])}")
+    print(f"  median: {result['time_ms']:.0f}ms (gc frozen: {result['gc_frozen']})")
+
+
+if __name__ == "__main__":
+    main()
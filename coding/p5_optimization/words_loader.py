@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Shared words-file loader for the Problem 5 evaluator.
+
+Each words file is memory-mapped once per evaluator run. iter_words() splits
+it lazily; words() splits it once into a tuple that is cached and handed to
+every test, so the same immutable input is used throughout and no test
+re-reads or re-allocates it inside a timed region.
+
+Lines are stripped and blank lines dropped, matching
+`[line.strip() for line in f if line.strip()]`.
+
+Usage: python words_loader.py <words.txt>
+"""
+
+import mmap
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+
+class WordsFile:
+    """A read-only memory map of one words file."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._words: Optional[Tuple[str, ...]] = None
+        with open(self.path, "rb") as f:
+            size = self.path.stat().st_size
+            # mmap cannot map an empty file
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def iter_words(self) -> Iterator[str]:
+        """Words one at a time, decoded line by line from the map."""
+        start = 0
+        size = len(self._map)
+        while start < size:
+            end = self._map.find(b"\n", start)
+            if end < 0:
+                end = size
+            word = self._map[start:end].decode("utf-8").strip()
+            if word:
+                yield word
+            start = end + 1
+
+    def words(self) -> Tuple[str, ...]:
+        """All words, split on first use and cached."""
+        if self._words is None:
+            text = self._map[:].decode("utf-8")
+            self._words = tuple(word for word in map(str.strip, text.split("\n")) if word)
+        return self._words
+
+    def __len__(self) -> int:
+        return len(self.words())
+
+
+_files: Dict[Path, WordsFile] = {}
+
+
+def words_file(path) -> WordsFile:
+    """The WordsFile for path, mapped on first request."""
+    key = Path(path).resolve()
+    if key not in _files:
+        _files[key] = WordsFile(key)
+    return _files[key]
+
+
+def load_words(path) -> Tuple[str, ...]:
+    """Cached words of path; every caller gets the same tuple."""
+    return words_file(path).words()
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python words_loader.py <words.txt>")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    with open(sys.argv[1]) as f:
+        listed = [line.strip() for line in f if line.strip()]
+    read_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    words = load_words(sys.argv[1])
+    first_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    load_words(sys.argv[1])
+    again_s = time.perf_counter() - start
+
+    assert list(words) == listed == list(words_file(sys.argv[1]).iter_words())
+    print(f"{len(words):,} words")
+    print(f"  open + split per test: {read_s * 1000:.1f}ms")
+    print(f"  mmap loader first use: {first_s * 1000:.1f}ms, cached: {again_s * 1e6:.1f}us")
+
+
+if __name__ == "__main__":
+    main()